@@ -1,3 +1,57 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import PPJK, BarangPIB, DokumenPIB, DokumenSPPB, ExtractionJob, Importir, UploadedDocument
+
+
+@admin.register(ExtractionJob)
+class ExtractionJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "kode_tps", "status", "created_at", "updated_at")
+    list_filter = ("status", "kode_tps")
+    readonly_fields = ("id", "created_at", "updated_at")
+
+
+@admin.register(UploadedDocument)
+class UploadedDocumentAdmin(admin.ModelAdmin):
+    list_display = ("kode_tps", "nama", "digest", "ukuran", "jumlah_upload", "terakhir_diupload")
+    list_filter = ("kode_tps",)
+    search_fields = ("nama", "digest")
+    readonly_fields = ("digest", "ukuran", "jumlah_upload", "created_at", "terakhir_diupload")
+
+
+class BarangPIBInline(admin.TabularInline):
+    model = BarangPIB
+    extra = 0
+    can_delete = False
+    fields = ("urutan", "hs_code", "uraian", "negara", "qty", "kode_satuan", "nilai_pabean")
+    readonly_fields = fields
+
+
+@admin.register(DokumenPIB)
+class DokumenPIBAdmin(admin.ModelAdmin):
+    list_display = ("nomor_pengajuan", "nomor_pendaftaran", "kode_tps", "importir", "header_only", "created_at")
+    list_filter = ("kode_tps", "header_only")
+    search_fields = ("nomor_pengajuan", "nomor_pendaftaran", "house_bl_awb", "master_bl_awb", "digest")
+    raw_id_fields = ("importir",)
+    readonly_fields = ("digest", "created_at", "updated_at")
+    inlines = [BarangPIBInline]
+
+
+@admin.register(DokumenSPPB)
+class DokumenSPPBAdmin(admin.ModelAdmin):
+    list_display = ("nomor_sppb", "nomor_aju", "nomor_awb", "kode_tps", "importir", "ppjk", "created_at")
+    list_filter = ("kode_tps",)
+    search_fields = ("nomor_sppb", "nomor_aju", "nomor_pendaftaran", "nomor_awb", "digest")
+    raw_id_fields = ("pib", "importir", "ppjk")
+    readonly_fields = ("digest", "created_at", "updated_at")
+
+
+@admin.register(Importir)
+class ImportirAdmin(admin.ModelAdmin):
+    list_display = ("npwp", "nama", "nib", "updated_at")
+    search_fields = ("npwp", "nama", "nib")
+
+
+@admin.register(PPJK)
+class PPJKAdmin(admin.ModelAdmin):
+    list_display = ("npwp", "nama", "updated_at")
+    search_fields = ("npwp", "nama")
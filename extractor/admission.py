@@ -0,0 +1,214 @@
+"""
+Admission control endpoint ekstraksi: paling banyak EXTRACT_ADMISSION_MAX_ACTIVE
+request diekstrak bersamaan per proses worker (process pool juga per worker),
+sisanya menunggu di antrian FIFO berukuran EXTRACT_ADMISSION_MAX_QUEUE paling
+lama EXTRACT_ADMISSION_QUEUE_TIMEOUT detik. Antrian penuh / terlalu lama
+menunggu -> 429 dengan Retry-After, sebelum body upload dibaca, jadi saat
+ramai latensi dan memori tetap terbatas.
+Kedalaman antrian, request aktif, dan penolakan ada di /metrics.
+"""
+import asyncio
+import os
+import threading
+from collections import deque
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .metrics import catat_admission, catat_ditolak
+
+# alasan penolakan (label metrics extract_admission_rejected_total)
+ANTRIAN_PENUH = "antrian_penuh"
+TIMEOUT = "timeout"
+
+
+def _set_result(future):
+    if not future.done():
+        future.set_result(None)
+
+
+async def _catat(fn, *args, **kwargs):
+    # metrics menulis SQLite: dijalankan di thread supaya event loop tidak
+    # tertahan, dan tetap selesai walaupun coroutine pemanggil dibatalkan
+    await asyncio.shield(sync_to_async(fn, thread_sensitive=False)(*args, **kwargs))
+
+
+class _TiketAsync:
+    # penunggu dari event loop: slot diserahkan lewat future, bukan notify
+    def __init__(self, loop):
+        self.loop = loop
+        self.future = loop.create_future()
+
+
+class Admission:
+    def __init__(self, max_aktif, max_antrian, timeout):
+        self.max_aktif = max_aktif
+        self.max_antrian = max_antrian
+        self.timeout = timeout
+        self.aktif = 0
+        self._antrian = deque()
+        self._cond = threading.Condition()
+
+    @property
+    def antrian(self):
+        return len(self._antrian)
+
+    def _antri(self, tiket):
+        """
+        (dengan lock) None = langsung dapat slot, ANTRIAN_PENUH, atau
+        False = tiket masuk antrian.
+        """
+        if self.aktif < self.max_aktif and not self._antrian:
+            self.aktif += 1
+            return None
+        if len(self._antrian) >= self.max_antrian:
+            return ANTRIAN_PENUH
+        self._antrian.append(tiket)
+        return False
+
+    def _serahkan(self):
+        # (dengan lock) kepala antrian berganti / slot kosong: penunggu async
+        # di kepala langsung diberi slot, penunggu thread dibangunkan
+        while self._antrian and self.aktif < self.max_aktif and isinstance(self._antrian[0], _TiketAsync):
+            tiket = self._antrian.popleft()
+            self.aktif += 1
+            tiket.loop.call_soon_threadsafe(_set_result, tiket.future)
+        self._cond.notify_all()
+
+    def masuk(self):
+        """
+        Minta slot ekstraksi; tunggu di antrian kalau semua slot terpakai.
+        Mengembalikan None kalau diterima (wajib diakhiri keluar()), atau
+        alasan penolakan (ANTRIAN_PENUH / TIMEOUT).
+        """
+        tiket = object()
+        with self._cond:
+            hasil = self._antri(tiket)
+        if hasil is not False:
+            return hasil
+        catat_admission(antrian=1)
+        try:
+            with self._cond:
+                # FIFO: hanya kepala antrian yang boleh mengambil slot
+                diterima = self._cond.wait_for(
+                    lambda: self._antrian[0] is tiket and self.aktif < self.max_aktif, self.timeout
+                )
+                self._antrian.remove(tiket)
+                if diterima:
+                    self.aktif += 1
+                self._serahkan()
+        finally:
+            catat_admission(antrian=-1)
+        return None if diterima else TIMEOUT
+
+    async def masuk_async(self):
+        """
+        masuk() untuk view async: menunggu tanpa menahan thread maupun event
+        loop. Kalau coroutine dibatalkan (klien putus) saat menunggu, tiket
+        dikeluarkan dari antrian, atau slot yang terlanjur diserahkan dilepas.
+        """
+        tiket = _TiketAsync(asyncio.get_running_loop())
+        with self._cond:
+            hasil = self._antri(tiket)
+        if hasil is not False:
+            return hasil
+        try:
+            await _catat(catat_admission, antrian=1)
+            await asyncio.wait_for(asyncio.shield(tiket.future), self.timeout)
+            return None
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            with self._cond:
+                diserahkan = tiket not in self._antrian
+                if not diserahkan:
+                    self._antrian.remove(tiket)
+                    self._serahkan()
+            if isinstance(e, asyncio.CancelledError):
+                if diserahkan:
+                    self.keluar()
+                raise
+            # slot bisa saja diserahkan tepat saat timeout
+            return None if diserahkan else TIMEOUT
+        finally:
+            await _catat(catat_admission, antrian=-1)
+
+    def keluar(self):
+        with self._cond:
+            self.aktif -= 1
+            self._serahkan()
+
+
+_admission = None
+_admission_lock = threading.Lock()
+
+
+def get_admission():
+    """
+    Controller per proses, atau None kalau EXTRACT_ADMISSION_ENABLED = False.
+    """
+    global _admission
+    if not getattr(settings, "EXTRACT_ADMISSION_ENABLED", True):
+        return None
+    if _admission is None:
+        with _admission_lock:
+            if _admission is None:
+                # default: sebanyak proses di process pool
+                max_aktif = (
+                    getattr(settings, "EXTRACT_ADMISSION_MAX_ACTIVE", None)
+                    or getattr(settings, "EXTRACT_POOL_WORKERS", None)
+                    or os.cpu_count()
+                    or 1
+                )
+                _admission = Admission(
+                    max_aktif,
+                    getattr(settings, "EXTRACT_ADMISSION_MAX_QUEUE", 16),
+                    getattr(settings, "EXTRACT_ADMISSION_QUEUE_TIMEOUT", 30),
+                )
+    return _admission
+
+
+def retry_after():
+    return getattr(settings, "EXTRACT_ADMISSION_RETRY_AFTER", 5)
+
+
+def minta_slot(endpoint):
+    """
+    (slot, alasan): alasan None = diterima, slot wajib dilepas dengan
+    lepas_slot(slot) setelah request selesai (slot None = tanpa batas);
+    selain itu alasan penolakan.
+    """
+    admission = get_admission()
+    if admission is None:
+        return None, None
+    alasan = admission.masuk()
+    if alasan is not None:
+        catat_ditolak(endpoint, alasan)
+        return None, alasan
+    catat_admission(aktif=1)
+    return admission, None
+
+
+async def minta_slot_async(endpoint):
+    """
+    minta_slot untuk view async (lihat Admission.masuk_async).
+    """
+    admission = get_admission()
+    if admission is None:
+        return None, None
+    alasan = await admission.masuk_async()
+    if alasan is not None:
+        await _catat(catat_ditolak, endpoint, alasan)
+        return None, alasan
+    try:
+        await _catat(catat_admission, aktif=1)
+    except asyncio.CancelledError:
+        # slot sudah didapat tapi tidak sampai ke pemanggil
+        await _catat(lepas_slot, admission)
+        raise
+    return admission, None
+
+
+def lepas_slot(admission):
+    if admission is None:
+        return
+    admission.keluar()
+    catat_admission(aktif=-1)
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class ExtractorConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'extractor'
+
+    def ready(self):
+        from django.core.signals import request_started
+
+        from .jobs import pulihkan_saat_mulai
+
+        request_started.connect(pulihkan_saat_mulai, dispatch_uid="extractor.pulihkan_job")
@@ -0,0 +1,369 @@
+"""
+Backend ekstraksi teks PDF. Semua backend mengembalikan list teks per halaman
+dengan format page.extract_text() pdfplumber, jadi tahap regex
+(parse_pib/parse_sppb) tidak perlu tahu teks berasal dari backend mana.
+
+pdfplumber/pdfminer dan pypdfium2 baru di-import saat pertama dipakai, jadi
+proses yang tidak mengekstrak (migrate, admin, ...) tidak membayar import-nya.
+Worker web memuatnya lebih awal lewat extractor.warmup.
+"""
+import ctypes
+import io
+import mmap
+import threading
+from itertools import groupby
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from .templates import di_dalam
+from .timing import hitung, stage
+
+BACKEND_PDFPLUMBER = "pdfplumber"
+BACKEND_PDFIUM = "pdfium"
+
+
+class BatasMemoriTerlampaui(Exception):
+    """
+    Memori proses naik melebihi EXTRACT_MEMORY_BUDGET_MB saat satu dokumen
+    diubah jadi teks.
+    """
+
+
+# ===== pdfplumber =====
+
+def _buka_pdf(source):
+    """
+    Buka PDF dari path, bytes/bytearray/memoryview, atau file-like object
+    (mis. file upload Django) tanpa harus menulis ke disk dulu.
+    """
+    import pdfplumber
+
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return pdfplumber.open(io.BytesIO(source))
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return pdfplumber.open(source)
+
+
+def _teks_kotak_pdfplumber(page):
+    def teks_kotak(bbox):
+        inside = page.filter(
+            lambda obj: obj.get("object_type") == "char" and di_dalam(bbox, obj["x0"], obj["top"], obj["x1"])
+        )
+        return inside.extract_text() or ""
+    return teks_kotak
+
+
+def iter_pdfplumber(source, potong=None):
+    with stage("buka"):
+        pdf = _buka_pdf(source)
+    with pdf:
+        for i, page in enumerate(pdf.pages):
+            try:
+                with stage("teks"):
+                    text = page.extract_text() or ""
+                if potong is not None and i in potong.halaman:
+                    # karakter halaman sudah di-parse extract_text(), potongan tinggal menyaring
+                    with stage("region"):
+                        potong.isi(i, page.width, page.height, _teks_kotak_pdfplumber(page))
+            finally:
+                # objek layout & karakter halaman disimpan pdfplumber sampai
+                # PDF ditutup; dibuang begitu teksnya diambil supaya memori
+                # tidak ikut membesar dengan jumlah halaman
+                page.close()
+            hitung("halaman")
+            yield text
+
+
+# ===== pdfium =====
+# Teks disusun ulang dari koordinat karakter pdfium dengan algoritma yang sama
+# dengan page.extract_text() pdfplumber (x_tolerance=3, y_tolerance=3):
+# karakter dikelompokkan per baris berdasarkan top, diurutkan per x0, dipecah
+# jadi kata, lalu kata dikelompokkan lagi per baris.
+
+X_TOLERANCE = 3
+Y_TOLERANCE = 3
+
+# pdfplumber default expand_ligatures=True
+_LIGATUR = {"ﬀ": "ff", "ﬃ": "ffi", "ﬄ": "ffl", "ﬁ": "fi", "ﬂ": "fl", "ﬆ": "st", "ﬅ": "st"}
+
+# pdfium menandai tanda hubung di akhir baris sebagai 0x02
+_KODE_HYPHEN = 0x02
+_KODE_DIABAIKAN = (0, 0xFFFE, 0xFFFF)
+
+# pdfium tidak thread-safe: semua pemanggilan dalam satu proses diserialkan
+_pdfium_lock = threading.Lock()
+
+_descent_cache = {}
+
+
+def _descent_standar(fontname):
+    """
+    Descent font standar (Helvetica, Times, ...) per satuan ukuran font, sama
+    dengan metrik yang dipakai pdfminer. None kalau bukan font standar.
+    """
+    if fontname not in _descent_cache:
+        from pdfminer.fontmetrics import FONT_METRICS
+
+        metrics = FONT_METRICS.get(fontname)
+        _descent_cache[fontname] = metrics[0].get("Descent", 0) / 1000 if metrics else None
+    return _descent_cache[fontname]
+
+
+def _karakter_halaman(page, textpage):
+    """
+    Karakter asli halaman sebagai (teks, x0, top, x1). top dihitung seperti
+    pdfminer supaya pengelompokan baris sama persis.
+    """
+    import pypdfium2.raw as pdfium_c
+
+    height = page.get_height()
+    raw = textpage.raw
+    rect = pdfium_c.FS_RECTF()
+    ox, oy = ctypes.c_double(), ctypes.c_double()
+    fontname = ctypes.create_string_buffer(128)
+    flags = ctypes.c_int()
+
+    chars = []
+    for i in range(pdfium_c.FPDFText_CountChars(raw)):
+        # spasi/baris baru buatan pdfium tidak ada di PDF-nya
+        if pdfium_c.FPDFText_IsGenerated(raw, i) == 1:
+            continue
+        code = pdfium_c.FPDFText_GetUnicode(raw, i)
+        if code in _KODE_DIABAIKAN:
+            continue
+        text = "-" if code == _KODE_HYPHEN else chr(code)
+        if text in "\r\n":
+            continue
+
+        pdfium_c.FPDFText_GetLooseCharBox(raw, i, rect)
+        pdfium_c.FPDFText_GetFontInfo(raw, i, fontname, 128, flags)
+        descent = _descent_standar(fontname.value.decode("latin-1"))
+        if descent is None:
+            top = height - rect.top
+        else:
+            pdfium_c.FPDFText_GetCharOrigin(raw, i, ox, oy)
+            size = pdfium_c.FPDFText_GetFontSize(raw, i)
+            top = height - (oy.value + size * (1 + descent))
+
+        # koordinat pdfium float32; dibulatkan supaya urutan karakter dengan
+        # x0 yang sama tidak ditentukan oleh noise pembulatan
+        chars.append((_LIGATUR.get(text, text), round(rect.left, 3), round(top, 3), round(rect.right, 3)))
+    return chars
+
+
+def _spasi_terpisah(page, textpage):
+    """
+    Objek teks yang isinya hanya spasi dibuang pdfium dari textpage (diganti
+    spasi buatan), padahal pdfminer tetap menghitungnya sebagai karakter.
+    """
+    import pypdfium2.raw as pdfium_c
+
+    height = page.get_height()
+    left, bottom, right, top = (ctypes.c_float() for _ in range(4))
+    matrix = pdfium_c.FS_MATRIX()
+    size = ctypes.c_float()
+    descent = ctypes.c_float()
+
+    spaces = []
+    for i in range(pdfium_c.FPDFPage_CountObjects(page.raw)):
+        obj = pdfium_c.FPDFPage_GetObject(page.raw, i)
+        if pdfium_c.FPDFPageObj_GetType(obj) != pdfium_c.FPDF_PAGEOBJ_TEXT:
+            continue
+        pdfium_c.FPDFPageObj_GetBounds(obj, left, bottom, right, top)
+        # spasi tidak punya glyph, jadi lebar bounds-nya nol
+        if right.value != left.value:
+            continue
+        # panjang buffer teks (UTF-16 + terminator); > 2 berarti ada teks
+        if pdfium_c.FPDFTextObj_GetText(obj, textpage.raw, None, 0) > 2:
+            continue
+
+        pdfium_c.FPDFPageObj_GetMatrix(obj, matrix)
+        pdfium_c.FPDFTextObj_GetFontSize(obj, size)
+        pdfium_c.FPDFFont_GetDescent(pdfium_c.FPDFTextObj_GetFont(obj), ctypes.c_float(1.0), descent)
+        font_size = size.value * abs(matrix.d)
+        y_top = height - (matrix.f + font_size * (1 + descent.value))
+        spaces.append((" ", round(matrix.e, 3), round(y_top, 3), round(matrix.e, 3)))
+    return spaces
+
+
+def _cluster(values, tolerance):
+    """
+    {nilai: nomor cluster}; nilai unik terurut dirantai selama jaraknya
+    <= tolerance (sama dengan cluster_list pdfplumber).
+    """
+    ids = {}
+    cluster_id = -1
+    last = None
+    for value in sorted(set(values)):
+        if last is None or value - last > tolerance:
+            cluster_id += 1
+        ids[value] = cluster_id
+        last = value
+    return ids
+
+
+def _susun_teks(chars):
+    # 1. karakter -> baris (berdasarkan top), urut kiri ke kanan
+    line_ids = _cluster([ch[2] for ch in chars], Y_TOLERANCE)
+    lines = {}
+    for ch in chars:
+        lines.setdefault(line_ids[ch[2]], []).append(ch)
+
+    # 2. baris -> kata
+    words = []
+    for line_id in sorted(lines):
+        current = []
+        for ch in sorted(lines[line_id], key=lambda c: (c[1], c[2])):
+            if ch[0].isspace():
+                if current:
+                    words.append(current)
+                current = []
+                continue
+            if current:
+                prev = current[-1]
+                if ch[1] < prev[1] or ch[1] > prev[3] + X_TOLERANCE or abs(ch[2] - prev[2]) > Y_TOLERANCE:
+                    words.append(current)
+                    current = []
+            current.append(ch)
+        if current:
+            words.append(current)
+
+    # 3. kata -> baris teks (berdasarkan top kata, urutan dipertahankan)
+    tops = [min(ch[2] for ch in word) for word in words]
+    word_line_ids = _cluster(tops, Y_TOLERANCE)
+    text_lines = []
+    for _, group in groupby(zip(words, tops), key=lambda wt: word_line_ids[wt[1]]):
+        text_lines.append(" ".join("".join(ch[0] for ch in word) for word, _ in group))
+    return "\n".join(text_lines)
+
+
+def _sumber_pdfium(source):
+    if isinstance(source, (bytearray, memoryview)):
+        return bytes(source)
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return source
+
+
+def iter_pdfium(source, potong=None):
+    import pypdfium2 as pdfium
+
+    # lock dipegang per halaman, bukan selama generator hidup, supaya
+    # pemanggil yang berhenti di tengah jalan tidak menahan thread lain
+    with stage("buka"), _pdfium_lock:
+        pdf = pdfium.PdfDocument(_sumber_pdfium(source))
+        n_pages = len(pdf)
+    try:
+        for i in range(n_pages):
+            with stage("teks"):
+                with _pdfium_lock:
+                    page = pdf[i]
+                    textpage = page.get_textpage()
+                    try:
+                        size = page.get_size()
+                        chars = _karakter_halaman(page, textpage) + _spasi_terpisah(page, textpage)
+                    finally:
+                        textpage.close()
+                        page.close()
+                # penyusunan teks murni Python, tidak perlu memegang lock
+                text = _susun_teks(chars)
+            if potong is not None and i in potong.halaman:
+                with stage("region"):
+                    potong.isi(i, *size, lambda bbox: _susun_teks(
+                        [ch for ch in chars if di_dalam(bbox, ch[1], ch[2], ch[3])]
+                    ))
+            hitung("halaman")
+            yield text
+    finally:
+        with _pdfium_lock:
+            pdf.close()
+
+
+# nama backend -> generator teks per halaman
+BACKENDS = {
+    BACKEND_PDFPLUMBER: iter_pdfplumber,
+    BACKEND_PDFIUM: iter_pdfium,
+}
+
+
+def backend_aktif():
+    backend = getattr(settings, "EXTRACT_TEXT_BACKEND", BACKEND_PDFIUM)
+    if backend not in BACKENDS:
+        raise ImproperlyConfigured(
+            f"EXTRACT_TEXT_BACKEND harus salah satu dari {sorted(BACKENDS)}, bukan {backend!r}"
+        )
+    return backend
+
+
+# ===== budget memori per dokumen =====
+
+def rss():
+    """
+    RSS proses saat ini dalam byte, None kalau tidak bisa dibaca (bukan Linux).
+    """
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * mmap.PAGESIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+# RSS yang diukur milik seluruh proses: di luar process pool (thread
+# fallback, EXTRACT_POOL_WORKERS = 0) dokumen lain yang sedang diparse ikut
+# terhitung, jadi budget hanya berlaku di proses pool (lihat aktifkan_budget)
+_budget_aktif = False
+
+
+def aktifkan_budget():
+    """
+    Initializer proses pool: budget memori berlaku di proses ini.
+    """
+    global _budget_aktif
+    _budget_aktif = True
+
+
+def budget_memori():
+    # byte, atau None kalau tidak dibatasi
+    if not _budget_aktif:
+        return None
+    budget = getattr(settings, "EXTRACT_MEMORY_BUDGET_MB", 512)
+    return int(budget * 1024 * 1024) if budget else None
+
+
+def _dengan_budget(halaman, budget):
+    # Kenaikan RSS dicek tiap selesai satu halaman. Di process pool satu
+    # proses mengerjakan satu dokumen sekaligus, jadi kenaikannya milik
+    # dokumen ini.
+    awal = rss()
+    try:
+        for n, text in enumerate(halaman, 1):
+            if awal is not None:
+                naik = rss() - awal
+                if naik > budget:
+                    raise BatasMemoriTerlampaui(
+                        f"Dokumen terlalu besar: memori naik {naik // 2**20} MB setelah {n} halaman "
+                        f"(batas {budget // 2**20} MB)"
+                    )
+            yield text
+    finally:
+        halaman.close()
+
+
+def iter_halaman(source, backend=None, potong=None):
+    """
+    Teks per halaman, satu per satu, dari backend yang diminta (default:
+    EXTRACT_TEXT_BACKEND). Halaman berikutnya baru diekstrak saat diminta,
+    dan objek halaman sebelumnya sudah dilepas, jadi memori tidak ikut
+    membesar dengan jumlah halaman (di process pool dibatasi
+    EXTRACT_MEMORY_BUDGET_MB).
+    potong: templates.Potongan; region template diisi dari halaman yang sama.
+    """
+    halaman = BACKENDS[backend or backend_aktif()](source, potong)
+    budget = budget_memori()
+    return halaman if budget is None else _dengan_budget(halaman, budget)
+
+
+def baca_halaman(source, backend=None):
+    return list(iter_halaman(source, backend))
@@ -0,0 +1,201 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+# File yang menentukan hasil ekstraksi. Kalau salah satunya berubah,
+# versi ikut berubah sehingga entri cache lama otomatis tidak terpakai.
+_VERSION_SOURCES = ("utils.py", "patterns.py", "index.py", "backends.py", "templates.py", "varian.py")
+
+
+def _extractor_version():
+    h = hashlib.sha256()
+    base = os.path.dirname(os.path.abspath(__file__))
+    for name in _VERSION_SOURCES:
+        with open(os.path.join(base, name), "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()[:16]
+
+
+EXTRACTOR_VERSION = _extractor_version()
+
+# Setting yang ikut menentukan hasil ekstraksi (nama, default); nilainya
+# masuk ke versi supaya mengganti setting tidak menyajikan hasil lama.
+_VERSION_SETTINGS = (
+    ("EXTRACT_TEXT_BACKEND", "pdfium"),
+    ("EXTRACT_TEMPLATES", True),
+)
+
+
+def extractor_version():
+    """
+    EXTRACTOR_VERSION digabung nilai _VERSION_SETTINGS saat ini.
+    """
+    nilai = [repr(getattr(settings, name, default)) for name, default in _VERSION_SETTINGS]
+    return hashlib.sha256("|".join([EXTRACTOR_VERSION, *nilai]).encode()).hexdigest()[:16]
+
+
+class ResultCache:
+    """
+    Cache hasil ekstraksi dua tingkat: LRU di memori proses + SQLite di disk.
+    Key = (jenis dokumen, sha256 isi file, versi extractor).
+    version None = extractor_version(), dihitung ulang tiap akses supaya
+    ikut berubah kalau setting diganti saat proses berjalan.
+    """
+
+    def __init__(self, db_path, max_entries=256, version=None):
+        self.db_path = str(db_path) if db_path else None
+        self.max_entries = max_entries
+        self._version = version
+
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if self.db_path:
+            self._init_db()
+
+    @property
+    def version(self):
+        return self._version or extractor_version()
+
+    # ---- SQLite ----
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self):
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS extract_result ("
+            " kind TEXT NOT NULL,"
+            " digest TEXT NOT NULL,"
+            " version TEXT NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " PRIMARY KEY (kind, digest, version))"
+        )
+        conn.commit()
+
+    # ---- LRU ----
+    def _remember(self, key, payload):
+        with self._lock:
+            self._lru[key] = payload
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.max_entries:
+                self._lru.popitem(last=False)
+                self.evictions += 1
+
+    def get(self, kind, digest):
+        key = (kind, digest, self.version)
+        with self._lock:
+            payload = self._lru.get(key)
+            if payload is not None:
+                self._lru.move_to_end(key)
+                self.hits += 1
+                return json.loads(payload)
+
+        if self.db_path:
+            row = self._conn().execute(
+                "SELECT payload FROM extract_result WHERE kind=? AND digest=? AND version=?",
+                key,
+            ).fetchone()
+            if row:
+                self._remember(key, row[0])
+                with self._lock:
+                    self.hits += 1
+                    self.disk_hits += 1
+                return json.loads(row[0])
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, kind, digest, result):
+        key = (kind, digest, self.version)
+        payload = json.dumps(result)
+        self._remember(key, payload)
+        if self.db_path:
+            conn = self._conn()
+            conn.execute(
+                "INSERT OR REPLACE INTO extract_result (kind, digest, version, payload, created_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                key + (payload, time.time()),
+            )
+            conn.commit()
+
+    def invalidate(self, all_versions=False):
+        """
+        Kosongkan LRU dan hapus entri disk. Default hanya entri versi lama
+        (extractor sudah berubah); all_versions=True menghapus semuanya.
+        Mengembalikan jumlah baris disk yang dihapus.
+        """
+        with self._lock:
+            self._lru.clear()
+        if not self.db_path:
+            return 0
+        conn = self._conn()
+        if all_versions:
+            cur = conn.execute("DELETE FROM extract_result")
+        else:
+            cur = conn.execute("DELETE FROM extract_result WHERE version != ?", (self.version,))
+        conn.commit()
+        return cur.rowcount
+
+    def stats(self):
+        with self._lock:
+            data = {
+                "version": self.version,
+                "memory_entries": len(self._lru),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+        if self.db_path:
+            rows = self._conn().execute(
+                "SELECT version = ?, COUNT(*) FROM extract_result GROUP BY version = ?",
+                (self.version, self.version),
+            ).fetchall()
+            counts = {bool(current): n for current, n in rows}
+            data["disk_entries"] = counts.get(True, 0)
+            data["disk_stale_entries"] = counts.get(False, 0)
+        return data
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_result_cache():
+    """
+    Instance cache per proses, dibuat sesuai settings. None kalau cache dimatikan.
+    """
+    global _cache
+    if not getattr(settings, "EXTRACT_CACHE_ENABLED", True):
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResultCache(
+                    getattr(settings, "EXTRACT_CACHE_PATH", None),
+                    max_entries=getattr(settings, "EXTRACT_CACHE_MAX_ENTRIES", 256),
+                )
+    return _cache
+
@@ -0,0 +1,162 @@
+import re
+from bisect import bisect_right
+
+# Label yang dipakai sebagai titik awal pencarian tiap field. Setiap label
+# adalah awalan literal dari regex field-nya, sehingga pencarian boleh dimulai
+# dari kemunculan pertama label tanpa mengubah hasil.
+ANCHORS_PIB = (
+    "Nomor Pengajuan",
+    "Kantor Pabean",
+    "2. Identitas",
+    "3. Nama, Alamat",
+    "5. NIB",
+    "15. Invoice",
+    "11. Perkiraan Tanggal Tiba",
+    "12. Pelabuhan Muat",
+    "13. Pelabuhan Transit",
+    "14. Pelabuhan Tujuan",
+    "10. Nama Sarana Pengangkutan",
+    "Nomor dan Tanggal Pendaftaran",
+    "House",
+    "Master",
+    "Pos Tarif",
+    "Berat Bersih",
+)
+
+ANCHORS_SPPB = (
+    "SURAT PERSETUJUAN PENGELUARAN BARANG",
+    "Nomor Pendaftaran PIB",
+    "Nomor aju",
+    "Kepada",
+    "NPWP",
+    "Lokasi Barang",
+    "Nama Sarana Pengangkut",
+    "Jumlah/jenis kemasan",
+    "Merk kemasan",
+    "Jumlah peti kemas",
+    "Nomor Peti Kemas/Ukuran",
+    "Berat",
+)
+
+
+class DocumentIndex:
+    """
+    Index teks dokumen yang dibangun sekali per parse: daftar baris, offset
+    awal tiap baris, dan posisi pertama tiap label (anchor).
+    Label dicari case-insensitive, jadi posisinya tidak pernah melewati
+    kemunculan pertama versi case-sensitive-nya.
+    """
+
+    def __init__(self, text, anchors=ANCHORS_PIB):
+        self.text = text
+        self.lines = text.splitlines()
+        self._line_offsets = None
+
+        # str.find di teks lowercase jauh lebih cepat daripada regex re.I.
+        # lower() bisa mengubah panjang teks untuk sebagian karakter unicode;
+        # kalau itu terjadi, posisi dicari dengan regex re.I di teks asli.
+        lowered = text.lower()
+        self._lowered = lowered if len(lowered) == len(text) else None
+
+        self.first = {anchor: self._find(anchor, 0) for anchor in anchors}
+        self._occurrences = {}
+
+    def _find(self, anchor, start):
+        if self._lowered is not None:
+            pos = self._lowered.find(anchor.lower(), start)
+            return pos if pos != -1 else None
+        m = re.compile(re.escape(anchor), re.I).search(self.text, start)
+        return m.start() if m else None
+
+    @property
+    def line_offsets(self):
+        # offset awal tiap baris, konsisten dengan splitlines()
+        if self._line_offsets is None:
+            offsets = []
+            pos = 0
+            for line in self.text.splitlines(keepends=True):
+                offsets.append(pos)
+                pos += len(line)
+            self._line_offsets = offsets
+        return self._line_offsets
+
+    def start(self, anchor):
+        """
+        Posisi pertama label, atau None kalau label tidak ada di dokumen.
+        """
+        if anchor not in self.first:
+            # label di luar daftar anchors: cari sekali lalu simpan
+            self.first[anchor] = self._find(anchor, 0)
+        return self.first[anchor]
+
+    def occurrences(self, anchor):
+        """
+        Semua posisi label (dihitung saat pertama kali diminta).
+        """
+        found = self._occurrences.get(anchor)
+        if found is None:
+            found = []
+            pos = self.start(anchor)
+            while pos is not None:
+                found.append(pos)
+                pos = self._find(anchor, pos + 1)
+            self._occurrences[anchor] = found
+        return found
+
+    def search(self, pattern, anchor):
+        """
+        pattern.search mulai dari label-nya; None langsung kalau label tidak ada.
+        """
+        pos = self.start(anchor)
+        if pos is None:
+            return None
+        return pattern.search(self.text, pos)
+
+    def finditer(self, pattern, anchor):
+        pos = self.start(anchor)
+        if pos is None:
+            return iter(())
+        return pattern.finditer(self.text, pos)
+
+    def finditer_blok(self, pattern, label, wajib=()):
+        """
+        Seperti pattern.finditer(text), tapi teks dipecah jadi blok per
+        kemunculan label (case-sensitive) dan tiap match hanya dicari di
+        bloknya: dari akhir label sebelumnya sampai label berikutnya.
+        Setiap match harus memuat label tepat sekali; .*? tidak pernah
+        memindai sisa dokumen, jadi waktunya linear terhadap panjang teks.
+        wajib: literal lain di pattern; blok tanpa salah satunya dilewati
+        tanpa menjalankan regex (backtracking di blok yang gagal itu mahal).
+        """
+        bounds = []
+        pos = self.text.find(label)
+        while pos != -1:
+            bounds.append(pos)
+            pos = self.text.find(label, pos + 1)
+
+        pos = 0
+        for i, start in enumerate(bounds):
+            if start < pos:
+                continue  # label ini sudah termakan match sebelumnya
+            if i:
+                pos = max(pos, bounds[i - 1] + len(label))
+            end = bounds[i + 1] if i + 1 < len(bounds) else len(self.text)
+            if any(self.text.find(w, pos, end) == -1 for w in wajib):
+                continue
+            m = pattern.search(self.text, pos, end)
+            if m:
+                yield m
+                pos = m.end()
+
+    def line_of(self, pos):
+        return bisect_right(self.line_offsets, pos) - 1
+
+    def line_starting_with(self, label):
+        """
+        Nomor baris pertama yang (setelah strip) diawali label, atau None.
+        """
+        for pos in self.occurrences(label):
+            i = self.line_of(pos)
+            if self.lines[i].strip().startswith(label):
+                return i
+        return None
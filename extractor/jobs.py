@@ -0,0 +1,170 @@
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .backends import BatasMemoriTerlampaui
+from .models import ExtractionJob
+from .pool import extract_many
+from .records import simpan_set
+from .storage import baca_blob, simpan_blob
+from .utils import pesan_hasil
+
+logger = logging.getLogger(__name__)
+
+# alasan penolakan job baru (label metrics extract_admission_rejected_total)
+JOB_PENUH = "antrian_job_penuh"
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_job_executor():
+    """
+    Thread pool lokal yang memproses job ekstraksi. Thread hanya menunggu
+    process pool (extract_many), jadi parsing tetap jalan di proses terpisah.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, "EXTRACT_JOB_WORKERS", 2),
+                    thread_name_prefix="extract-job",
+                )
+    return _executor
+
+
+def submit_job(job_id):
+    """
+    Jadwalkan job; file input dibaca dari blob store saat job mulai, jadi
+    antrian executor tidak menyimpan isi file.
+    """
+    get_job_executor().submit(_process_job, job_id)
+
+
+def antrian_penuh():
+    """
+    True kalau job yang belum selesai (pending + running, semua worker) sudah
+    mencapai EXTRACT_JOB_MAX_PENDING; job baru ditolak 429.
+    """
+    batas = getattr(settings, "EXTRACT_JOB_MAX_PENDING", 64)
+    if batas is None:
+        return False
+    belum_selesai = ExtractionJob.objects.filter(
+        status__in=[ExtractionJob.STATUS_PENDING, ExtractionJob.STATUS_RUNNING]
+    ).count()
+    return belum_selesai >= batas
+
+
+def buat_job(tps_code, jobs):
+    """
+    Daftarkan job baru dan jadwalkan. jobs sama formatnya dengan extract_many
+    (file PIB dulu, lalu SPPB); isinya ditulis ke blob store sekarang juga
+    (bukan lewat thread arsip) supaya job tetap bisa dijalankan setelah
+    worker restart (lihat pulihkan_job).
+    """
+    for _, digest, data in jobs:
+        simpan_blob(data, digest)
+    job = ExtractionJob.objects.create(
+        kode_tps=tps_code, dokumen=[[kind, digest] for kind, digest, _ in jobs]
+    )
+    submit_job(job.id)
+    return job
+
+
+def pulihkan_job(menit=30):
+    """
+    Setelah worker restart/deploy: job "running" yang tidak berubah selama
+    lebih dari `menit` menit ditandai failed (workernya sudah mati).
+    Mengembalikan (jumlah job yang ditandai failed, id job "pending").
+    """
+    sekarang = timezone.now()
+    gagal = ExtractionJob.objects.filter(
+        status=ExtractionJob.STATUS_RUNNING, updated_at__lt=sekarang - timedelta(minutes=menit)
+    ).update(
+        status=ExtractionJob.STATUS_FAILED,
+        message="Job terhenti karena worker berhenti, silakan kirim ulang",
+        updated_at=sekarang,
+    )
+    pending = list(
+        ExtractionJob.objects.filter(status=ExtractionJob.STATUS_PENDING)
+        .order_by("created_at").values_list("pk", flat=True)
+    )
+    return gagal, pending
+
+
+_dipulihkan_pid = None
+
+
+def pulihkan_saat_mulai(**kwargs):
+    """
+    Receiver request_started (apps.py): pada request pertama tiap proses
+    worker (setelah fork gunicorn, jadi thread job tidak dibuat di master)
+    jalankan pulihkan_job dan jadwalkan ulang job pending di worker ini.
+    Job yang sama bisa dijadwalkan beberapa worker; _process_job mengklaim
+    atomik, jadi tetap diproses sekali. Mati dengan
+    EXTRACT_JOB_RECOVER_ON_START = False (pakai manage.py pulihkan_job).
+    """
+    global _dipulihkan_pid
+    if _dipulihkan_pid == os.getpid() or not getattr(settings, "EXTRACT_JOB_RECOVER_ON_START", True):
+        return
+    _dipulihkan_pid = os.getpid()
+    try:
+        gagal, pending = pulihkan_job()
+    except Exception:
+        # jangan sampai menggagalkan request yang memicunya
+        logger.exception("Pemulihan job ekstraksi gagal")
+        return
+    for job_id in pending:
+        submit_job(job_id)
+    if gagal or pending:
+        logger.info("Pemulihan job: %d running macet ditandai failed, %d pending dijadwalkan", gagal, len(pending))
+
+
+def _gagal(job_id, message):
+    job = ExtractionJob.objects.get(pk=job_id)
+    job.status = ExtractionJob.STATUS_FAILED
+    job.message = message
+    job.save(update_fields=["status", "message", "updated_at"])
+
+
+def _process_job(job_id):
+    close_old_connections()
+    try:
+        # klaim atomik: job yang sudah diambil proses lain (pulihkan_job) dilewati
+        diambil = ExtractionJob.objects.filter(pk=job_id, status=ExtractionJob.STATUS_PENDING).update(
+            status=ExtractionJob.STATUS_RUNNING, updated_at=timezone.now()
+        )
+        if not diambil:
+            return
+        job = ExtractionJob.objects.get(pk=job_id)
+        if not job.dokumen:
+            _gagal(job_id, "File input job tidak tersimpan, silakan kirim ulang")
+            return
+        try:
+            jobs = [(kind, digest, baca_blob(digest)) for kind, digest in job.dokumen]
+            pib_result, *sppb_results = extract_many(jobs)
+            if getattr(settings, "EXTRACT_PERSIST_RESULTS", True):
+                # langsung, bukan lewat thread arsip: job baru "done" setelah
+                # DokumenPIB/DokumenSPPB-nya tersimpan
+                simpan_set(job.kode_tps, jobs, [pib_result, *sppb_results])
+        except BatasMemoriTerlampaui as e:
+            _gagal(job_id, str(e))
+            return
+        except Exception as e:
+            logger.exception("Job ekstraksi %s gagal", job_id)
+            _gagal(job_id, f"Terjadi kesalahan: {str(e)}")
+            return
+
+        job.status = ExtractionJob.STATUS_DONE
+        job.message = pesan_hasil(pib_result)
+        job.result = {"pib": pib_result, "sppb": sppb_results}
+        job.save(update_fields=["status", "message", "result", "updated_at"])
+    finally:
+        close_old_connections()
@@ -0,0 +1,82 @@
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from extractor import utils
+from extractor.backends import BACKEND_PDFIUM, BACKEND_PDFPLUMBER, BACKENDS, baca_halaman
+
+
+def _parse(pages):
+    """
+    Field hasil tahap regex untuk teks per halaman.
+    """
+    all_text, lines = utils._teks_sppb(pages)
+    if "SURAT PERSETUJUAN PENGELUARAN BARANG" in all_text:
+        return "sppb", utils.parse_sppb(all_text, lines)
+    return "pib", utils.parse_pib(utils._teks_pib(pages))
+
+
+def _field_berbeda(a, b):
+    if not isinstance(a, dict) or not isinstance(b, dict):
+        return ["<dokumen>"] if a != b else []
+    return sorted(k for k in a.keys() | b.keys() if a.get(k) != b.get(k))
+
+
+class Command(BaseCommand):
+    help = "Laporan parity teks & field hasil ekstraksi antar backend atas korpus documents/."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dir", default=os.path.join(settings.BASE_DIR, "documents"))
+        parser.add_argument("--acuan", default=BACKEND_PDFPLUMBER, choices=sorted(BACKENDS))
+        parser.add_argument("--backend", default=BACKEND_PDFIUM, choices=sorted(BACKENDS))
+
+    def handle(self, *args, **options):
+        acuan, backend = options["acuan"], options["backend"]
+        waktu = {acuan: 0.0, backend: 0.0}
+        total = teks_sama = field_sama = 0
+        berbeda, dilewati = [], []
+
+        for root, _, files in os.walk(options["dir"]):
+            for name in sorted(files):
+                path = os.path.join(root, name)
+                hasil = {}
+                try:
+                    for b in (acuan, backend):
+                        t0 = time.perf_counter()
+                        hasil[b] = baca_halaman(path, b)
+                        waktu[b] += time.perf_counter() - t0
+                except Exception as e:
+                    # bukan PDF / rusak: dilaporkan, tidak dihitung di parity
+                    dilewati.append((os.path.relpath(path, options["dir"]), e))
+                    continue
+
+                total += 1
+                if hasil[acuan] == hasil[backend]:
+                    teks_sama += 1
+                    field_sama += 1
+                    continue
+
+                kind, data_acuan = _parse(hasil[acuan])
+                _, data_backend = _parse(hasil[backend])
+                fields = _field_berbeda(data_acuan, data_backend)
+                if fields:
+                    berbeda.append((os.path.relpath(path, options["dir"]), kind, fields))
+                else:
+                    field_sama += 1
+
+        self.stdout.write(f"{total} dokumen | acuan {acuan} vs {backend}")
+        self.stdout.write(f"teks identik : {teks_sama}/{total}")
+        self.stdout.write(f"field identik: {field_sama}/{total}")
+        for path, kind, fields in berbeda:
+            self.stdout.write(f"  BEDA {kind} {path}: {', '.join(fields)}")
+        self.stdout.write(f"dilewati     : {len(dilewati)}")
+        for path, e in dilewati:
+            self.stdout.write(f"  GAGAL {path}: {type(e).__name__}: {e}")
+        if total:
+            a = waktu[acuan] / total * 1000
+            b = waktu[backend] / total * 1000
+            self.stdout.write(
+                f"waktu teks: {acuan} {a:.1f} ms/dok | {backend} {b:.1f} ms/dok | {a / b:.1f}x"
+            )
@@ -0,0 +1,89 @@
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from extractor import utils
+from extractor.backends import baca_halaman
+from extractor.index import DocumentIndex
+from extractor.patterns import RE_BARANG_BARU, RE_BARANG_LAMA, WAJIB_BARANG_BARU, WAJIB_BARANG_LAMA
+
+DOKUMEN_DEFAULT = (
+    # format lama cocok di RE_BARANG_LAMA
+    "CHAN/05010000622320250819046767.pdf",
+    # uraian berantakan: RE_BARANG_LAMA gagal di setiap item, jatuh ke format baru
+    "CHAN/pib1.pdf",
+)
+
+
+def _barang_lama(all_text):
+    # cara lama: kedua regex dijalankan atas seluruh teks dokumen
+    matches = list(RE_BARANG_LAMA.finditer(all_text))
+    if not matches:
+        matches = list(RE_BARANG_BARU.finditer(all_text, all_text.find("Pos Tarif")))
+    return matches
+
+
+def _barang_blok(all_text):
+    idx = DocumentIndex(all_text)
+    matches = list(idx.finditer_blok(RE_BARANG_LAMA, "Kode Brg", WAJIB_BARANG_LAMA))
+    if not matches:
+        matches = list(idx.finditer_blok(RE_BARANG_BARU, "Pos Tarif", WAJIB_BARANG_BARU))
+    return matches
+
+
+def _dokumen_sintetis(path):
+    """
+    (header, item, tail) dari PIB asli; PIB dengan n item = header + item * n + tail.
+    """
+    all_text = utils._teks_pib(baca_halaman(path))
+    matches = _barang_blok(all_text)
+    if not matches:
+        raise CommandError(f"{path}: tidak ada barang")
+    first = matches[0]
+    start = all_text.rfind("\n", 0, first.start()) + 1
+    end = all_text.find("\n", first.end())
+    end = len(all_text) if end == -1 else end + 1
+    return all_text[:start], all_text[start:end], all_text[end:]
+
+
+def _ukur(fn, text, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        n = len(fn(text))
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return n, best
+
+
+class Command(BaseCommand):
+    help = "Benchmark skala tahap barang: regex seluruh teks vs segmentasi per blok item."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--file", action="append", help="PIB sumber (default: dua sampel di documents/)")
+        parser.add_argument("--items", default="10,100,1000,5000")
+        parser.add_argument("--max-lama", type=int, default=100,
+                            help="cara lama hanya diukur sampai jumlah item ini (bisa kuadratik)")
+        parser.add_argument("--repeat", type=int, default=3)
+
+    def handle(self, *args, **options):
+        files = options["file"] or [
+            os.path.join(settings.BASE_DIR, "documents", name) for name in DOKUMEN_DEFAULT
+        ]
+        sizes = [int(n) for n in options["items"].split(",")]
+
+        for path in files:
+            header, item, tail = _dokumen_sintetis(path)
+            self.stdout.write(f"{os.path.basename(path)} (item {len(item)} karakter)")
+            for n in sizes:
+                text = header + item * n + tail
+                found, blok = _ukur(_barang_blok, text, options["repeat"])
+                line = f"  {n:>6} item | blok {blok * 1000:9.2f} ms ({blok / n * 1e6:7.1f} us/item)"
+                if n <= options["max_lama"]:
+                    found_lama, lama = _ukur(_barang_lama, text, options["repeat"])
+                    if found_lama != found:
+                        line += f" | JUMLAH BEDA {found_lama} vs {found}"
+                    line += f" | lama {lama * 1000:9.2f} ms ({lama / n * 1e6:7.1f} us/item) | {lama / blok:.1f}x"
+                self.stdout.write(line)
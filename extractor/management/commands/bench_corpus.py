@@ -0,0 +1,224 @@
+import contextlib
+import json
+import os
+import resource
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from extractor import utils
+from extractor.backends import BACKENDS, backend_aktif, iter_halaman
+
+FOLDER_DEFAULT = ("CHAN", "CHANDRA01", "SDTP")
+
+EXTRACTORS = {
+    "pib": utils.extract_pib,
+    "sppb": utils.extract_sppb,
+}
+
+# metrik yang dibandingkan dengan baseline: nama -> True kalau makin kecil makin baik
+METRIK = {
+    "p50_ms": True,
+    "p95_ms": True,
+    "p99_ms": True,
+    "halaman_per_detik": False,
+}
+
+
+class _Pengukur:
+    """
+    Membungkus utils.iter_halaman selama benchmark untuk menghitung waktu
+    ekstraksi teks PDF dan jumlah halaman yang benar-benar dibaca.
+    Sisa waktu extract_* = tahap regex.
+    """
+
+    def __init__(self):
+        self.pdf = 0.0
+        self.halaman = 0
+
+    def reset(self):
+        self.pdf = 0.0
+        self.halaman = 0
+
+    def iter_halaman(self, source, backend=None, potong=None):
+        halaman = iter_halaman(source, backend, potong)
+        try:
+            while True:
+                t0 = time.perf_counter()
+                try:
+                    text = next(halaman)
+                except StopIteration:
+                    return
+                finally:
+                    self.pdf += time.perf_counter() - t0
+                self.halaman += 1
+                yield text
+        finally:
+            halaman.close()
+
+    @contextlib.contextmanager
+    def aktif(self):
+        asli = utils.iter_halaman
+        utils.iter_halaman = self.iter_halaman
+        try:
+            yield self
+        finally:
+            utils.iter_halaman = asli
+
+
+def _jenis(path, backend):
+    # cukup halaman pertama untuk membedakan SPPB dan PIB
+    halaman = iter_halaman(path, backend)
+    try:
+        first = next(halaman, "")
+    finally:
+        halaman.close()
+    return "sppb" if "SURAT PERSETUJUAN PENGELUARAN BARANG" in first else "pib"
+
+
+def _persentil(values, p):
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[p - 1]
+
+
+def _ringkas(samples):
+    waktu = [s["total"] for s in samples]
+    total = sum(waktu)
+    halaman = sum(s["halaman"] for s in samples)
+    pdf = sum(s["pdf"] for s in samples)
+    return {
+        "sampel": len(samples),
+        "p50_ms": round(_persentil(waktu, 50) * 1000, 3),
+        "p95_ms": round(_persentil(waktu, 95) * 1000, 3),
+        "p99_ms": round(_persentil(waktu, 99) * 1000, 3),
+        "halaman_per_detik": round(halaman / total, 2) if total else 0.0,
+        "pdf_ms": round(pdf / len(samples) * 1000, 3),
+        "regex_ms": round((total - pdf) / len(samples) * 1000, 3),
+    }
+
+
+def _peak_rss_mb():
+    # ru_maxrss dalam KB di Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def _regresi(baseline, hasil, ambang):
+    """
+    Daftar (jenis, metrik, lama, baru, persen) yang memburuk lebih dari ambang persen.
+    """
+    found = []
+    for kind, now in hasil["per_jenis"].items():
+        before = baseline.get("per_jenis", {}).get(kind)
+        if not before:
+            continue
+        for metric, lower_is_better in METRIK.items():
+            old, new = before.get(metric), now.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old * 100
+            worse = change if lower_is_better else -change
+            if worse > ambang:
+                found.append((kind, metric, old, new, change))
+    return found
+
+
+class Command(BaseCommand):
+    help = "Benchmark extract_pib/extract_sppb atas korpus documents/ dengan baseline JSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dir", action="append",
+                            help="folder dokumen (default: documents/CHAN, CHANDRA01, SDTP)")
+        parser.add_argument("--backend", choices=sorted(BACKENDS), help="default: EXTRACT_TEXT_BACKEND")
+        parser.add_argument("--warmup", type=int, default=1, help="putaran pemanasan per dokumen")
+        parser.add_argument("--repeat", type=int, default=3, help="putaran yang diukur per dokumen")
+        parser.add_argument("--simpan", help="tulis hasil ke file JSON ini (baseline)")
+        parser.add_argument("--bandingkan", help="baseline JSON pembanding")
+        parser.add_argument("--ambang", type=float, default=10.0,
+                            help="persen perubahan yang dianggap regresi (default 10)")
+
+    def handle(self, *args, **options):
+        dirs = options["dir"] or [
+            os.path.join(settings.BASE_DIR, "documents", name) for name in FOLDER_DEFAULT
+        ]
+        backend = options["backend"] or backend_aktif()
+        repeat = max(options["repeat"], 1)
+
+        docs = []
+        for folder in dirs:
+            for root, _, files in os.walk(folder):
+                for name in sorted(files):
+                    path = os.path.join(root, name)
+                    try:
+                        docs.append((path, _jenis(path, backend)))
+                    except Exception:
+                        continue
+        if not docs:
+            raise CommandError("Tidak ada dokumen yang bisa dibaca.")
+
+        pengukur = _Pengukur()
+        samples = {}
+        gagal = []
+        rss_awal = _peak_rss_mb()
+        t_mulai = time.perf_counter()
+
+        with pengukur.aktif():
+            for path, kind in docs:
+                extract = EXTRACTORS[kind]
+                try:
+                    for i in range(options["warmup"] + repeat):
+                        pengukur.reset()
+                        t0 = time.perf_counter()
+                        extract(path, backend)
+                        elapsed = time.perf_counter() - t0
+                        if i >= options["warmup"]:
+                            samples.setdefault(kind, []).append(
+                                {"total": elapsed, "pdf": pengukur.pdf, "halaman": pengukur.halaman}
+                            )
+                except Exception as e:
+                    gagal.append({"file": os.path.relpath(path, settings.BASE_DIR), "error": str(e)})
+
+        hasil = {
+            "backend": backend,
+            "dokumen": len(docs),
+            "warmup": options["warmup"],
+            "repeat": repeat,
+            "durasi_detik": round(time.perf_counter() - t_mulai, 2),
+            "peak_rss_mb": _peak_rss_mb(),
+            "peak_rss_awal_mb": rss_awal,
+            "per_jenis": {kind: _ringkas(s) for kind, s in sorted(samples.items())},
+            "gagal": gagal,
+        }
+        semua = [s for kind in sorted(samples) for s in samples[kind]]
+        if semua:
+            hasil["per_jenis"]["semua"] = _ringkas(semua)
+
+        self.stdout.write(
+            f"{len(docs)} dokumen | backend {backend} | warmup {options['warmup']} | repeat {repeat}"
+        )
+        for kind, r in hasil["per_jenis"].items():
+            self.stdout.write(
+                f"{kind:>5}: {r['sampel']} sampel | p50 {r['p50_ms']:.1f} ms | p95 {r['p95_ms']:.1f} ms | "
+                f"p99 {r['p99_ms']:.1f} ms | {r['halaman_per_detik']:.1f} halaman/s | "
+                f"pdf {r['pdf_ms']:.1f} ms + regex {r['regex_ms']:.1f} ms per dok"
+            )
+        self.stdout.write(f"peak RSS: {hasil['peak_rss_mb']} MB (sebelum ekstraksi {rss_awal} MB)")
+        for g in gagal:
+            self.stdout.write(f"  GAGAL {g['file']}: {g['error']}")
+
+        if options["simpan"]:
+            with open(options["simpan"], "w") as f:
+                json.dump(hasil, f, indent=2)
+            self.stdout.write(f"hasil disimpan ke {options['simpan']}")
+
+        if options["bandingkan"]:
+            with open(options["bandingkan"]) as f:
+                baseline = json.load(f)
+            regresi = _regresi(baseline, hasil, options["ambang"])
+            for kind, metric, old, new, change in regresi:
+                self.stdout.write(f"  REGRESI {kind} {metric}: {old} -> {new} ({change:+.1f}%)")
+            if regresi:
+                raise CommandError(f"{len(regresi)} metrik memburuk lebih dari {options['ambang']}%")
+            self.stdout.write(f"tidak ada regresi di atas {options['ambang']}% dibanding {options['bandingkan']}")
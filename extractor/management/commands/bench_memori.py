@@ -0,0 +1,97 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from extractor.backends import BACKENDS
+
+# dijalankan di proses baru per (backend, jumlah halaman) supaya puncak RSS
+# (ru_maxrss) tidak terbawa dari pengukuran sebelumnya. Backend dipanaskan
+# dulu dengan dokumen asli, lalu semua halaman dokumen besar dibaca lewat
+# pipeline yang sama dengan extract_pib (_baca_sampai + _teks_pib).
+_SKRIP = """
+import json, os, resource, time
+os.environ["DJANGO_SETTINGS_MODULE"] = "pib_api.settings"
+import django
+django.setup()
+from extractor.backends import BatasMemoriTerlampaui, aktifkan_budget, baca_halaman
+from extractor.utils import _baca_sampai, _teks_pib
+
+# satu dokumen per proses, sama seperti proses pool
+aktifkan_budget()
+baca_halaman({asli!r}, {backend!r})
+awal = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+t = time.perf_counter()
+hasil = {{"budget": False}}
+try:
+    with open({path!r}, "rb") as f:
+        pages = _baca_sampai(f.read(), {backend!r}, lambda pages: False)
+    hasil["teks"] = len(_teks_pib(pages))
+except BatasMemoriTerlampaui:
+    hasil["budget"] = True
+hasil["detik"] = time.perf_counter() - t
+# ru_maxrss dalam KB (Linux)
+hasil["puncak"] = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - awal) * 1024
+print(json.dumps(hasil))
+"""
+
+
+def _buat_pdf(asli, n_halaman, path):
+    """
+    PDF n_halaman dari halaman-halaman asli yang diulang.
+    """
+    import pypdfium2 as pdfium
+
+    src = pdfium.PdfDocument(asli)
+    doc = pdfium.PdfDocument.new()
+    try:
+        while len(doc) < n_halaman:
+            doc.import_pages(src, list(range(min(len(src), n_halaman - len(doc)))))
+        doc.save(path)
+    finally:
+        doc.close()
+        src.close()
+
+
+class Command(BaseCommand):
+    help = "Benchmark memori: puncak RSS ekstraksi teks terhadap jumlah halaman dokumen."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--pdf", default=os.path.join(settings.BASE_DIR, "documents", "CHAN", "pib4.pdf"),
+                            help="dokumen yang halamannya diulang")
+        parser.add_argument("--halaman", type=int, nargs="+", default=[3, 30, 100, 300])
+        parser.add_argument("--backend", choices=sorted(BACKENDS), action="append",
+                            help="default: semua backend")
+
+    def handle(self, *args, **options):
+        env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+        env.pop("DJANGO_SETTINGS_MODULE", None)
+        budget = getattr(settings, "EXTRACT_MEMORY_BUDGET_MB", 512)
+        self.stdout.write(f"EXTRACT_MEMORY_BUDGET_MB = {budget}")
+        self.stdout.write(f"{'backend':<12}{'halaman':>9}{'puncak MB':>12}{'KB/halaman':>12}{'detik':>9}")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            for backend in options["backend"] or sorted(BACKENDS):
+                for n in options["halaman"]:
+                    path = os.path.join(tmp, f"{n}.pdf")
+                    if not os.path.exists(path):
+                        _buat_pdf(options["pdf"], n, path)
+                    skrip = _SKRIP.format(asli=options["pdf"], path=path, backend=backend)
+                    proc = subprocess.run(
+                        [sys.executable, "-c", skrip], capture_output=True, text=True,
+                        cwd=settings.BASE_DIR, env=env,
+                    )
+                    if proc.returncode != 0:
+                        stderr = proc.stderr.strip()
+                        raise CommandError(stderr.splitlines()[-1] if stderr else "proses gagal")
+                    hasil = json.loads(proc.stdout.strip().splitlines()[-1])
+                    puncak = hasil["puncak"]
+                    catatan = "  melebihi budget" if hasil["budget"] else ""
+                    self.stdout.write(
+                        f"{backend:<12}{n:>9}{puncak / 2**20:12.1f}{puncak / 1024 / n:12.1f}"
+                        f"{hasil['detik']:9.2f}{catatan}"
+                    )
@@ -0,0 +1,114 @@
+import contextlib
+import os
+import re
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from extractor import patterns, utils, varian
+from extractor.backends import baca_halaman
+
+
+class _Uncompiled:
+    """
+    Meniru gaya lama: setiap panggilan memakai re.<fungsi>(pola_string, ..., flags)
+    sehingga lewat lookup cache internal modul re, bukan pattern yang sudah dikompilasi.
+    """
+
+    def __init__(self, compiled):
+        self.pattern = compiled.pattern
+        self.flags = compiled.flags
+
+    def search(self, string, *args):
+        return re.compile(self.pattern, self.flags).search(string, *args)
+
+    def match(self, string, *args):
+        return re.compile(self.pattern, self.flags).match(string, *args)
+
+    def finditer(self, string, *args):
+        return re.compile(self.pattern, self.flags).finditer(string, *args)
+
+    def sub(self, repl, string, count=0):
+        return re.sub(self.pattern, repl, string, count=count, flags=self.flags)
+
+    def split(self, string, maxsplit=0):
+        return re.split(self.pattern, string, maxsplit=maxsplit, flags=self.flags)
+
+
+# modul yang memakai pola registry lewat nama globalnya
+_MODUL = (utils, varian)
+
+
+@contextlib.contextmanager
+def _pola_lama():
+    asli = [
+        (module, name, getattr(module, name))
+        for module in _MODUL for name in patterns.registry() if hasattr(module, name)
+    ]
+    try:
+        for module, name, compiled in asli:
+            setattr(module, name, _Uncompiled(compiled))
+        yield
+    finally:
+        for module, name, compiled in asli:
+            setattr(module, name, compiled)
+
+
+def _teks_dokumen(path):
+    # teks digabung persis seperti extract_sppb
+    return utils._teks_sppb(baca_halaman(path))
+
+
+class Command(BaseCommand):
+    help = "Microbenchmark tahap regex (pola string vs registry terkompilasi) atas korpus documents/."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dir", default=os.path.join(settings.BASE_DIR, "documents"))
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        docs = []
+        for root, _, files in os.walk(options["dir"]):
+            for name in sorted(files):
+                path = os.path.join(root, name)
+                try:
+                    all_text, lines = _teks_dokumen(path)
+                except Exception:
+                    continue
+
+                # klasifikasi varian (halaman pertama) ikut diukur seperti di extract_*
+                if "SURAT PERSETUJUAN PENGELUARAN BARANG" in all_text:
+                    docs.append(("sppb", lambda t=all_text, l=lines: utils.parse_sppb(
+                        t, l, varian=varian.varian_sppb(t))))
+                    continue
+
+                # dokumen tanpa barang (bukan PIB yang lengkap) tidak ikut diukur
+                if not utils.parse_pib(all_text)["barang"]:
+                    continue
+                docs.append(("pib", lambda t=all_text: utils.parse_pib(t, varian=varian.varian_pib(t))))
+
+        self.stdout.write(f"{len(docs)} dokumen, repeat={options['repeat']}")
+
+        def ukur():
+            per_kind = {}
+            for kind, fn in docs:
+                fn()  # warmup
+                t0 = time.perf_counter()
+                for _ in range(options["repeat"]):
+                    fn()
+                per_kind.setdefault(kind, []).append((time.perf_counter() - t0) / options["repeat"])
+            return per_kind
+
+        with _pola_lama():
+            before = ukur()
+        after = ukur()
+
+        for kind in sorted(after):
+            b = statistics.mean(before[kind]) * 1e6
+            a = statistics.mean(after[kind]) * 1e6
+            self.stdout.write(
+                f"{kind}: {len(after[kind])} dok | sebelum {b:.1f} us/dok | "
+                f"sesudah {a:.1f} us/dok | {b / a:.2f}x"
+            )
@@ -0,0 +1,95 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# dijalankan di proses baru: waktu import aplikasi, warmup, lalu dua kali
+# ekstraksi (pertama = request pertama worker, kedua = kondisi hangat)
+_SKRIP = """
+import json, os, sys, time
+t0 = time.perf_counter()
+os.environ["DJANGO_SETTINGS_MODULE"] = "pib_api.settings"
+import django
+django.setup()
+import pib_api.urls
+t_import = time.perf_counter() - t0
+
+from extractor.warmup import warmup
+t1 = time.perf_counter()
+if {warmup!r}:
+    warmup()
+t_warmup = time.perf_counter() - t1
+
+from extractor.utils import extract_pib, extract_sppb
+hasil = {{"import": t_import, "warmup": t_warmup}}
+for kind, fn, path in (("pib", extract_pib, {pib!r}), ("sppb", extract_sppb, {sppb!r})):
+    for label in ("pertama", "kedua"):
+        t = time.perf_counter()
+        fn(path)
+        hasil[kind + "_" + label] = time.perf_counter() - t
+print(json.dumps(hasil))
+"""
+
+
+def _jalankan(args, env):
+    proc = subprocess.run(
+        [sys.executable, *args], capture_output=True, text=True, cwd=settings.BASE_DIR, env=env
+    )
+    if proc.returncode != 0:
+        raise CommandError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "proses gagal")
+    return proc
+
+
+def _profil_import(env, top):
+    """
+    Modul level teratas dengan waktu import kumulatif terbesar (python -X importtime).
+    """
+    skrip = (
+        "import os; os.environ['DJANGO_SETTINGS_MODULE'] = 'pib_api.settings'\n"
+        "import django; django.setup(); import pib_api.urls"
+    )
+    proc = _jalankan(["-X", "importtime", "-c", skrip], env)
+    modules = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # hanya modul yang di-import langsung (tanpa indentasi)
+        if name.startswith("  ") or not cumulative.strip().isdigit():
+            continue
+        modules.append((int(cumulative), name.strip()))
+    return sorted(modules, reverse=True)[:top]
+
+
+class Command(BaseCommand):
+    help = "Benchmark startup worker: waktu import, warmup, dan latensi ekstraksi pertama vs berikutnya."
+
+    def add_arguments(self, parser):
+        docs = os.path.join(settings.BASE_DIR, "documents", "CHAN")
+        parser.add_argument("--pib", default=os.path.join(docs, "pib1.pdf"))
+        parser.add_argument("--sppb", default=os.path.join(docs, "sppb1.pdf"))
+        parser.add_argument("--repeat", type=int, default=3, help="jumlah proses per mode (median)")
+        parser.add_argument("--top", type=int, default=10, help="jumlah modul di profil import")
+
+    def handle(self, *args, **options):
+        env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+        env.pop("DJANGO_SETTINGS_MODULE", None)
+
+        self.stdout.write("Profil import (ms kumulatif, modul level teratas):")
+        for cumulative, name in _profil_import(env, options["top"]):
+            self.stdout.write(f"  {cumulative / 1000:8.1f}  {name}")
+
+        kolom = ("import", "warmup", "pib_pertama", "pib_kedua", "sppb_pertama", "sppb_kedua")
+        self.stdout.write("\nmode           " + "".join(f"{k:>14}" for k in kolom) + "   (ms, median)")
+        for label, warmup in (("tanpa warmup", False), ("dengan warmup", True)):
+            skrip = _SKRIP.format(warmup=warmup, pib=options["pib"], sppb=options["sppb"])
+            runs = []
+            for _ in range(max(options["repeat"], 1)):
+                proc = _jalankan(["-c", skrip], env)
+                runs.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+            median = {k: statistics.median(r[k] for r in runs) * 1000 for k in kolom}
+            self.stdout.write(f"{label:<15}" + "".join(f"{median[k]:14.1f}" for k in kolom))
@@ -0,0 +1,106 @@
+import hashlib
+import os
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from extractor.models import ExtractionJob, UploadedDocument
+from extractor.storage import blob_root, catat_upload, simpan_blob
+
+# blob yang lebih muda dari ini tidak dihapus walau belum ada referensinya:
+# bisa jadi baru ditulis upload yang barisnya belum tersimpan
+UMUR_MINIMAL_DETIK = 3600
+
+
+def _iter_blob():
+    for root, _, files in os.walk(blob_root()):
+        for name in files:
+            if name.endswith(".tmp"):
+                continue
+            yield name.split(".")[0], os.path.join(root, name)
+
+
+def _import_lama(folder):
+    """
+    (kode_tps, nama, isi) dari arsip lama MEDIA_ROOT/documents/<kode_tps>/<nama>.
+    """
+    for tps_code in sorted(os.listdir(folder)):
+        tps_dir = os.path.join(folder, tps_code)
+        if not os.path.isdir(tps_dir):
+            continue
+        for root, _, files in os.walk(tps_dir):
+            for name in sorted(files):
+                path = os.path.join(root, name)
+                with open(path, "rb") as f:
+                    yield tps_code, name, path, f.read()
+
+
+class Command(BaseCommand):
+    help = "Retensi referensi upload dan hapus blob yang tidak direferensikan lagi."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--retensi-hari", type=int,
+                            help="hapus referensi lebih tua dari N hari (default EXTRACT_UPLOAD_RETENTION_DAYS)")
+        parser.add_argument("--import-lama", action="store_true",
+                            help="pindahkan arsip lama MEDIA_ROOT/documents/<kode_tps>/ ke blob store")
+        parser.add_argument("--hapus-lama", action="store_true",
+                            help="dengan --import-lama: hapus file lama setelah di-import")
+        parser.add_argument("--dry-run", action="store_true", help="hanya laporkan, tidak mengubah apa pun")
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        if options["hapus_lama"] and not options["import_lama"]:
+            raise CommandError("--hapus-lama hanya bisa dipakai bersama --import-lama.")
+
+        if options["import_lama"]:
+            folder = os.path.join(settings.MEDIA_ROOT, "documents")
+            if not os.path.isdir(folder):
+                raise CommandError(f"Folder arsip lama {folder} tidak ada.")
+            files, total, digests = 0, 0, set()
+            for tps_code, name, path, data in _import_lama(folder):
+                files += 1
+                total += len(data)
+                digest = hashlib.sha256(data).hexdigest()
+                digests.add(digest)
+                if dry_run:
+                    continue
+                simpan_blob(data, digest)
+                catat_upload(tps_code, name, digest, len(data))
+                if options["hapus_lama"]:
+                    os.remove(path)
+            self.stdout.write(f"import: {files} file ({total} byte) -> {len(digests)} blob unik")
+
+        retensi = options["retensi_hari"]
+        if retensi is None:
+            retensi = getattr(settings, "EXTRACT_UPLOAD_RETENTION_DAYS", None)
+        if retensi is not None:
+            lama = UploadedDocument.objects.filter(terakhir_diupload__lt=timezone.now() - timedelta(days=retensi))
+            n = lama.count() if dry_run else lama.delete()[0]
+            self.stdout.write(f"retensi {retensi} hari: {n} referensi dihapus")
+
+        dipakai = set(UploadedDocument.objects.values_list("digest", flat=True).distinct())
+        # input job yang belum selesai (ExtractionJob.dokumen) juga masih dipakai
+        for dokumen in ExtractionJob.objects.filter(
+            status__in=[ExtractionJob.STATUS_PENDING, ExtractionJob.STATUS_RUNNING]
+        ).values_list("dokumen", flat=True):
+            dipakai.update(digest for _, digest in dokumen)
+        batas = time.time() - UMUR_MINIMAL_DETIK
+        blobs, dihapus, freed = 0, 0, 0
+        for digest, path in _iter_blob():
+            blobs += 1
+            if digest in dipakai:
+                continue
+            stat = os.stat(path)
+            if stat.st_mtime > batas:
+                continue
+            dihapus += 1
+            freed += stat.st_size
+            if not dry_run:
+                os.remove(path)
+        keterangan = " (dry run)" if dry_run else ""
+        self.stdout.write(
+            f"blob: {blobs} total, {dihapus} tanpa referensi dihapus, {freed} byte dibebaskan{keterangan}"
+        )
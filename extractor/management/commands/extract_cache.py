@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from extractor.cache import get_result_cache
+
+
+class Command(BaseCommand):
+    help = "Lihat statistik atau invalidasi cache hasil ekstraksi."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clear", action="store_true", help="Hapus semua entri cache (semua versi).")
+        parser.add_argument("--purge-stale", action="store_true", help="Hapus entri dari versi extractor lama.")
+
+    def handle(self, *args, **options):
+        cache = get_result_cache()
+        if cache is None:
+            self.stdout.write("Cache ekstraksi tidak aktif (EXTRACT_CACHE_ENABLED = False).")
+            return
+
+        if options["clear"]:
+            n = cache.invalidate(all_versions=True)
+            self.stdout.write(f"{n} entri cache dihapus.")
+        elif options["purge_stale"]:
+            n = cache.invalidate()
+            self.stdout.write(f"{n} entri cache versi lama dihapus.")
+
+        for key, value in cache.stats().items():
+            self.stdout.write(f"{key}: {value}")
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from extractor.jobs import _process_job, pulihkan_job
+from extractor.models import ExtractionJob
+
+
+class Command(BaseCommand):
+    help = (
+        "Pulihkan job ekstraksi setelah worker restart/deploy: job running yang "
+        "macet ditandai failed, job pending dijalankan ulang."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--menit", type=int, default=30,
+                            help="job running yang tidak berubah lebih dari N menit dianggap macet")
+        parser.add_argument("--tanpa-jalankan", action="store_true",
+                            help="hanya tandai job macet, job pending tidak dijalankan")
+
+    def handle(self, *args, **options):
+        gagal, pending = pulihkan_job(options["menit"])
+        self.stdout.write(f"{gagal} job running macet ditandai failed, {len(pending)} job pending")
+        if options["tanpa_jalankan"]:
+            return
+        for job_id in pending:
+            # job yang sempat diambil worker lain dilewati (_process_job mengklaim atomik)
+            _process_job(job_id)
+            job = ExtractionJob.objects.get(pk=job_id)
+            self.stdout.write(f"  {job_id}: {job.status} {job.message}")
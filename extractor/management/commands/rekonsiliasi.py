@@ -0,0 +1,53 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from extractor.reconcile import COCOK, TANPA_PASANGAN, TIDAK_COCOK, hitung, rekonsiliasi, ringkasan_baru
+
+
+def _tanggal(value):
+    if value is None:
+        return None
+    try:
+        parsed = parse_date(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise CommandError(f"Tanggal {value!r} harus berformat YYYY-MM-DD")
+    return parsed
+
+
+class Command(BaseCommand):
+    help = "Rekonsiliasi PIB-SPPB tersimpan (hash join) untuk satu TPS dan rentang tanggal pendaftaran."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tps", help="kode TPS (default: semua)")
+        parser.add_argument("--dari", help="tanggal pendaftaran awal, YYYY-MM-DD")
+        parser.add_argument("--sampai", help="tanggal pendaftaran akhir, YYYY-MM-DD")
+        parser.add_argument("--status", choices=(COCOK, TIDAK_COCOK, TANPA_PASANGAN),
+                            help="hanya tulis baris dengan status ini")
+        parser.add_argument("--output", help="tulis semua baris hasil ke file NDJSON ini")
+
+    def handle(self, *args, **options):
+        records = rekonsiliasi(options["tps"], _tanggal(options["dari"]), _tanggal(options["sampai"]))
+        counts = ringkasan_baru()
+        t0 = time.perf_counter()
+        output = open(options["output"], "w") if options["output"] else None
+        try:
+            for record in records:
+                hitung(counts, record)
+                if output and (not options["status"] or record["status"] == options["status"]):
+                    output.write(json.dumps(record) + "\n")
+        finally:
+            if output:
+                output.close()
+        elapsed = time.perf_counter() - t0
+
+        total = sum(counts.values())
+        self.stdout.write(f"{total} baris dalam {elapsed:.2f} s")
+        for name, value in counts.items():
+            self.stdout.write(f"  {name}: {value}")
+        if output:
+            self.stdout.write(f"hasil ditulis ke {options['output']}")
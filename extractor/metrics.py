@@ -0,0 +1,294 @@
+"""
+Metrics Prometheus untuk /metrics. Semua proses worker menulis ke satu file
+SQLite (WAL), jadi hasil scrape dari worker mana pun sudah teragregasi.
+"""
+import logging
+import os
+import sqlite3
+import threading
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# batas bucket histogram latensi (detik)
+BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, float("inf"))
+
+# nama -> (tipe, keterangan)
+METRIK = {
+    "extract_requests_total": ("counter", "Request ekstraksi per endpoint dan hasil."),
+    "extract_request_duration_seconds": ("histogram", "Durasi request ekstraksi."),
+    "extract_document_duration_seconds": ("histogram", "Durasi ekstraksi per file, per jenis dokumen dan tahap."),
+    "extract_pages_total": ("counter", "Halaman PDF yang diekstrak."),
+    "extract_documents_total": ("counter", "File yang diekstrak per jenis dokumen dan varian formulir."),
+    "extract_upload_bytes_total": ("counter", "Byte file yang di-upload."),
+    "extract_cache_hits_total": ("counter", "File yang hasilnya diambil dari cache."),
+    "extract_cache_misses_total": ("counter", "File yang tidak ada di cache."),
+    "extract_cache_hit_ratio": ("gauge", "hits / (hits + misses) sejak store dibuat."),
+    "extract_requests_in_flight": ("gauge", "Request ekstraksi yang sedang diproses."),
+    "extract_admission_active": ("gauge", "Request yang memegang slot ekstraksi (admission control)."),
+    "extract_admission_queue_depth": ("gauge", "Request yang menunggu slot ekstraksi."),
+    "extract_admission_rejected_total": ("counter", "Request yang ditolak 429 per endpoint dan alasan."),
+    "extract_archive_sync_total": ("counter", "Upload yang diarsipkan langsung karena antrian arsip penuh."),
+}
+
+
+def _labels(labels):
+    return ",".join(f'{k}="{_escape(v)}"' for k, v in sorted(labels.items()))
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _le(bound):
+    return "+Inf" if bound == float("inf") else repr(bound)
+
+
+def _pid_hidup(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class MetricsStore:
+    """
+    Counter dan histogram disimpan sebagai jumlah (di-upsert, jadi penjumlahan
+    antar proses otomatis); gauge disimpan per pid dan hanya pid yang masih
+    hidup yang dijumlahkan saat render.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = str(db_path)
+        self._local = threading.local()
+        self._init_db()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self):
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS metric_counter ("
+            " name TEXT NOT NULL, labels TEXT NOT NULL, value REAL NOT NULL,"
+            " PRIMARY KEY (name, labels))"
+        )
+        # bucket non-kumulatif; dijumlahkan kumulatif saat render
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS metric_bucket ("
+            " name TEXT NOT NULL, labels TEXT NOT NULL, le TEXT NOT NULL, value REAL NOT NULL,"
+            " PRIMARY KEY (name, labels, le))"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS metric_gauge ("
+            " name TEXT NOT NULL, labels TEXT NOT NULL, pid INTEGER NOT NULL, value REAL NOT NULL,"
+            " PRIMARY KEY (name, labels, pid))"
+        )
+        conn.commit()
+
+    def catat(self, counters=(), histograms=()):
+        """
+        Tulis banyak perubahan dalam satu transaksi.
+        counters: (nama, labels, tambahan), histograms: (nama, labels, nilai).
+        """
+        counter_rows = [(name, _labels(labels), value) for name, labels, value in counters]
+        bucket_rows = []
+        for name, labels, value in histograms:
+            key = _labels(labels)
+            bound = next(b for b in BUCKETS if value <= b)
+            bucket_rows.append((name, key, _le(bound), 1))
+            counter_rows.append((f"{name}_sum", key, value))
+            counter_rows.append((f"{name}_count", key, 1))
+
+        conn = self._conn()
+        with conn:
+            conn.executemany(
+                "INSERT INTO metric_counter (name, labels, value) VALUES (?, ?, ?)"
+                " ON CONFLICT (name, labels) DO UPDATE SET value = value + excluded.value",
+                counter_rows,
+            )
+            conn.executemany(
+                "INSERT INTO metric_bucket (name, labels, le, value) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT (name, labels, le) DO UPDATE SET value = value + excluded.value",
+                bucket_rows,
+            )
+
+    def gauge_tambah(self, name, labels, delta):
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT INTO metric_gauge (name, labels, pid, value) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT (name, labels, pid) DO UPDATE SET value = value + excluded.value",
+                (name, _labels(labels), os.getpid(), delta),
+            )
+
+    def render(self):
+        """
+        Semua metrics dalam format teks Prometheus.
+        """
+        conn = self._conn()
+        counters = {}
+        for name, labels, value in conn.execute("SELECT name, labels, value FROM metric_counter"):
+            counters.setdefault(name, []).append((labels, value))
+
+        buckets = {}
+        for name, labels, le, value in conn.execute("SELECT name, labels, le, value FROM metric_bucket"):
+            buckets.setdefault((name, labels), {})[le] = value
+
+        # gauge dari proses yang sudah mati dibuang, bukan ikut dijumlahkan
+        gauges = {}
+        mati = set()
+        for name, labels, pid, value in conn.execute("SELECT name, labels, pid, value FROM metric_gauge"):
+            if pid in mati or not _pid_hidup(pid):
+                mati.add(pid)
+                continue
+            gauges.setdefault(name, {}).setdefault(labels, 0.0)
+            gauges[name][labels] += value
+        if mati:
+            with conn:
+                conn.executemany("DELETE FROM metric_gauge WHERE pid = ?", [(pid,) for pid in mati])
+
+        hits = sum(v for _, v in counters.get("extract_cache_hits_total", []))
+        misses = sum(v for _, v in counters.get("extract_cache_misses_total", []))
+        if hits + misses:
+            gauges["extract_cache_hit_ratio"] = {"": hits / (hits + misses)}
+
+        out = []
+        for name, (kind, help_text) in METRIK.items():
+            out.append(f"# HELP {name} {help_text}")
+            out.append(f"# TYPE {name} {kind}")
+            if kind == "counter":
+                for labels, value in sorted(counters.get(name, [])):
+                    out.append(_baris(name, labels, value))
+            elif kind == "gauge":
+                for labels, value in sorted(gauges.get(name, {}).items()):
+                    out.append(_baris(name, labels, value))
+            else:
+                for labels, value in sorted(counters.get(f"{name}_count", [])):
+                    per_le = buckets.get((name, labels), {})
+                    total = 0
+                    for bound in BUCKETS:
+                        total += per_le.get(_le(bound), 0)
+                        le = f'le="{_le(bound)}"'
+                        out.append(_baris(f"{name}_bucket", f"{labels},{le}" if labels else le, total))
+                    sums = dict(counters.get(f"{name}_sum", []))
+                    out.append(_baris(f"{name}_sum", labels, sums.get(labels, 0)))
+                    out.append(_baris(f"{name}_count", labels, value))
+        return "\n".join(out) + "\n"
+
+
+def _baris(name, labels, value):
+    value = int(value) if float(value).is_integer() else value
+    return f"{name}{{{labels}}} {value}" if labels else f"{name} {value}"
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_metrics():
+    """
+    Store metrics per proses (file SQLite-nya dipakai bersama). None kalau
+    EXTRACT_METRICS_ENABLED = False.
+    """
+    global _store
+    if not getattr(settings, "EXTRACT_METRICS_ENABLED", True):
+        return None
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = MetricsStore(getattr(settings, "EXTRACT_METRICS_PATH", "extract_metrics.sqlite3"))
+    return _store
+
+
+def catat_request(endpoint, outcome, duration, timer=None):
+    """
+    Catat satu request selesai: jumlah per hasil, durasi, dan (dari timer)
+    durasi per tahap tiap file, halaman, varian formulir, byte upload, dan
+    cache hit/miss.
+    Gagal menulis metrics tidak boleh menggagalkan request.
+    """
+    store = get_metrics()
+    if store is None:
+        return
+    counters = [("extract_requests_total", {"endpoint": endpoint, "outcome": outcome}, 1)]
+    histograms = [("extract_request_duration_seconds", {"endpoint": endpoint}, duration)]
+    if timer is not None:
+        counts = timer.counts
+        if counts.get("bytes_upload"):
+            counters.append(("extract_upload_bytes_total", {"endpoint": endpoint}, counts["bytes_upload"]))
+        if counts.get("cache_hit"):
+            counters.append(("extract_cache_hits_total", {}, counts["cache_hit"]))
+        if counts.get("cache_miss"):
+            counters.append(("extract_cache_misses_total", {}, counts["cache_miss"]))
+        for kind, _, file_timer in timer.files:
+            if file_timer.counts.get("halaman"):
+                counters.append(("extract_pages_total", {"kind": kind}, file_timer.counts["halaman"]))
+            if file_timer.labels.get("varian"):
+                counters.append(
+                    ("extract_documents_total", {"kind": kind, "varian": file_timer.labels["varian"]}, 1)
+                )
+            for stage_name, seconds in file_timer.stages.items():
+                histograms.append(
+                    ("extract_document_duration_seconds", {"kind": kind, "stage": stage_name}, seconds)
+                )
+    try:
+        store.catat(counters, histograms)
+    except Exception:
+        logger.exception("Gagal mencatat metrics")
+
+
+def in_flight(endpoint, delta):
+    store = get_metrics()
+    if store is None:
+        return
+    try:
+        store.gauge_tambah("extract_requests_in_flight", {"endpoint": endpoint}, delta)
+    except Exception:
+        logger.exception("Gagal mencatat metrics")
+
+
+def catat_admission(aktif=0, antrian=0):
+    """
+    Perubahan gauge admission control (lihat admission.py).
+    """
+    store = get_metrics()
+    if store is None:
+        return
+    try:
+        if aktif:
+            store.gauge_tambah("extract_admission_active", {}, aktif)
+        if antrian:
+            store.gauge_tambah("extract_admission_queue_depth", {}, antrian)
+    except Exception:
+        logger.exception("Gagal mencatat metrics")
+
+
+def catat_ditolak(endpoint, alasan):
+    store = get_metrics()
+    if store is None:
+        return
+    try:
+        store.catat([("extract_admission_rejected_total", {"endpoint": endpoint, "alasan": alasan}, 1)])
+    except Exception:
+        logger.exception("Gagal mencatat metrics")
+
+
+def catat_arsip_langsung():
+    store = get_metrics()
+    if store is None:
+        return
+    try:
+        store.catat([("extract_archive_sync_total", {}, 1)])
+    except Exception:
+        logger.exception("Gagal mencatat metrics")
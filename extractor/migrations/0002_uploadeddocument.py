@@ -0,0 +1,31 @@
+# Generated by Django 5.2.5 on 2026-10-18 10:19
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('extractor', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadedDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kode_tps', models.CharField(max_length=50)),
+                ('digest', models.CharField(db_index=True, max_length=64)),
+                ('nama', models.CharField(max_length=255)),
+                ('ukuran', models.PositiveBigIntegerField()),
+                ('jumlah_upload', models.PositiveIntegerField(default=1)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('terakhir_diupload', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+            options={
+                'ordering': ['-terakhir_diupload'],
+                'constraints': [models.UniqueConstraint(fields=('kode_tps', 'digest'), name='upload_unik_per_tps')],
+            },
+        ),
+    ]
@@ -0,0 +1,132 @@
+# Generated by Django 5.2.5 on 2026-10-18 10:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('extractor', '0002_uploadeddocument'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Importir',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('npwp', models.CharField(max_length=32, unique=True)),
+                ('nama', models.CharField(blank=True, default='', max_length=255)),
+                ('alamat', models.TextField(blank=True, default='')),
+                ('nib', models.CharField(blank=True, default='', max_length=32)),
+                ('nitku', models.CharField(blank=True, default='', max_length=32)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'importir',
+            },
+        ),
+        migrations.CreateModel(
+            name='PPJK',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('npwp', models.CharField(max_length=32, unique=True)),
+                ('nama', models.CharField(blank=True, default='', max_length=255)),
+                ('alamat', models.TextField(blank=True, default='')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'PPJK',
+                'verbose_name_plural': 'PPJK',
+            },
+        ),
+        migrations.CreateModel(
+            name='DokumenPIB',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kode_tps', models.CharField(max_length=50)),
+                ('digest', models.CharField(max_length=64)),
+                ('header_only', models.BooleanField(default=False)),
+                ('nomor_pengajuan', models.CharField(blank=True, db_index=True, default='', max_length=32)),
+                ('tanggal_pengajuan', models.DateField(blank=True, null=True)),
+                ('kantor_pabean', models.CharField(blank=True, default='', max_length=255)),
+                ('nomor_pendaftaran', models.CharField(blank=True, db_index=True, default='', max_length=32)),
+                ('tanggal_pendaftaran', models.DateField(blank=True, null=True)),
+                ('house_bl_awb', models.CharField(blank=True, db_index=True, default='', max_length=64)),
+                ('master_bl_awb', models.CharField(blank=True, db_index=True, default='', max_length=64)),
+                ('data', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('importir', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='pib', to='extractor.importir')),
+            ],
+            options={
+                'verbose_name': 'dokumen PIB',
+                'verbose_name_plural': 'dokumen PIB',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DokumenSPPB',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kode_tps', models.CharField(max_length=50)),
+                ('digest', models.CharField(max_length=64)),
+                ('nomor_sppb', models.CharField(blank=True, db_index=True, default='', max_length=64)),
+                ('tanggal_sppb', models.DateField(blank=True, null=True)),
+                ('nomor_aju', models.CharField(blank=True, db_index=True, default='', max_length=32)),
+                ('nomor_pendaftaran', models.CharField(blank=True, db_index=True, default='', max_length=32)),
+                ('tanggal_pendaftaran', models.DateField(blank=True, null=True)),
+                ('nomor_awb', models.CharField(blank=True, db_index=True, default='', max_length=64)),
+                ('tanggal_awb', models.DateField(blank=True, null=True)),
+                ('data', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('pib', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='sppb', to='extractor.dokumenpib')),
+                ('importir', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='sppb', to='extractor.importir')),
+                ('ppjk', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='sppb', to='extractor.ppjk')),
+            ],
+            options={
+                'verbose_name': 'dokumen SPPB',
+                'verbose_name_plural': 'dokumen SPPB',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='BarangPIB',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('urutan', models.PositiveIntegerField()),
+                ('uraian', models.TextField(blank=True, default='')),
+                ('kondisi', models.CharField(blank=True, default='', max_length=32)),
+                ('negara', models.CharField(blank=True, default='', max_length=64)),
+                ('hs_code', models.CharField(blank=True, db_index=True, default='', max_length=16)),
+                ('jumlah_satuan', models.CharField(blank=True, default='', max_length=32)),
+                ('qty', models.CharField(blank=True, default='', max_length=32)),
+                ('kode_satuan', models.CharField(blank=True, default='', max_length=16)),
+                ('nilai_pabean', models.CharField(blank=True, default='', max_length=32)),
+                ('pib', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='barang', to='extractor.dokumenpib')),
+            ],
+            options={
+                'verbose_name': 'barang PIB',
+                'verbose_name_plural': 'barang PIB',
+                'ordering': ['pib', 'urutan'],
+                'constraints': [models.UniqueConstraint(fields=('pib', 'urutan'), name='barang_urutan_unik')],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='dokumenpib',
+            index=models.Index(fields=['kode_tps', '-created_at'], name='pib_tps_created'),
+        ),
+        migrations.AddConstraint(
+            model_name='dokumenpib',
+            constraint=models.UniqueConstraint(fields=('kode_tps', 'digest'), name='pib_unik_per_tps'),
+        ),
+        migrations.AddIndex(
+            model_name='dokumensppb',
+            index=models.Index(fields=['kode_tps', '-created_at'], name='sppb_tps_created'),
+        ),
+        migrations.AddConstraint(
+            model_name='dokumensppb',
+            constraint=models.UniqueConstraint(fields=('kode_tps', 'digest'), name='sppb_unik_per_tps'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.5 on 2026-10-18 10:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('extractor', '0003_dokumen_pib_sppb'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='dokumenpib',
+            index=models.Index(fields=['kode_tps', 'tanggal_pendaftaran'], name='pib_tps_pendaftaran'),
+        ),
+        migrations.AddIndex(
+            model_name='dokumensppb',
+            index=models.Index(fields=['kode_tps', 'tanggal_pendaftaran'], name='sppb_tps_pendaftaran'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 11:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('extractor', '0004_index_rekonsiliasi'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='extractionjob',
+            name='dokumen',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
@@ -1,3 +1,191 @@
+import uuid
+
 from django.db import models
+from django.utils import timezone
+
+
+class ExtractionJob(models.Model):
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_DONE, "Done"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    kode_tps = models.CharField(max_length=50)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING, db_index=True)
+    message = models.TextField(blank=True, default="")
+    # [[kind, digest], ...] file input (PIB dulu, lalu SPPB); isinya di blob
+    # store (storage.py) supaya job bisa dijalankan ulang setelah worker restart
+    dokumen = models.JSONField(default=list, blank=True)
+    # {"pib": {...}, "sppb": [...]} setelah job selesai
+    result = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.kode_tps} {self.id} ({self.status})"
+
+
+class UploadedDocument(models.Model):
+    """
+    Upload file per TPS. Isi file ada di blob store (storage.py) dengan nama
+    sha256-nya; file yang sama dari TPS yang sama cukup satu baris.
+    """
+    kode_tps = models.CharField(max_length=50)
+    digest = models.CharField(max_length=64, db_index=True)
+    # nama file asli pada upload terakhir
+    nama = models.CharField(max_length=255)
+    ukuran = models.PositiveBigIntegerField()
+    jumlah_upload = models.PositiveIntegerField(default=1)
+    created_at = models.DateTimeField(auto_now_add=True)
+    terakhir_diupload = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        ordering = ["-terakhir_diupload"]
+        constraints = [
+            models.UniqueConstraint(fields=["kode_tps", "digest"], name="upload_unik_per_tps"),
+        ]
+
+    def __str__(self):
+        return f"{self.kode_tps} {self.nama} ({self.digest[:12]})"
+
+
+class Importir(models.Model):
+    # npwp hanya angka (PIB: kolom identitas "npwp / nitku", SPPB: kolom npwp)
+    npwp = models.CharField(max_length=32, unique=True)
+    nama = models.CharField(max_length=255, blank=True, default="")
+    alamat = models.TextField(blank=True, default="")
+    nib = models.CharField(max_length=32, blank=True, default="")
+    nitku = models.CharField(max_length=32, blank=True, default="")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "importir"
+
+    def __str__(self):
+        return f"{self.npwp} {self.nama}"
+
+
+class PPJK(models.Model):
+    npwp = models.CharField(max_length=32, unique=True)
+    nama = models.CharField(max_length=255, blank=True, default="")
+    alamat = models.TextField(blank=True, default="")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "PPJK"
+        verbose_name_plural = "PPJK"
+
+    def __str__(self):
+        return f"{self.npwp} {self.nama}"
+
+
+class DokumenPIB(models.Model):
+    """
+    Hasil ekstraksi PIB. data = hasil extract_pib apa adanya (bentuk yang sama
+    dengan respon /api/extract/); kolom lain salinan field yang dicari/di-index.
+    Satu baris per (kode_tps, digest): upload ulang file yang sama memperbarui baris.
+    """
+    kode_tps = models.CharField(max_length=50)
+    digest = models.CharField(max_length=64)
+    # True kalau diekstrak dengan header_only (tanpa barang)
+    header_only = models.BooleanField(default=False)
+    nomor_pengajuan = models.CharField(max_length=32, blank=True, default="", db_index=True)
+    tanggal_pengajuan = models.DateField(null=True, blank=True)
+    kantor_pabean = models.CharField(max_length=255, blank=True, default="")
+    nomor_pendaftaran = models.CharField(max_length=32, blank=True, default="", db_index=True)
+    tanggal_pendaftaran = models.DateField(null=True, blank=True)
+    house_bl_awb = models.CharField(max_length=64, blank=True, default="", db_index=True)
+    master_bl_awb = models.CharField(max_length=64, blank=True, default="", db_index=True)
+    importir = models.ForeignKey(Importir, null=True, blank=True, on_delete=models.SET_NULL, related_name="pib")
+    data = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        verbose_name = "dokumen PIB"
+        verbose_name_plural = "dokumen PIB"
+        constraints = [
+            models.UniqueConstraint(fields=["kode_tps", "digest"], name="pib_unik_per_tps"),
+        ]
+        indexes = [
+            models.Index(fields=["kode_tps", "-created_at"], name="pib_tps_created"),
+            # rentang tanggal untuk rekonsiliasi (reconcile.py)
+            models.Index(fields=["kode_tps", "tanggal_pendaftaran"], name="pib_tps_pendaftaran"),
+        ]
+
+    def __str__(self):
+        return f"{self.kode_tps} {self.nomor_pengajuan or self.digest[:12]}"
+
+
+class BarangPIB(models.Model):
+    # nilai disimpan sebagai teks persis seperti di dokumen (qty memakai koma desimal)
+    pib = models.ForeignKey(DokumenPIB, on_delete=models.CASCADE, related_name="barang")
+    urutan = models.PositiveIntegerField()
+    uraian = models.TextField(blank=True, default="")
+    kondisi = models.CharField(max_length=32, blank=True, default="")
+    negara = models.CharField(max_length=64, blank=True, default="")
+    hs_code = models.CharField(max_length=16, blank=True, default="", db_index=True)
+    jumlah_satuan = models.CharField(max_length=32, blank=True, default="")
+    qty = models.CharField(max_length=32, blank=True, default="")
+    kode_satuan = models.CharField(max_length=16, blank=True, default="")
+    nilai_pabean = models.CharField(max_length=32, blank=True, default="")
+
+    class Meta:
+        ordering = ["pib", "urutan"]
+        verbose_name = "barang PIB"
+        verbose_name_plural = "barang PIB"
+        constraints = [
+            models.UniqueConstraint(fields=["pib", "urutan"], name="barang_urutan_unik"),
+        ]
+
+    def __str__(self):
+        return f"{self.pib_id}#{self.urutan} {self.hs_code}"
+
+
+class DokumenSPPB(models.Model):
+    """
+    Hasil ekstraksi SPPB, sama seperti DokumenPIB. pib = PIB yang di-upload
+    bersama SPPB ini (kalau ada); relasi lintas upload lewat nomor_aju.
+    """
+    kode_tps = models.CharField(max_length=50)
+    digest = models.CharField(max_length=64)
+    pib = models.ForeignKey(DokumenPIB, null=True, blank=True, on_delete=models.SET_NULL, related_name="sppb")
+    nomor_sppb = models.CharField(max_length=64, blank=True, default="", db_index=True)
+    tanggal_sppb = models.DateField(null=True, blank=True)
+    nomor_aju = models.CharField(max_length=32, blank=True, default="", db_index=True)
+    nomor_pendaftaran = models.CharField(max_length=32, blank=True, default="", db_index=True)
+    tanggal_pendaftaran = models.DateField(null=True, blank=True)
+    nomor_awb = models.CharField(max_length=64, blank=True, default="", db_index=True)
+    tanggal_awb = models.DateField(null=True, blank=True)
+    importir = models.ForeignKey(Importir, null=True, blank=True, on_delete=models.SET_NULL, related_name="sppb")
+    ppjk = models.ForeignKey(PPJK, null=True, blank=True, on_delete=models.SET_NULL, related_name="sppb")
+    data = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        verbose_name = "dokumen SPPB"
+        verbose_name_plural = "dokumen SPPB"
+        constraints = [
+            models.UniqueConstraint(fields=["kode_tps", "digest"], name="sppb_unik_per_tps"),
+        ]
+        indexes = [
+            models.Index(fields=["kode_tps", "-created_at"], name="sppb_tps_created"),
+            # rentang tanggal untuk rekonsiliasi (reconcile.py)
+            models.Index(fields=["kode_tps", "tanggal_pendaftaran"], name="sppb_tps_pendaftaran"),
+        ]
 
-# Create your models here.
+    def __str__(self):
+        return f"{self.kode_tps} {self.nomor_sppb or self.digest[:12]}"
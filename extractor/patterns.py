@@ -0,0 +1,104 @@
+"""
+Registry regex yang sudah dikompilasi, dipakai bersama oleh utils.py, utils_bp.py,
+varian.py, dan templates.py.
+Semua pola dikompilasi sekali saat import, bukan di setiap pemanggilan/loop.
+"""
+import re
+
+# ===== PIB: data umum =====
+RE_NOMOR_PENGAJUAN = re.compile(r"Nomor Pengajuan\s*:([0-9]+)\s*Tanggal Pengajuan\s*:([0-9-]+)")
+RE_KANTOR_PABEAN = re.compile(r"Kantor Pabean\s*:([A-Z0-9\s\-\.\(\)]+)")
+RE_IDENTITAS = re.compile(r"2\. Identitas\s*:\s*([0-9 /]+)")
+RE_NAMA_ALAMAT = re.compile(r"3\. Nama, Alamat\s*:(.*?)\n", re.S)
+RE_NIB = re.compile(r"5\. NIB\s*:\s*([0-9]+)")
+RE_INVOICE = re.compile(r"15\. Invoice\s*: No\. ([0-9]+)\s*Tgl\.([0-9-]+)")
+RE_PERKIRAAN_TIBA = re.compile(r"11\. Perkiraan Tanggal Tiba\s*:([0-9-]+)")
+RE_PELABUHAN_MUAT = re.compile(r"12\. Pelabuhan Muat\s*:(.*?)\n")
+RE_PELABUHAN_TRANSIT = re.compile(r"13\. Pelabuhan Transit\s*:(.*?)\n")
+RE_PELABUHAN_TUJUAN = re.compile(r"14\. Pelabuhan Tujuan\s*:(.*?)\n")
+RE_PENDAFTARAN = re.compile(r"Nomor\s*:\s*([0-9]+)\s*Tanggal\s*:\s*([0-9-]+)")
+RE_PENDAFTARAN_ALT = re.compile(r"Nomor dan Tanggal Pendaftaran\s*([0-9]+)\s*([0-9-]+)")
+RE_HOUSE_BL_AWB = re.compile(r"House[-\s]?BL/AWB\s*:?\s*([A-Z0-9/.-]+)", re.I)
+RE_MASTER_BL_AWB = re.compile(r"Master[-\s]?BL/AWB\s*:?\s*([A-Z0-9/.-]+)", re.I)
+# "Halaman ke-1 dari2": jumlah halaman formulir PIB (lembar barang lanjutan ikut dihitung)
+RE_HALAMAN_PIB = re.compile(r"Halaman ke-\s*1\s*dari\s*(\d+)")
+
+# ===== PIB: barang =====
+RE_BARANG_LAMA = re.compile(r"(\d{4,8})\s+Kode Brg.*?BYR\s+([\d\.,-]+)\s*-\s*([\d\.,-]+).*?Uraian\s*:(.*?)Kondisi Brg\s*:\s*([A-Z]+).*?Negara\s*:\s*([A-Z\s\(\)]+)", re.S)
+RE_BARANG_BARU = re.compile(r"Pos Tarif\s*:\s*(\d{4,8}).*?BYR\s+([\d\.,-]+)\s*-\s*([\d\.,-]+)(.*?)Kondisi Brg\s*:\s*([A-Z]+).*?Negara\s*:\s*([A-Z\s\(\)]+)", re.S)
+# literal yang wajib ada di blok item agar regex di atas bisa cocok
+WAJIB_BARANG_LAMA = ("BYR", "Uraian", "Kondisi Brg", "Negara")
+WAJIB_BARANG_BARU = ("BYR", "Kondisi Brg", "Negara")
+RE_SPASI = re.compile(r"\s+")
+RE_BERAT_BERSIH = re.compile(r"Berat Bersih\s*\(Kg\)\s*([\d\.,]+)")
+RE_METRIC_TON = re.compile(r"\bMETRIC\s+TON\b", re.I)
+RE_KODE_SATUAN = re.compile(r"\(([A-Z0-9\-]+)\)")
+# varian lama di utils_bp.py: "NAMA SATUAN (KODE)"
+RE_NAMA_KODE_SATUAN = re.compile(r"([A-Z ]+)\s*\(([A-Z0-9\- ]+)\)")
+
+# ===== PIB: sarana pengangkutan =====
+RE_SARANA_LABEL = re.compile(r"^10\.\s*Nama Sarana Pengangkutan\s*&\s*No\.\s*Voy/Flight\s*dan\s*Bendera\s*:?", re.I)
+RE_POIN_BERIKUTNYA = re.compile(r"^\d{1,2}\.\s")
+RE_KODE_NEGARA = re.compile(r"^([A-Z]{2,3})$")
+RE_KODE_NEGARA_TAIL = re.compile(r"\b([A-Z]{2,3})\b$")
+RE_DIGIT = re.compile(r"\d")
+RE_NEGARA = re.compile(r"^[A-Z][A-Z\s,\.()-]+$")
+RE_BENDERA = re.compile(r"^[A-Z][A-Z\s,]+$")
+RE_FLIGHT_BENDERA = re.compile(r"^([A-Z0-9]{1,4}\d{2,6}(?:-[A-Z0-9]+)?)\s+([A-Z][A-Z\s,]+)$")
+RE_FLIGHT_AIRLINE = re.compile(r"^([A-Z]{1,3}\d{2,6})\s+([A-Z][A-Z\s,]+)$")
+RE_FLIGHT_NUMERIK = re.compile(r"^(\d{1,6}(?:-[A-Z0-9]+)?)\s+([A-Z][A-Z\s,]+)$")
+RE_FLIGHT_ALNUM = re.compile(r"^([A-Z0-9]{2,8})\s+([A-Z][A-Z\s,]+)$")
+RE_ANGKA_NEGARA = re.compile(r"^(\d{1,4})\s+([A-Z][A-Z\s,]+)$")
+RE_ANGKA_SAJA = re.compile(r"^(\d{1,4})\s*$")
+RE_SARANA_INLINE = re.compile(r"\b([A-Z]{2,3})\s+([A-Z][A-Z\s,]+?)\s+([A-Z0-9\s\.\-&]+?)\s+([A-Z0-9]{1,4}\d{2,6}(?:-[A-Z0-9]+)?)\s+([A-Z][A-Z\s,]+)\b")
+RE_SARANA_INLINE_SUBS = re.compile(r"\b([A-Z]{2,3})\s+([A-Z][A-Z\s,]+?)\s+([A-Z0-9\s\.\-&]+?)\s+([A-Z0-9]{1,4}\d{1,6}(?:-[A-Z0-9]+)?)\s+([A-Z][A-Z\s,]+)\b")
+
+# ===== SPPB =====
+RE_SPPB_NOMOR = re.compile(r"SURAT PERSETUJUAN PENGELUARAN BARANG.*?\n\s*Nomor\s*:\s*([^\n]+?)\s*Tanggal\s*:\s*([0-9\-]+)", re.S)
+RE_PENDAFTARAN_PIB = re.compile(r"Nomor Pendaftaran PIB\s*:\s*([0-9]+)\s*Tanggal\s*:\s*([0-9\-]+)")
+RE_NOMOR_AJU = re.compile(r"Nomor aju\s*:\s*([0-9]+)", re.I)
+RE_BLOK_IMPORTIR = re.compile(r"Kepada\s*:\s*.*?Importir(.*?)(?=\n\s*Lokasi Barang\s*:|\Z)", re.S | re.I)
+RE_NPWP_ANGKA = re.compile(r"\bNPWP\s*:\s*([0-9\-]+)")
+RE_NPWP = re.compile(r"\bNPWP\s*:\s*(.*)")
+RE_NITKU = re.compile(r"\bNITKU\s*:\s*([0-9]+)")
+RE_NAMA = re.compile(r"\bNama\s*:\s*(.*)")
+RE_ALAMAT = re.compile(r"\bAlamat\s*:\s*(.*)")
+RE_NP_PPJK = re.compile(r"\bNP\s*PPJK\s*:\s*(.*)")
+RE_LOKASI_BARANG = re.compile(r"Lokasi Barang\s*:\s*(.*)")
+RE_AWB = re.compile(r"No\.?\s*B/?L atau AWB\s*\(Host\)\s*:\s*([^\s]+)\s*Tanggal\s*:\s*([0-9\-]+)", re.I)
+RE_SARANA_PENGANGKUT = re.compile(r"Nama Sarana Pengangkut\s*:\s*(.*)")
+RE_VOY_FLIGHT = re.compile(r"No\.?\s*Voy\.?/Flight\s*:\s*([A-Z0-9]+)", re.I)
+RE_BC11 = re.compile(r"No\.?\s*BC\s*1\.1\s*:\s*([0-9]+)\s*Tanggal\s*:\s*([0-9\-]+)", re.I)
+# varian lama di utils_bp.py: nomor pos langsung setelah label "Pos :"
+RE_BC11_POS = re.compile(r"No\.?\s*BC\s*1\.1\s*:\s*([0-9]+)\s*Tanggal\s*:\s*([0-9\-]+)\s*Pos\s*:\s*([^\n]*)", re.I)
+RE_NOMOR_POS = re.compile(r"\b\d{10,15}\b")
+RE_JUMLAH_KEMASAN = re.compile(r"Jumlah/jenis kemasan\s*:\s*([^\n]+)", re.I)
+RE_LABEL_KEMASAN = re.compile(r"Jumlah/jenis kemasan", re.I)
+RE_POTONG_BERAT = re.compile(r"\s+Berat\s*:\s*")
+RE_MERK_KEMASAN = re.compile(r"Merk kemasan\s*:\s*(.*)", re.I)
+RE_JUMLAH_PETI_KEMAS = re.compile(r"Jumlah peti kemas\s*:\s*([0-9]+)", re.I)
+RE_NOMOR_PETI_KEMAS = re.compile(r"Nomor Peti Kemas/Ukuran\s*:\s*(.*)", re.I)
+RE_BERAT = re.compile(r"\bBerat\s*:\s*([0-9][0-9\.,]*)", re.I)
+RE_BERAT_DESIMAL = re.compile(r"\b\d+\.\d{4}\b")
+
+# ===== varian formulir (varian.py) =====
+# "9. Cara Pengangkutan:LAUT 1"
+RE_CARA_PENGANGKUTAN = re.compile(r"Cara Pengangkutan\s*:\s*([A-Z]+)")
+
+# ===== isi region template (templates.py), dicocokkan dengan fullmatch =====
+RE_REGION_NOMOR = re.compile(r"[0-9]+")
+RE_REGION_TANGGAL = re.compile(r"[0-9]{2}-[0-9]{2}-[0-9]{4}")
+RE_REGION_KODE_BENDERA = re.compile(r"[A-Z]{2,3}")
+RE_REGION_NEGARA = re.compile(r"[A-Z][A-Z ,.'()-]*")
+RE_REGION_VOYAGE = re.compile(r"\S+")
+
+
+def registry():
+    """
+    Semua pola di modul ini: {nama: compiled pattern}.
+    """
+    return {
+        name: value
+        for name, value in globals().items()
+        if name.startswith("RE_") and isinstance(value, re.Pattern)
+    }
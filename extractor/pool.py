@@ -0,0 +1,254 @@
+import asyncio
+import os
+import threading
+from contextlib import closing
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .backends import aktifkan_budget
+from .cache import get_result_cache
+from .timing import jalankan_dengan_timer, stage
+from .utils import extract_pib, extract_sppb
+
+EXTRACTORS = {
+    "pib": extract_pib,
+    # data umum PIB saja, tanpa barang (key cache terpisah dari "pib")
+    "pib_header": partial(extract_pib, header_only=True),
+    "sppb": extract_sppb,
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _pool_workers():
+    workers = getattr(settings, "EXTRACT_POOL_WORKERS", None)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    return workers
+
+
+def get_executor():
+    """
+    Process pool milik worker ini. Dibuat sekali saat pertama dipakai dan
+    dipakai ulang oleh semua request. None kalau EXTRACT_POOL_WORKERS = 0.
+    """
+    global _executor
+    workers = _pool_workers()
+    if workers <= 0:
+        return None
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ProcessPoolExecutor(max_workers=workers, initializer=aktifkan_budget)
+    return _executor
+
+
+def _reset_executor(broken):
+    global _executor
+    with _executor_lock:
+        if _executor is broken:
+            _executor = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def _run(kind, source, timing=False):
+    # (result, Timer file); timer hanya dibuat kalau request-nya diukur
+    if timing:
+        return jalankan_dengan_timer(EXTRACTORS[kind], source)
+    return EXTRACTORS[kind](source), None
+
+
+def extract_many(jobs, timer=None):
+    """
+    Ekstrak banyak file sekaligus di process pool.
+    jobs: list of (kind, digest, source), kind = key EXTRACTORS,
+    source = path atau bytes isi PDF.
+    Hasil dikembalikan dengan urutan yang sama dengan jobs.
+    timer: timing.Timer request; durasi per tahap tiap file dicatat di sana.
+    """
+    with closing(extract_stream([jobs], timer=timer)) as stream:
+        _, results, error = next(stream)
+    if error is not None:
+        raise error
+    return results
+
+
+def extract_stream(groups, limit=None, timer=None):
+    """
+    Versi batch extract_many: groups = list of jobs (satu per set dokumen).
+    Semua file dari semua set berbagi process pool; yield (i, results, error)
+    per set begitu file terakhirnya selesai, jadi urutannya urutan selesai,
+    bukan urutan groups. error = exception pertama di set itu (results None),
+    sisa file set itu tidak dikerjakan lagi.
+    limit = maksimal file yang jalan paralel (default
+    EXTRACT_MAX_PARALLEL_PER_REQUEST).
+    timer: seperti di extract_many; index file = urutannya di semua groups.
+    """
+    results = [[None] * len(jobs) for jobs in groups]
+    remaining = [len(jobs) for jobs in groups]
+    failed = set()
+    cache = get_result_cache()
+
+    # posisi file pertama tiap set di urutan gabungan semua groups
+    offsets, total = [], 0
+    for jobs in groups:
+        offsets.append(total)
+        total += len(jobs)
+
+    # cek cache dulu, sisanya baru dikirim ke pool
+    pending = []
+    for g, jobs in enumerate(groups):
+        for i, (kind, digest, _) in enumerate(jobs):
+            with stage("cache", timer):
+                hit = cache.get(kind, digest) if cache and digest else None
+            if timer is not None and cache and digest:
+                timer.hitung("cache_hit" if hit is not None else "cache_miss")
+            if hit is not None:
+                results[g][i] = hit
+                remaining[g] -= 1
+            else:
+                pending.append((g, i))
+
+    # set yang seluruhnya dari cache (atau kosong) langsung selesai
+    for g in range(len(groups)):
+        if remaining[g] == 0:
+            yield g, results[g], None
+
+    def store(g, i, output):
+        result, file_timer = output
+        kind, digest, _ = groups[g][i]
+        if timer is not None:
+            timer.add_file(kind, offsets[g] + i, file_timer)
+        if cache and digest:
+            cache.set(kind, digest, result)
+        results[g][i] = result
+        remaining[g] -= 1
+        return remaining[g] == 0
+
+    executor = get_executor()
+    if executor is None:
+        for g, i in pending:
+            if g in failed:
+                continue
+            kind, _, source = groups[g][i]
+            try:
+                selesai = store(g, i, _run(kind, source, timer is not None))
+            except Exception as e:
+                failed.add(g)
+                yield g, None, e
+                continue
+            if selesai:
+                yield g, results[g], None
+        return
+
+    if limit is None:
+        limit = getattr(settings, "EXTRACT_MAX_PARALLEL_PER_REQUEST", 4)
+    limit = max(1, limit)
+    queue = list(reversed(pending))
+    running = {}
+    try:
+        while queue or running:
+            while queue and len(running) < limit:
+                g, i = queue.pop()
+                if g in failed:
+                    continue
+                kind, _, source = groups[g][i]
+                running[executor.submit(_run, kind, source, timer is not None)] = (g, i)
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                g, i = running.pop(fut)
+                if g in failed:
+                    continue
+                error = fut.exception()
+                if isinstance(error, BrokenProcessPool):
+                    raise error
+                if error is not None:
+                    failed.add(g)
+                    yield g, None, error
+                elif store(g, i, fut.result()):
+                    yield g, results[g], None
+    except BrokenProcessPool:
+        _reset_executor(executor)
+        raise
+    finally:
+        for fut in running:
+            fut.cancel()
+
+
+def _cek_cache(jobs, timer):
+    # (cache, results, index job yang belum ada di cache)
+    cache = get_result_cache()
+    results = [None] * len(jobs)
+    pending = []
+    for i, (kind, digest, _) in enumerate(jobs):
+        with stage("cache", timer):
+            hit = cache.get(kind, digest) if cache and digest else None
+        if timer is not None and cache and digest:
+            timer.hitung("cache_hit" if hit is not None else "cache_miss")
+        if hit is not None:
+            results[i] = hit
+        else:
+            pending.append(i)
+    return cache, results, pending
+
+
+async def extract_many_async(jobs, timer=None):
+    """
+    extract_many untuk view async: hasil cache dipakai, sisanya dijalankan
+    di process pool paling banyak EXTRACT_MAX_PARALLEL_PER_REQUEST sekaligus
+    tanpa menahan event loop. Kalau coroutine dibatalkan (klien putus), file
+    yang belum dikirim ke pool tidak pernah dikerjakan dan yang masih antri
+    di pool dibatalkan; yang sedang diparse dibiarkan selesai (proses tidak
+    bisa diinterupsi) dan hasilnya tetap masuk cache.
+    """
+    loop = asyncio.get_running_loop()
+    # cache SQLite dibaca/ditulis di thread, bukan di event loop
+    cache, results, pending = await sync_to_async(_cek_cache, thread_sensitive=False)(jobs, timer)
+
+    # tanpa process pool: thread default event loop
+    executor = get_executor()
+    slot = asyncio.Semaphore(max(1, getattr(settings, "EXTRACT_MAX_PARALLEL_PER_REQUEST", 4)))
+
+    gagal = asyncio.Event()
+
+    async def satu(i):
+        kind, digest, source = jobs[i]
+        async with slot:
+            # slot yang dilepas file gagal bisa langsung diambil file
+            # berikutnya sebelum gather sempat membatalkannya
+            if gagal.is_set():
+                return
+            try:
+                result, file_timer = await loop.run_in_executor(
+                    executor, _run, kind, source, timer is not None
+                )
+            except BrokenProcessPool:
+                gagal.set()
+                if executor is not None:
+                    _reset_executor(executor)
+                raise
+            except BaseException:
+                gagal.set()
+                raise
+        if timer is not None:
+            timer.add_file(kind, i, file_timer)
+        if cache and digest:
+            await sync_to_async(cache.set, thread_sensitive=False)(kind, digest, result)
+        results[i] = result
+
+    tasks = [asyncio.ensure_future(satu(i)) for i in pending]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        # file lain di request ini tidak perlu diteruskan
+        for task in tasks:
+            task.cancel()
+        raise
+    return results
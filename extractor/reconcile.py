@@ -0,0 +1,139 @@
+"""
+Rekonsiliasi PIB-SPPB atas hasil ekstraksi yang tersimpan (records.py).
+Hash join satu kali jalan: semua PIB di-index per nomor_pengajuan dan per
+nomor pendaftaran, lalu tiap SPPB dicari pasangannya di index itu, jadi
+waktunya linear terhadap jumlah dokumen (bukan PIB x SPPB). Hanya kolom
+ber-index yang dibaca, JSON hasil ekstraksi tidak ikut dimuat.
+"""
+from .models import DokumenPIB, DokumenSPPB
+
+COCOK = "cocok"
+TIDAK_COCOK = "tidak_cocok"
+TANPA_PASANGAN = "tanpa_pasangan"
+
+KOLOM_PIB = ("id", "nomor_pengajuan", "nomor_pendaftaran", "tanggal_pendaftaran", "house_bl_awb", "master_bl_awb")
+KOLOM_SPPB = ("id", "nomor_sppb", "nomor_aju", "nomor_pendaftaran", "tanggal_pendaftaran", "nomor_awb")
+
+# baris dibaca bertahap dari database supaya memori tidak ikut membesar
+CHUNK = 5000
+
+
+def _nomor(value):
+    # nomor pendaftaran kadang tanpa nol di depan ("2582" vs "002582")
+    return value.strip().lstrip("0") if value else ""
+
+
+def _awb(value):
+    return "".join(value.split()).upper() if value else ""
+
+
+def _selisih(pib, sppb):
+    """
+    Field yang tidak sama antara PIB dan SPPB pasangannya: [(field, pib, sppb)].
+    Field yang kosong di salah satu sisi tidak dianggap selisih.
+    """
+    _, nomor_pengajuan, nomor_pendaftaran, tanggal_pendaftaran, house, master = pib
+    _, _, nomor_aju, sppb_pendaftaran, sppb_tanggal, awb = sppb
+    found = []
+    if nomor_pengajuan and nomor_aju and nomor_pengajuan != nomor_aju:
+        found.append(("nomor_aju", nomor_pengajuan, nomor_aju))
+    if nomor_pendaftaran and sppb_pendaftaran and _nomor(nomor_pendaftaran) != _nomor(sppb_pendaftaran):
+        found.append(("nomor_pendaftaran", nomor_pendaftaran, sppb_pendaftaran))
+    if tanggal_pendaftaran and sppb_tanggal and tanggal_pendaftaran != sppb_tanggal:
+        found.append(("tanggal_pendaftaran", tanggal_pendaftaran, sppb_tanggal))
+    bl = {_awb(house), _awb(master)} - {""}
+    if bl and awb and _awb(awb) not in bl:
+        found.append(("awb", house or master, awb))
+    return found
+
+
+def cocokkan(pib_rows, sppb_rows):
+    """
+    Hash join PIB x SPPB. Baris berformat KOLOM_PIB / KOLOM_SPPB (tuple).
+    Yield satu dict per SPPB (cocok, tidak_cocok, atau tanpa_pasangan) lalu
+    satu dict per PIB yang tidak punya SPPB sama sekali (tanpa_pasangan).
+    PIB dengan nomor yang sama (upload ulang file lain) -> yang terakhir dipakai.
+    """
+    per_aju, per_pendaftaran, pib_by_id = {}, {}, {}
+    for pib in pib_rows:
+        pib_by_id[pib[0]] = pib
+        if pib[1]:
+            per_aju[pib[1]] = pib
+        if pib[2]:
+            per_pendaftaran[(_nomor(pib[2]), pib[3])] = pib
+
+    berpasangan = set()
+    for sppb in sppb_rows:
+        sppb_id, nomor_sppb, nomor_aju, nomor_pendaftaran, tanggal_pendaftaran, _ = sppb
+        pib = per_aju.get(nomor_aju) if nomor_aju else None
+        if pib is None and nomor_pendaftaran:
+            pib = per_pendaftaran.get((_nomor(nomor_pendaftaran), tanggal_pendaftaran))
+        record = {
+            "sppb_id": sppb_id,
+            "nomor_sppb": nomor_sppb,
+            "nomor_aju": nomor_aju,
+            "nomor_pendaftaran": nomor_pendaftaran,
+        }
+        if pib is None:
+            yield {"status": TANPA_PASANGAN, "jenis": "sppb", "pib_id": None, **record, "selisih": []}
+            continue
+        berpasangan.add(pib[0])
+        selisih = _selisih(pib, sppb)
+        yield {
+            "status": TIDAK_COCOK if selisih else COCOK,
+            "jenis": "pasangan",
+            "pib_id": pib[0],
+            **record,
+            "selisih": [{"field": f, "pib": str(a), "sppb": str(b)} for f, a, b in selisih],
+        }
+
+    # PIB yang tertimpa PIB lain dengan nomor sama tidak dilaporkan terpisah
+    aktif = {pib[0] for pib in per_aju.values()} | {pib[0] for pib in per_pendaftaran.values()}
+    for pib_id, pib in pib_by_id.items():
+        if pib_id in berpasangan or (pib_id not in aktif and (pib[1] or pib[2])):
+            continue
+        yield {
+            "status": TANPA_PASANGAN,
+            "jenis": "pib",
+            "pib_id": pib_id,
+            "sppb_id": None,
+            "nomor_sppb": "",
+            "nomor_aju": pib[1],
+            "nomor_pendaftaran": pib[2],
+            "selisih": [],
+        }
+
+
+def _rows(queryset, kode_tps, dari, sampai, kolom):
+    if kode_tps:
+        queryset = queryset.filter(kode_tps=kode_tps)
+    # rentang tanggal pendaftaran PIB: di SPPB tanggal yang sama ada di pendaftaran_pib
+    if dari:
+        queryset = queryset.filter(tanggal_pendaftaran__gte=dari)
+    if sampai:
+        queryset = queryset.filter(tanggal_pendaftaran__lte=sampai)
+    return queryset.order_by("created_at", "id").values_list(*kolom).iterator(chunk_size=CHUNK)
+
+
+def rekonsiliasi(kode_tps=None, dari=None, sampai=None):
+    """
+    Rekonsiliasi dokumen tersimpan satu TPS (None = semua TPS) pada rentang
+    tanggal pendaftaran [dari, sampai]. Generator, lihat cocokkan().
+    """
+    pib_rows = _rows(DokumenPIB.objects.all(), kode_tps, dari, sampai, KOLOM_PIB)
+    sppb_rows = _rows(DokumenSPPB.objects.all(), kode_tps, dari, sampai, KOLOM_SPPB)
+    return cocokkan(pib_rows, sppb_rows)
+
+
+def ringkasan_baru():
+    return {COCOK: 0, TIDAK_COCOK: 0, "tanpa_pasangan_pib": 0, "tanpa_pasangan_sppb": 0}
+
+
+def hitung(counts, record):
+    """
+    Tambahkan satu baris hasil ke ringkasan; tanpa_pasangan dipisah per jenis.
+    """
+    if record["status"] == TANPA_PASANGAN:
+        counts[f"tanpa_pasangan_{record['jenis']}"] += 1
+    else:
+        counts[record["status"]] += 1
@@ -0,0 +1,217 @@
+"""
+Simpan hasil ekstraksi ke database (DokumenPIB, BarangPIB, DokumenSPPB,
+Importir, PPJK) supaya bisa dicari lagi tanpa upload & parsing ulang.
+Satu set dokumen = satu transaksi dengan bulk insert/upsert; secara default
+ditulis di thread arsip (storage.py) sehingga tidak menambah latensi response.
+"""
+import logging
+import re
+from datetime import datetime
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from .models import PPJK, BarangPIB, DokumenPIB, DokumenSPPB, Importir
+from .storage import get_arsip_executor
+
+logger = logging.getLogger(__name__)
+
+KOLOM_BARANG = ("uraian", "kondisi", "negara", "hs_code", "jumlah_satuan", "qty", "kode_satuan", "nilai_pabean")
+
+
+def _teks(value):
+    return str(value).strip() if value else ""
+
+
+def _npwp(value):
+    # "0010026748052000 / 0010026748052000" (PIB) atau "01.234.567.8-901.000" -> angka saja
+    return re.sub(r"\D", "", _teks(value).split("/")[0])
+
+
+def _tanggal(value):
+    try:
+        return datetime.strptime(_teks(value), "%d-%m-%Y").date()
+    except ValueError:
+        return None
+
+
+def _sesuai_kolom(model, fields):
+    """
+    Teks dipotong sepanjang max_length kolomnya: SQLite mengabaikan batas,
+    Postgres/MySQL menolak seluruh transaksi. Nilai lengkap tetap ada di
+    kolom data (hasil ekstraksi apa adanya).
+    """
+    hasil = {}
+    for name, value in fields.items():
+        max_length = getattr(model._meta.get_field(name), "max_length", None) if isinstance(value, str) else None
+        hasil[name] = value[:max_length] if max_length else value
+    return hasil
+
+
+def _gabung(pihak, npwp, **fields):
+    # field kosong tidak menimpa isi dari dokumen lain di set yang sama
+    if not npwp:
+        return
+    row = pihak.setdefault(npwp, {})
+    for name, value in fields.items():
+        if value:
+            row[name] = value
+
+
+def _upsert_pihak(model, pihak):
+    """
+    Insert/update Importir atau PPJK secara bulk; mengembalikan {npwp: id}.
+    """
+    if not pihak:
+        return {}
+    pihak = {npwp: _sesuai_kolom(model, fields) for npwp, fields in pihak.items()}
+    existing = model.objects.in_bulk(list(pihak), field_name="npwp")
+    model.objects.bulk_create(
+        [model(npwp=npwp, **fields) for npwp, fields in pihak.items() if npwp not in existing],
+        ignore_conflicts=True,
+    )
+    changed, names = [], set()
+    for npwp, obj in existing.items():
+        diff = {k: v for k, v in pihak[npwp].items() if getattr(obj, k) != v}
+        if diff:
+            for k, v in diff.items():
+                setattr(obj, k, v)
+            changed.append(obj)
+            names.update(diff)
+    if changed:
+        model.objects.bulk_update(changed, [*names, "updated_at"])
+    return dict(model.objects.filter(npwp__in=list(pihak)).values_list("npwp", "id"))
+
+
+def _simpan_pib(tps_code, digest, header_only, result, importir_id):
+    fields = _sesuai_kolom(DokumenPIB, {
+        "header_only": header_only,
+        "nomor_pengajuan": _teks(result.get("nomor_pengajuan")),
+        "tanggal_pengajuan": _tanggal(result.get("tanggal_pengajuan")),
+        "kantor_pabean": _teks(result.get("kantor_pabean")),
+        "nomor_pendaftaran": _teks((result.get("pendaftaran") or {}).get("nomor")),
+        "tanggal_pendaftaran": _tanggal((result.get("pendaftaran") or {}).get("tanggal")),
+        "house_bl_awb": _teks((result.get("bl_awb") or {}).get("house_bl_awb")),
+        "master_bl_awb": _teks((result.get("bl_awb") or {}).get("master_bl_awb")),
+        "importir_id": importir_id,
+        "data": result,
+    })
+    pib = DokumenPIB.objects.filter(kode_tps=tps_code, digest=digest).first()
+    if pib is not None and (pib.data == result or (header_only and not pib.header_only)):
+        # sudah tersimpan, atau hasil header_only tidak menimpa hasil lengkap
+        return pib
+    if pib is None:
+        pib = DokumenPIB.objects.create(kode_tps=tps_code, digest=digest, **fields)
+    else:
+        for name, value in fields.items():
+            setattr(pib, name, value)
+        pib.save()
+        pib.barang.all().delete()
+    if not header_only:
+        BarangPIB.objects.bulk_create([
+            BarangPIB(pib=pib, urutan=n, **_sesuai_kolom(BarangPIB, {k: _teks(item.get(k)) for k in KOLOM_BARANG}))
+            for n, item in enumerate(result.get("barang") or [], 1)
+        ])
+    return pib
+
+
+def _baris_sppb(tps_code, digest, result, pib, importir_ids, ppjk_ids):
+    sppb = result.get("sppb") or {}
+    pendaftaran = result.get("pendaftaran_pib") or {}
+    awb = result.get("awb") or {}
+    return DokumenSPPB(
+        kode_tps=tps_code,
+        digest=digest,
+        pib=pib,
+        **_sesuai_kolom(DokumenSPPB, {
+            "nomor_sppb": _teks(sppb.get("nomor")),
+            "tanggal_sppb": _tanggal(sppb.get("tanggal")),
+            "nomor_aju": _teks(result.get("nomor_aju")),
+            "nomor_pendaftaran": _teks(pendaftaran.get("nomor")),
+            "tanggal_pendaftaran": _tanggal(pendaftaran.get("tanggal")),
+            "nomor_awb": _teks(awb.get("nomor")),
+            "tanggal_awb": _tanggal(awb.get("tanggal")),
+        }),
+        importir_id=importir_ids.get(_npwp((result.get("importir") or {}).get("npwp"))),
+        ppjk_id=ppjk_ids.get(_npwp((result.get("ppjk") or {}).get("npwp"))),
+        data=result,
+    )
+
+
+def simpan_set(tps_code, jobs, results):
+    """
+    Simpan satu set dokumen. jobs: format extract_many, results: hasil per
+    job (None untuk file yang gagal diekstrak, tidak disimpan).
+    """
+    importir, ppjk = {}, {}
+    pib_job, sppb_jobs = None, []
+    for (kind, digest, _), result in zip(jobs, results):
+        if result is None:
+            continue
+        imp = result.get("importir") or {}
+        if kind == "sppb":
+            sppb_jobs.append((digest, result))
+            _gabung(importir, _npwp(imp.get("npwp")), nama=_teks(imp.get("nama")),
+                    alamat=_teks(imp.get("alamat")), nitku=_teks(imp.get("nitku")))
+            pj = result.get("ppjk") or {}
+            _gabung(ppjk, _npwp(pj.get("npwp")), nama=_teks(pj.get("nama")), alamat=_teks(pj.get("alamat")))
+        else:
+            pib_job = (digest, kind == "pib_header", result)
+            _gabung(importir, _npwp(imp.get("identitas")), nama=_teks(imp.get("nama")),
+                    alamat=_teks(imp.get("alamat")), nib=_teks(imp.get("nib")))
+
+    with transaction.atomic():
+        importir_ids = _upsert_pihak(Importir, importir)
+        ppjk_ids = _upsert_pihak(PPJK, ppjk)
+        pib = None
+        if pib_job is not None:
+            digest, header_only, result = pib_job
+            pib = _simpan_pib(tps_code, digest, header_only, result,
+                              importir_ids.get(_npwp((result.get("importir") or {}).get("identitas"))))
+        if sppb_jobs:
+            update_fields = [
+                "nomor_sppb", "tanggal_sppb", "nomor_aju", "nomor_pendaftaran", "tanggal_pendaftaran",
+                "nomor_awb", "tanggal_awb", "importir", "ppjk", "data", "updated_at",
+            ]
+            if pib is not None:
+                # SPPB yang di-upload ulang tanpa PIB tetap terhubung ke PIB lamanya
+                update_fields.append("pib")
+            DokumenSPPB.objects.bulk_create(
+                [_baris_sppb(tps_code, digest, result, pib, importir_ids, ppjk_ids)
+                 for digest, result in sppb_jobs],
+                update_conflicts=True,
+                unique_fields=["kode_tps", "digest"],
+                update_fields=update_fields,
+            )
+    return pib
+
+
+def _simpan_aman(tps_code, jobs, results):
+    try:
+        simpan_set(tps_code, jobs, results)
+    except Exception:
+        logger.exception("Gagal menyimpan hasil ekstraksi %s", tps_code)
+
+
+def _simpan_background(tps_code, jobs, results):
+    close_old_connections()
+    try:
+        _simpan_aman(tps_code, jobs, results)
+    finally:
+        close_old_connections()
+
+
+def simpan_hasil(tps_code, jobs, results):
+    """
+    Simpan hasil sesuai settings: EXTRACT_PERSIST_RESULTS mematikan/menyalakan,
+    EXTRACT_PERSIST_IN_BACKGROUND menentukan apakah response perlu menunggu.
+    Gagal menyimpan tidak menggagalkan request.
+    """
+    if not getattr(settings, "EXTRACT_PERSIST_RESULTS", True):
+        return
+    # jobs berisi isi file (bytes); thread penulis cukup butuh kind & digest
+    jobs = [(kind, digest, None) for kind, digest, _ in jobs]
+    if getattr(settings, "EXTRACT_PERSIST_IN_BACKGROUND", True):
+        get_arsip_executor().submit(_simpan_background, tps_code, jobs, results)
+    else:
+        _simpan_aman(tps_code, jobs, results)
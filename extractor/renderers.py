@@ -0,0 +1,37 @@
+import json
+
+from rest_framework.renderers import BaseRenderer
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    application/x-ndjson: satu objek JSON per baris. View yang streaming
+    menulis barisnya sendiri; renderer ini dipakai untuk negosiasi Accept
+    dan untuk respon biasa (mis. error validasi) sebagai satu baris.
+    """
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return ndjson_line(data).encode(self.charset)
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    text/event-stream (SSE). Respon biasa dikirim sebagai satu event "error".
+    """
+    media_type = "text/event-stream"
+    format = "sse"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return sse_event("error", data).encode(self.charset)
+
+
+def ndjson_line(record):
+    return json.dumps(record, default=str) + "\n"
+
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
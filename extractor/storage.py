@@ -0,0 +1,185 @@
+"""
+Arsip file upload asli, content-addressed: isi file disimpan sekali sebagai
+blob bernama sha256-nya (MEDIA_ROOT/blobs/ab/cd/<sha256>[.gz]), sedangkan
+upload per TPS hanya dicatat sebagai baris UploadedDocument yang menunjuk
+ke blob itu. Upload ulang file yang sama tidak menulis ke disk lagi.
+"""
+import gzip
+import hashlib
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections
+from django.db.models import F
+from django.utils import timezone
+
+from .metrics import catat_arsip_langsung
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+# byte isi upload yang menunggu di antrian thread arsip
+_antrian_bytes = 0
+_antrian_lock = threading.Lock()
+
+
+def get_arsip_executor():
+    """
+    Satu thread penulis untuk arsip upload dan hasil ekstraksi (records.py),
+    jadi penulisan ke disk/database tidak saling berebut.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="simpan-arsip")
+    return _executor
+
+
+def blob_root():
+    return getattr(settings, "EXTRACT_BLOB_ROOT", None) or os.path.join(settings.MEDIA_ROOT, "blobs")
+
+
+def blob_path(digest, compressed=False):
+    path = os.path.join(blob_root(), digest[:2], digest[2:4], digest)
+    return path + ".gz" if compressed else path
+
+
+def cari_blob(digest):
+    """
+    Path blob yang sudah ada (terkompresi atau tidak), atau None.
+    """
+    for compressed in (False, True):
+        path = blob_path(digest, compressed)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def simpan_blob(data, digest=None):
+    """
+    Tulis isi file sebagai blob kalau belum ada; mengembalikan (digest, path).
+    Penulisan lewat file sementara + os.replace, jadi blob tidak pernah
+    terbaca setengah jadi walaupun dua proses menulis isi yang sama.
+    """
+    digest = digest or hashlib.sha256(data).hexdigest()
+    path = cari_blob(digest)
+    if path is not None:
+        return digest, path
+
+    compressed = getattr(settings, "EXTRACT_BLOB_COMPRESS", False)
+    path = blob_path(digest, compressed)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(gzip.compress(data) if compressed else data)
+    os.replace(tmp, path)
+    return digest, path
+
+
+def baca_blob(digest):
+    path = cari_blob(digest)
+    if path is None:
+        raise FileNotFoundError(digest)
+    with open(path, "rb") as f:
+        data = f.read()
+    return gzip.decompress(data) if path.endswith(".gz") else data
+
+
+def catat_upload(tps_code, name, digest, size):
+    """
+    Referensi (kode_tps, digest): dibuat sekali, upload berikutnya hanya
+    menambah jumlah_upload dan memperbarui nama & waktu terakhir.
+    """
+    from .models import UploadedDocument
+
+    defaults = {"nama": name, "ukuran": size}
+    try:
+        ref, created = UploadedDocument.objects.get_or_create(kode_tps=tps_code, digest=digest, defaults=defaults)
+    except IntegrityError:
+        # upload paralel dengan isi yang sama: baris sudah dibuat proses lain
+        ref, created = UploadedDocument.objects.get(kode_tps=tps_code, digest=digest), False
+    if not created:
+        UploadedDocument.objects.filter(pk=ref.pk).update(
+            nama=name, jumlah_upload=F("jumlah_upload") + 1, terakhir_diupload=timezone.now()
+        )
+    return ref
+
+
+def simpan_dokumen(tps_code, name, data, digest=None):
+    """
+    Simpan isi upload ke blob store + referensi per TPS; mengembalikan path blob.
+    """
+    digest, path = simpan_blob(data, digest)
+    catat_upload(tps_code, name, digest, len(data))
+    return path
+
+
+def _simpan_aman(tps_code, name, data, digest):
+    close_old_connections()
+    try:
+        simpan_dokumen(tps_code, name, data, digest)
+    except Exception:
+        logger.exception("Gagal menyimpan dokumen %s/%s", tps_code, name)
+    finally:
+        close_old_connections()
+
+
+def _masuk_antrian(n):
+    """
+    Pesan n byte di antrian arsip; False kalau melebihi EXTRACT_ARCHIVE_MAX_PENDING_MB.
+    """
+    global _antrian_bytes
+    batas = getattr(settings, "EXTRACT_ARCHIVE_MAX_PENDING_MB", 64)
+    with _antrian_lock:
+        # satu file yang lebih besar dari batas tetap boleh kalau antrian kosong
+        if batas is not None and _antrian_bytes and _antrian_bytes + n > batas * 1024 * 1024:
+            return False
+        _antrian_bytes += n
+        return True
+
+
+def _keluar_antrian(n):
+    global _antrian_bytes
+    with _antrian_lock:
+        _antrian_bytes -= n
+
+
+def _simpan_antrian(tps_code, name, data, digest):
+    try:
+        _simpan_aman(tps_code, name, data, digest)
+    finally:
+        _keluar_antrian(len(data))
+
+
+def arsipkan_upload(tps_code, name, data, digest=None):
+    """
+    Simpan file asli sesuai settings: EXTRACT_PERSIST_UPLOADS mematikan/menyalakan,
+    EXTRACT_PERSIST_IN_BACKGROUND menentukan apakah response perlu menunggu.
+    Antrian background dibatasi EXTRACT_ARCHIVE_MAX_PENDING_MB (isi file ikut
+    tertahan di memori sampai ditulis); kalau penuh file langsung ditulis di
+    request ini, jadi memori tetap terbatas dan tidak ada arsip yang hilang.
+    """
+    if not getattr(settings, "EXTRACT_PERSIST_UPLOADS", True):
+        return
+    if getattr(settings, "EXTRACT_PERSIST_IN_BACKGROUND", True):
+        if _masuk_antrian(len(data)):
+            try:
+                get_arsip_executor().submit(_simpan_antrian, tps_code, name, data, digest)
+                return
+            except RuntimeError:
+                # executor sudah dimatikan (proses sedang berhenti)
+                _keluar_antrian(len(data))
+        catat_arsip_langsung()
+        try:
+            simpan_dokumen(tps_code, name, data, digest)
+        except Exception:
+            # sama dengan jalur background: gagal arsip tidak menggagalkan request
+            logger.exception("Gagal menyimpan dokumen %s/%s", tps_code, name)
+        return
+    simpan_dokumen(tps_code, name, data, digest)
@@ -0,0 +1,126 @@
+"""
+Template formulir: untuk tiap varian formulir yang dikenal, kotak (bbox)
+tempat field tertentu dicetak. Teks field diambil dari potongan halaman di
+kotak itu saja, jadi tidak tercampur kolom sebelahnya seperti di teks
+halaman yang sudah diratakan (mis. negara pengirim yang menyelip di blok
+"10. Nama Sarana Pengangkutan").
+
+Koordinat dalam point PDF dengan titik (0, 0) di kiri atas halaman
+(sama dengan x0/top pdfplumber). Kotak ditulis untuk ukuran halaman
+"ukuran"; kotak untuk ukuran halaman lain diskalakan sekali lalu di-cache.
+Karakter dianggap di dalam kotak kalau titik tengah horizontal dan top-nya
+di dalam kotak (aturan yang sama untuk backend pdfplumber dan pdfium).
+"""
+from functools import lru_cache
+
+from django.conf import settings
+
+from .patterns import (
+    RE_REGION_KODE_BENDERA,
+    RE_REGION_NEGARA,
+    RE_REGION_NOMOR,
+    RE_REGION_TANGGAL,
+    RE_REGION_VOYAGE,
+)
+
+TEMPLATES = {
+    # PIB BC 2.0 (CEISA), halaman pertama
+    "pib_bc20": {
+        "jenis": "pib",
+        "halaman": 0,
+        "ukuran": (595, 842),
+        # teks awal yang wajib ada di kotaknya; kalau tidak, template tidak dipakai
+        "penanda": (
+            ((330, 95, 460, 105), "G. Nomor dan Tanggal Pendaftaran"),
+            ((330, 131, 540, 140), "10. Nama Sarana Pengangkutan"),
+        ),
+        "field": {
+            "pendaftaran.nomor": (336, 106, 460, 115),
+            "pendaftaran.tanggal": (455, 95, 580, 105),
+            "sarana_pengangkutan.kode_bendera": (540, 131, 580, 140),
+            # kolom negara pengirim di kiri blok sarana; hasil regex lama
+            # mengisi "negara" dari baris ini, jadi dipertahankan
+            "sarana_pengangkutan.negara": (240, 135, 332, 146),
+            "sarana_pengangkutan.nama": (336, 140, 580, 149),
+            "sarana_pengangkutan.voyage_flight": (336, 149, 485, 159),
+            "sarana_pengangkutan.bendera": (485, 149, 580, 159),
+        },
+    },
+}
+
+# nilai region yang dianggap sah per field; region lain cukup tidak kosong
+_POLA_FIELD = {
+    "pendaftaran.nomor": RE_REGION_NOMOR,
+    "pendaftaran.tanggal": RE_REGION_TANGGAL,
+    "sarana_pengangkutan.kode_bendera": RE_REGION_KODE_BENDERA,
+    "sarana_pengangkutan.negara": RE_REGION_NEGARA,
+    "sarana_pengangkutan.voyage_flight": RE_REGION_VOYAGE,
+}
+
+
+def template_aktif():
+    return getattr(settings, "EXTRACT_TEMPLATES", True)
+
+
+@lru_cache(maxsize=64)
+def kotak_template(nama, width, height):
+    """
+    (penanda, field) template nama untuk halaman berukuran width x height.
+    """
+    template = TEMPLATES[nama]
+    sx = width / template["ukuran"][0]
+    sy = height / template["ukuran"][1]
+
+    def skala(bbox):
+        x0, top, x1, bottom = bbox
+        return (x0 * sx, top * sy, x1 * sx, bottom * sy)
+
+    penanda = tuple((skala(bbox), label) for bbox, label in template["penanda"])
+    field = {name: skala(bbox) for name, bbox in template["field"].items()}
+    return penanda, field
+
+
+def di_dalam(bbox, x0, top, x1):
+    # titik tengah horizontal dan top karakter di dalam kotak
+    left, atas, right, bawah = bbox
+    return left <= (x0 + x1) / 2 <= right and atas <= top < bawah
+
+
+class Potongan:
+    """
+    Permintaan teks region untuk satu jenis dokumen. Backend memanggil isi()
+    saat halaman di self.halaman diekstrak; setelah itu self.template berisi
+    nama template yang cocok (None kalau tidak ada) dan self.teks teks per field.
+    """
+
+    def __init__(self, jenis):
+        self.templates = [nama for nama, t in TEMPLATES.items() if t["jenis"] == jenis]
+        # index halaman (mulai 0) yang perlu dipotong
+        self.halaman = {TEMPLATES[nama]["halaman"] for nama in self.templates}
+        self.template = None
+        self.teks = {}
+
+    def isi(self, halaman, width, height, teks_kotak):
+        """
+        teks_kotak(bbox) -> teks karakter halaman di dalam bbox.
+        """
+        for nama in self.templates:
+            if self.template is not None or TEMPLATES[nama]["halaman"] != halaman:
+                continue
+            penanda, field = kotak_template(nama, round(width, 2), round(height, 2))
+            if all(teks_kotak(bbox).startswith(label) for bbox, label in penanda):
+                self.template = nama
+                self.teks = {name: teks_kotak(bbox).strip() for name, bbox in field.items()}
+                return
+
+    def nilai(self):
+        """
+        {field: nilai} yang lolos validasi; field dengan isi tidak sah dibuang.
+        """
+        values = {}
+        for name, text in self.teks.items():
+            text = " ".join(text.split())
+            pola = _POLA_FIELD.get(name)
+            if text and (pola is None or pola.fullmatch(text)):
+                values[name] = text
+        return values
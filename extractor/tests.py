@@ -1,3 +1,967 @@
-from django.test import TestCase
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from itertools import count
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from . import backends, jobs, metrics, pool, records, storage, templates, utils, varian
+from .admission import ANTRIAN_PENUH, TIMEOUT, Admission, get_admission
+from .backends import BatasMemoriTerlampaui, baca_halaman, iter_halaman
+from .cache import ResultCache
+from .index import DocumentIndex
+from .models import BarangPIB, DokumenPIB, DokumenSPPB, ExtractionJob, UploadedDocument
+from .patterns import RE_BARANG_LAMA, WAJIB_BARANG_LAMA
+from .reconcile import COCOK, TANPA_PASANGAN, TIDAK_COCOK, cocokkan, hitung, ringkasan_baru
+from .storage import arsipkan_upload, baca_blob, blob_path, catat_upload, simpan_blob
+
+DOKUMEN = os.path.join(settings.BASE_DIR, "documents")
+# PIB format barang lama (RE_BARANG_LAMA), 2 item
+PIB_BARANG_LAMA = os.path.join(DOKUMEN, "CHAN", "05010000622320250819046767.pdf")
+SPPB = os.path.join(DOKUMEN, "CHAN", "sppb1.pdf")
+
+# test yang menjalankan view/ekstraksi: tanpa process pool, cache, metrics,
+# thread arsip, dan pemulihan job di request pertama
+tanpa_latar = override_settings(
+    EXTRACT_POOL_WORKERS=0,
+    EXTRACT_CACHE_ENABLED=False,
+    EXTRACT_METRICS_ENABLED=False,
+    EXTRACT_PERSIST_IN_BACKGROUND=False,
+    EXTRACT_JOB_RECOVER_ON_START=False,
+)
+
+
+def _upload(path):
+    with open(path, "rb") as f:
+        return SimpleUploadedFile(os.path.basename(path), f.read(), content_type="application/pdf")
+
+
+def _form_set(tps_code="TPS01", prefix=""):
+    return {f"{prefix}kode_tps": tps_code, f"{prefix}file_pib": _upload(PIB_BARANG_LAMA),
+            f"{prefix}jumlah_sppb": 1, f"{prefix}file_sppb_1": _upload(SPPB)}
+
+
+class MediaSementara:
+    # MEDIA_ROOT (blob store) di direktori sementara per test
+    def setUp(self):
+        super().setUp()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.media = tmp.name
+        media = override_settings(MEDIA_ROOT=tmp.name)
+        media.enable()
+        self.addCleanup(media.disable)
+
+
+class ResultCacheTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.db_path = os.path.join(tmp.name, "cache.sqlite3")
+
+    def test_miss_lalu_hit(self):
+        cache = ResultCache(self.db_path)
+        self.assertIsNone(cache.get("pib", "abc"))
+        cache.set("pib", "abc", {"nomor_pengajuan": "1"})
+        self.assertEqual(cache.get("pib", "abc"), {"nomor_pengajuan": "1"})
+        # jenis dokumen bagian dari key
+        self.assertIsNone(cache.get("sppb", "abc"))
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+    def test_hit_dari_disk(self):
+        ResultCache(self.db_path, version="v1").set("pib", "abc", {"a": 1})
+        cache = ResultCache(self.db_path, version="v1")
+        self.assertEqual(cache.get("pib", "abc"), {"a": 1})
+        self.assertEqual(cache.disk_hits, 1)
+        # hit berikutnya dari LRU
+        cache.get("pib", "abc")
+        self.assertEqual((cache.hits, cache.disk_hits), (2, 1))
+
+    def test_eviction_lru(self):
+        cache = ResultCache(None, max_entries=2)
+        cache.set("pib", "a", 1)
+        cache.set("pib", "b", 2)
+        cache.get("pib", "a")
+        cache.set("pib", "c", 3)
+        # "b" paling lama tidak dipakai
+        self.assertIsNone(cache.get("pib", "b"))
+        self.assertEqual(cache.get("pib", "a"), 1)
+        self.assertEqual(cache.get("pib", "c"), 3)
+        self.assertEqual(cache.evictions, 1)
+
+    def test_versi_berbeda_tidak_terpakai(self):
+        ResultCache(self.db_path, version="lama").set("pib", "abc", {"a": 1})
+        cache = ResultCache(self.db_path, version="baru")
+        self.assertIsNone(cache.get("pib", "abc"))
+        self.assertEqual(cache.stats()["disk_stale_entries"], 1)
+        self.assertEqual(cache.invalidate(), 1)
+        self.assertEqual(cache.stats()["disk_stale_entries"], 0)
+
+    def test_setting_hasil_masuk_versi(self):
+        cache = ResultCache(self.db_path)
+        with override_settings(EXTRACT_TEMPLATES=True):
+            cache.set("pib", "abc", {"a": 1})
+        with override_settings(EXTRACT_TEMPLATES=False):
+            self.assertIsNone(cache.get("pib", "abc"))
+        with override_settings(EXTRACT_TEXT_BACKEND="pdfplumber"):
+            self.assertIsNone(cache.get("pib", "abc"))
+        with override_settings(EXTRACT_TEMPLATES=True):
+            self.assertEqual(cache.get("pib", "abc"), {"a": 1})
+
+
+class BarangBlokTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.text = utils._teks_pib(baca_halaman(PIB_BARANG_LAMA))
+
+    def _blok(self, text):
+        return [m.groups() for m in DocumentIndex(text).finditer_blok(RE_BARANG_LAMA, "Kode Brg", WAJIB_BARANG_LAMA)]
+
+    def _item(self):
+        # (header, teks satu item, tail), seperti bench_barang
+        m = RE_BARANG_LAMA.search(self.text)
+        start = self.text.rfind("\n", 0, m.start()) + 1
+        end = self.text.find("\n", m.end()) + 1
+        return self.text[:start], self.text[start:end], self.text[end:]
+
+    def test_paritas_dengan_regex_seluruh_teks(self):
+        lama = [m.groups() for m in RE_BARANG_LAMA.finditer(self.text)]
+        self.assertEqual(len(lama), 2)
+        self.assertEqual(self._blok(self.text), lama)
+
+        barang = utils.parse_pib(self.text)["barang"]
+        self.assertEqual([b["hs_code"] for b in barang], [g[0].strip() for g in lama])
+        self.assertEqual(barang[0]["hs_code"], "84749000")
+        self.assertEqual(barang[0]["kondisi"], "BARU")
+        self.assertEqual(barang[0]["negara"], "JAPAN (JP)")
+
+    def test_banyak_item(self):
+        header, item, tail = self._item()
+        barang = utils.parse_pib(header + item * 50 + tail)["barang"]
+        self.assertEqual(len(barang), 50 + 1)  # + item kedua dokumen asli di tail
+        self.assertEqual(barang[0], barang[49])
+
+    def test_item_tanpa_literal_wajib_tidak_meminjam_item_berikutnya(self):
+        header, item, tail = self._item()
+        rusak = item.replace("Negara", "Asal")
+        text = header + rusak + item + tail
+        # regex seluruh teks: item rusak "meminjam" Negara dari item berikutnya
+        self.assertEqual(len(list(RE_BARANG_LAMA.finditer(text))), 2)
+        self.assertEqual(len(self._blok(text)), 2)
+        self.assertEqual(self._blok(text), self._blok(header + item + tail))
+
+
+@override_settings(EXTRACT_MEMORY_BUDGET_MB=150)
+class BudgetMemoriTests(SimpleTestCase):
+    def setUp(self):
+        # RSS naik 100 MB tiap kali dibaca
+        patcher = mock.patch.object(backends, "rss", side_effect=(n * 100 * 2**20 for n in count()))
+        self.rss = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_tanpa_pool_tidak_dicek(self):
+        self.assertTrue(list(iter_halaman(PIB_BARANG_LAMA)))
+        self.rss.assert_not_called()
+
+    @mock.patch.object(backends, "_budget_aktif", True)
+    def test_proses_pool_dihentikan(self):
+        halaman = iter_halaman(PIB_BARANG_LAMA)
+        next(halaman)
+        with self.assertRaisesMessage(BatasMemoriTerlampaui, "memori naik 200 MB setelah 2 halaman (batas 150 MB)"):
+            next(halaman)
+
+
+def _blok_sarana(*baris):
+    return "\n".join(("10. Nama Sarana Pengangkutan & No. Voy/Flight dan Bendera",) + baris
+                     + ("11. Perkiraan Tanggal Tiba :08-08-2025", ""))
+
+
+class SaranaPengangkutanTests(SimpleTestCase):
+    # hasil yang diharapkan = keluaran extract_sarana_pengangkutan_main lalu
+    # _subs (kalau voyage_flight kosong) sebelum digabung jadi satu parser
+
+    def _sarana(self, kode, negara, nama, voyage_flight, bendera):
+        return {"kode_bendera": kode, "negara": negara, "nama": nama,
+                "voyage_flight": voyage_flight, "bendera": bendera}
+
+    def test_udara(self):
+        text = _blok_sarana("US", "GERMANY", "FEDERAL EXPRESS CORPORATION", "PENJUAL DE",
+                            "FX5194 UNITED STATES", "1a. Nama, Alamat : WINDMOELLER HOELSCHER SE CO K")
+        hasil = self._sarana("US", "GERMANY", "FEDERAL EXPRESS CORPORATION", "FX5194", "UNITED STATES")
+        # pib_bc20_udara: tanpa fallback voyage, hasil sama
+        self.assertEqual(utils.extract_sarana_pengangkutan(text, fallback=False), hasil)
+        self.assertEqual(utils.extract_sarana_pengangkutan(text), hasil)
+
+    def test_flight_dash(self):
+        text = _blok_sarana("PA", "TAIWAN", "EVER BOOMY", "PENJUAL TW", "1147-082A PANAMA")
+        self.assertEqual(utils.extract_sarana_pengangkutan(text),
+                         self._sarana("PA", "TAIWAN", "EVER BOOMY", "1147-082A", "PANAMA"))
+
+    def test_angka_negara(self):
+        text = _blok_sarana("PA", "JAPAN", "AZALEA CORAL", "PENJUAL JP", "3 PANAMA")
+        hasil = self._sarana("PA", "JAPAN", "AZALEA CORAL", "3", "PANAMA")
+        self.assertEqual(utils.extract_sarana_pengangkutan(text), hasil)
+        # angka saja, bendera di baris berikutnya
+        self.assertEqual(utils.extract_sarana_pengangkutan(_blok_sarana("PA", "JAPAN", "AZALEA CORAL", "3", "PANAMA")),
+                         hasil)
+
+    def test_voyage_kapal(self):
+        # voyage alfanumerik (2507S) tidak dikenali parser lama; keluarannya
+        # dipertahankan apa adanya (paritas), bukan berarti benar
+        text = _blok_sarana("KR", "KOREA, REPUBLIC OF", "PORT KLANG VOYAGER", "PENJUAL KR",
+                            "2507S KOREA, REPUBLIC OF")
+        self.assertEqual(utils.extract_sarana_pengangkutan(text),
+                         self._sarana("KR", "KOREA, REPUBLIC OF", "KOREA, REPUBLIC OF", "PORT", "KLANG VOYAGER"))
+
+    def test_tanpa_label(self):
+        self.assertEqual(utils.extract_sarana_pengangkutan("11. Perkiraan Tanggal Tiba :08-08-2025\n"),
+                         self._sarana(None, None, None, None, None))
+
+
+class FieldKosongTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.text = utils._teks_pib(baca_halaman(PIB_BARANG_LAMA))
+
+    def _kosong(self, data):
+        return {item["field"]: item["alasan"] for item in data["field_kosong"]}
+
+    def test_label_tidak_ada(self):
+        data = utils.parse_pib(self.text.replace("5. NIB", "5. XYZ"))
+        self.assertIsNone(data["importir"]["nib"])
+        self.assertEqual(self._kosong(data)["importir.nib"], utils.ALASAN_LABEL_TIDAK_ADA)
+        # field lain tetap terisi
+        self.assertEqual(data["importir"]["identitas"], utils.parse_pib(self.text)["importir"]["identitas"])
+        self.assertEqual(utils.pesan_hasil(data), "Ekstraksi berhasil sebagian")
+
+    def test_format_tidak_dikenali(self):
+        data = utils.parse_pib(self.text.replace("5. NIB : 8120011061265", "5. NIB : -"))
+        self.assertEqual(self._kosong(data)["importir.nib"], utils.ALASAN_FORMAT_TIDAK_DIKENALI)
+
+    def test_teks_kosong_tidak_error(self):
+        # dulu sys.exit; sekarang hanya peringatan
+        with self.assertLogs("extractor.utils", "WARNING"):
+            data = utils.parse_pib("")
+        self.assertEqual(data["barang"], [])
+        kosong = self._kosong(data)
+        self.assertEqual(kosong["nomor_pengajuan"], utils.ALASAN_LABEL_TIDAK_ADA)
+        self.assertIn("barang", kosong)
+
+    def test_header_only_tanpa_barang(self):
+        data = utils.parse_pib(self.text, header_only=True)
+        self.assertNotIn("barang", self._kosong(data))
+
+    def test_pesan_lengkap(self):
+        self.assertEqual(utils.pesan_hasil({"field_kosong": []}), "Ekstraksi berhasil")
+
+
+class RekonsiliasiTests(SimpleTestCase):
+    # baris KOLOM_PIB / KOLOM_SPPB
+    TGL = date(2025, 8, 19)
+
+    def pib(self, id, aju="", daftar="", tanggal=TGL, house="", master=""):
+        return (id, aju, daftar, tanggal, house, master)
+
+    def sppb(self, id, aju="", daftar="", tanggal=TGL, awb=""):
+        return (id, f"SPPB-{id}", aju, daftar, tanggal, awb)
+
+    def test_cocok_lewat_nomor_aju(self):
+        hasil = list(cocokkan([self.pib(1, aju="A1", daftar="002582", house="HAWB 1")],
+                              [self.sppb(10, aju="A1", daftar="2582", awb="hawb1")]))
+        self.assertEqual(len(hasil), 1)
+        self.assertEqual(hasil[0]["status"], COCOK)
+        self.assertEqual((hasil[0]["pib_id"], hasil[0]["sppb_id"]), (1, 10))
+
+    def test_cocok_lewat_nomor_pendaftaran(self):
+        # tanpa nomor aju: dicari per (nomor pendaftaran tanpa nol depan, tanggal)
+        hasil = list(cocokkan([self.pib(1, daftar="002582")], [self.sppb(10, daftar="2582")]))
+        self.assertEqual(hasil[0]["status"], COCOK)
+        self.assertEqual(hasil[0]["pib_id"], 1)
+
+    def test_tidak_cocok(self):
+        hasil = list(cocokkan([self.pib(1, aju="A1", daftar="2582", house="H1")],
+                              [self.sppb(10, aju="A1", daftar="9999", awb="H2")]))
+        self.assertEqual(hasil[0]["status"], TIDAK_COCOK)
+        self.assertEqual({s["field"] for s in hasil[0]["selisih"]}, {"nomor_pendaftaran", "awb"})
+
+    def test_tanpa_pasangan(self):
+        hasil = list(cocokkan([self.pib(1, aju="A1"), self.pib(2, aju="A2")],
+                              [self.sppb(10, aju="A1"), self.sppb(11, aju="X")]))
+        per_jenis = {(r["jenis"], r["status"]): r for r in hasil}
+        self.assertEqual(per_jenis[("pasangan", COCOK)]["pib_id"], 1)
+        self.assertEqual(per_jenis[("sppb", TANPA_PASANGAN)]["sppb_id"], 11)
+        self.assertEqual(per_jenis[("pib", TANPA_PASANGAN)]["pib_id"], 2)
+
+        counts = ringkasan_baru()
+        for record in hasil:
+            hitung(counts, record)
+        self.assertEqual(counts, {COCOK: 1, TIDAK_COCOK: 0, "tanpa_pasangan_pib": 1, "tanpa_pasangan_sppb": 1})
+
+    def test_pib_tertimpa_tidak_dilaporkan(self):
+        # dua PIB dengan nomor aju sama: yang terakhir dipakai, yang lama tidak muncul
+        hasil = list(cocokkan([self.pib(1, aju="A1"), self.pib(2, aju="A1")], [self.sppb(10, aju="A1")]))
+        self.assertEqual([(r["status"], r["pib_id"]) for r in hasil], [(COCOK, 2)])
+
+
+def _tunggu(kondisi, timeout=5):
+    batas = time.monotonic() + timeout
+    while not kondisi():
+        if time.monotonic() > batas:
+            raise AssertionError("kondisi tidak tercapai")
+        time.sleep(0.005)
+
+
+@override_settings(EXTRACT_METRICS_ENABLED=False)
+class AdmissionTests(SimpleTestCase):
+    def _masuk_di_thread(self, admission, hasil):
+        thread = threading.Thread(target=lambda: hasil.append(admission.masuk()))
+        thread.start()
+        self.addCleanup(thread.join, 5)
+        return thread
+
+    def test_antrian_penuh(self):
+        admission = Admission(1, 1, 5)
+        self.assertIsNone(admission.masuk())
+        hasil = []
+        thread = self._masuk_di_thread(admission, hasil)
+        _tunggu(lambda: admission.antrian == 1)
+        # slot terpakai dan antrian penuh: langsung ditolak
+        self.assertEqual(admission.masuk(), ANTRIAN_PENUH)
+
+        admission.keluar()
+        thread.join(5)
+        self.assertEqual(hasil, [None])
+        self.assertEqual((admission.aktif, admission.antrian), (1, 0))
+
+    def test_timeout(self):
+        admission = Admission(1, 1, 0.05)
+        self.assertIsNone(admission.masuk())
+        self.assertEqual(admission.masuk(), TIMEOUT)
+        self.assertEqual((admission.aktif, admission.antrian), (1, 0))
+
+    def test_fifo(self):
+        admission = Admission(1, 4, 5)
+        admission.masuk()
+        urutan = []
+        threads = []
+        for n in range(3):
+            thread = threading.Thread(target=lambda n=n: (admission.masuk(), urutan.append(n), admission.keluar()))
+            thread.start()
+            threads.append(thread)
+            _tunggu(lambda n=n: admission.antrian == n + 1)
+        admission.keluar()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(urutan, [0, 1, 2])
+        self.assertEqual((admission.aktif, admission.antrian), (0, 0))
+
+    def test_async_batal_saat_menunggu(self):
+        async def skenario():
+            admission = Admission(1, 2, 5)
+            self.assertIsNone(admission.masuk())
+            task = asyncio.ensure_future(admission.masuk_async())
+            await asyncio.sleep(0.01)
+            self.assertEqual(admission.antrian, 1)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            # tiket keluar dari antrian, slot tidak bocor
+            self.assertEqual(admission.antrian, 0)
+            admission.keluar()
+            self.assertEqual(admission.aktif, 0)
+
+        asyncio.run(skenario())
+
+    def test_async_diserahi_slot(self):
+        async def skenario():
+            admission = Admission(1, 2, 5)
+            admission.masuk()
+            task = asyncio.ensure_future(admission.masuk_async())
+            await asyncio.sleep(0.01)
+            admission.keluar()
+            self.assertIsNone(await task)
+            self.assertEqual((admission.aktif, admission.antrian), (1, 0))
+
+        asyncio.run(skenario())
+
+    def test_async_timeout(self):
+        async def skenario():
+            admission = Admission(1, 2, 0.05)
+            admission.masuk()
+            self.assertEqual(await admission.masuk_async(), TIMEOUT)
+            self.assertEqual((admission.aktif, admission.antrian), (1, 0))
+
+        asyncio.run(skenario())
+
+
+@tanpa_latar
+class JobTests(MediaSementara, TestCase):
+    def _job(self, status=ExtractionJob.STATUS_PENDING, data=None):
+        digest, _ = simpan_blob(data or _upload(PIB_BARANG_LAMA).read())
+        return ExtractionJob.objects.create(kode_tps="TPS01", status=status, dokumen=[["pib", digest]])
+
+    @mock.patch.object(jobs, "submit_job")
+    def test_submit_lalu_poll(self, submit_job):
+        response = self.client.post(reverse("extract-job-create"), _form_set())
+        self.assertEqual(response.status_code, 202)
+        job_id = response.json()["job"]["id"]
+        submit_job.assert_called_once()
+        job = ExtractionJob.objects.get(pk=job_id)
+        self.assertEqual(job.status, ExtractionJob.STATUS_PENDING)
+        self.assertEqual([kind for kind, _ in job.dokumen], ["pib", "sppb"])
+
+        response = self.client.get(reverse("extract-job-detail", args=[job_id]))
+        self.assertEqual(response.json()["job"]["status"], ExtractionJob.STATUS_PENDING)
+        response = self.client.get(reverse("extract-job-result", args=[job_id]))
+        self.assertEqual(response.status_code, 202)
+
+        jobs._process_job(job_id)
+        response = self.client.get(reverse("extract-job-result", args=[job_id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["pib"]["varian"], "pib_bc20_udara")
+        self.assertEqual(len(response.json()["sppb"]), 1)
+
+    @override_settings(EXTRACT_JOB_MAX_PENDING=1)
+    def test_antrian_penuh(self):
+        self._job()
+        response = self.client.post(reverse("extract-job-create"), _form_set())
+        self.assertEqual(response.status_code, 429)
+
+    @mock.patch.object(jobs, "extract_many")
+    def test_job_sudah_diambil_dilewati(self, extract_many):
+        job = self._job(status=ExtractionJob.STATUS_RUNNING)
+        jobs._process_job(job.id)
+        extract_many.assert_not_called()
+        job.refresh_from_db()
+        self.assertEqual(job.status, ExtractionJob.STATUS_RUNNING)
+
+    def test_job_gagal(self):
+        job = self._job(data=b"bukan pdf")
+        with self.assertLogs("extractor.jobs", "ERROR"):
+            jobs._process_job(job.id)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ExtractionJob.STATUS_FAILED)
+        self.assertTrue(job.message.startswith("Terjadi kesalahan: "))
+
+        response = self.client.get(reverse("extract-job-result", args=[job.id]))
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(response.json()["message"], job.message)
+
+    def test_pulihkan_job(self):
+        macet = self._job(status=ExtractionJob.STATUS_RUNNING)
+        ExtractionJob.objects.filter(pk=macet.pk).update(updated_at=timezone.now() - timedelta(minutes=31))
+        jalan = self._job(status=ExtractionJob.STATUS_RUNNING)
+        pending = self._job()
+
+        self.assertEqual(jobs.pulihkan_job(menit=30), (1, [pending.pk]))
+        macet.refresh_from_db()
+        jalan.refresh_from_db()
+        self.assertEqual(macet.status, ExtractionJob.STATUS_FAILED)
+        self.assertIn("worker berhenti", macet.message)
+        self.assertEqual(jalan.status, ExtractionJob.STATUS_RUNNING)
+
+    @override_settings(EXTRACT_JOB_RECOVER_ON_START=True)
+    @mock.patch.object(jobs, "_dipulihkan_pid", None)
+    @mock.patch.object(jobs, "submit_job")
+    def test_pulihkan_saat_request_pertama(self, submit_job):
+        pending = self._job()
+        with self.assertLogs("extractor.jobs", "INFO"):
+            self.client.get(reverse("extract-job-detail", args=[pending.pk]))
+        self.client.get(reverse("extract-job-detail", args=[pending.pk]))
+        # sekali per proses
+        submit_job.assert_called_once_with(pending.pk)
+
+
+class StorageTests(MediaSementara, TestCase):
+    DATA = b"%PDF-1.4 isi upload"
+    DIGEST = hashlib.sha256(DATA).hexdigest()
+
+    def test_layout_blob(self):
+        digest, path = simpan_blob(self.DATA)
+        self.assertEqual(digest, self.DIGEST)
+        self.assertEqual(path, os.path.join(self.media, "blobs", digest[:2], digest[2:4], digest))
+        self.assertEqual(baca_blob(digest), self.DATA)
+
+    @override_settings(EXTRACT_BLOB_COMPRESS=True)
+    def test_blob_terkompresi(self):
+        _, path = simpan_blob(self.DATA)
+        self.assertEqual(path, blob_path(self.DIGEST, compressed=True))
+        self.assertEqual(baca_blob(self.DIGEST), self.DATA)
+
+    def test_upload_ulang_tidak_ditulis_lagi(self):
+        _, path = simpan_blob(self.DATA)
+        os.utime(path, (0, 0))
+        self.assertEqual(simpan_blob(self.DATA), (self.DIGEST, path))
+        self.assertEqual(os.stat(path).st_mtime, 0)
+        self.assertEqual(os.listdir(os.path.dirname(path)), [self.DIGEST])
+
+    def test_blob_tidak_ada(self):
+        with self.assertRaises(FileNotFoundError):
+            baca_blob(self.DIGEST)
+
+    def test_catat_upload(self):
+        pertama = catat_upload("TPS01", "a.pdf", self.DIGEST, len(self.DATA))
+        kedua = catat_upload("TPS01", "b.pdf", self.DIGEST, len(self.DATA))
+        self.assertEqual(pertama.pk, kedua.pk)
+        ref = UploadedDocument.objects.get(pk=pertama.pk)
+        self.assertEqual((ref.nama, ref.jumlah_upload), ("b.pdf", 2))
+        # TPS lain: baris sendiri, blob tetap satu
+        catat_upload("TPS02", "a.pdf", self.DIGEST, len(self.DATA))
+        self.assertEqual(UploadedDocument.objects.filter(digest=self.DIGEST).count(), 2)
+
+    @override_settings(EXTRACT_PERSIST_IN_BACKGROUND=True, EXTRACT_ARCHIVE_MAX_PENDING_MB=1)
+    @mock.patch.object(storage, "catat_arsip_langsung")
+    @mock.patch.object(storage, "get_arsip_executor")
+    def test_antrian_arsip(self, executor, langsung):
+        arsipkan_upload("TPS01", "a.pdf", self.DATA, self.DIGEST)
+        executor.return_value.submit.assert_called_once_with(
+            storage._simpan_antrian, "TPS01", "a.pdf", self.DATA, self.DIGEST
+        )
+        self.assertEqual(storage._antrian_bytes, len(self.DATA))
+        langsung.assert_not_called()
+
+        # antrian (belum ditulis) + file ini > 1 MB: langsung ditulis di request
+        besar = b"x" * 2**20
+        arsipkan_upload("TPS01", "besar.pdf", besar)
+        langsung.assert_called_once()
+        self.assertEqual(executor.return_value.submit.call_count, 1)
+        self.assertEqual(baca_blob(hashlib.sha256(besar).hexdigest()), besar)
+        self.assertTrue(UploadedDocument.objects.filter(nama="besar.pdf").exists())
+
+        # thread arsip selesai menulis: antrian kosong lagi
+        storage._simpan_antrian("TPS01", "a.pdf", self.DATA, self.DIGEST)
+        self.assertEqual(storage._antrian_bytes, 0)
+        self.assertEqual(baca_blob(self.DIGEST), self.DATA)
+
+
+@tanpa_latar
+class RecordsTests(TestCase):
+    JOBS = [("pib", "a" * 64, None), ("sppb", "b" * 64, None)]
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.pib = utils.extract_pib(PIB_BARANG_LAMA)
+        cls.sppb = utils.extract_sppb(SPPB)
+
+    def test_simpan_ulang_tidak_duplikat(self):
+        pib = records.simpan_set("TPS01", self.JOBS, [self.pib, self.sppb])
+        records.simpan_set("TPS01", self.JOBS, [self.pib, self.sppb])
+        self.assertEqual(DokumenPIB.objects.count(), 1)
+        self.assertEqual(DokumenSPPB.objects.count(), 1)
+        self.assertEqual(BarangPIB.objects.filter(pib=pib).count(), len(self.pib["barang"]))
+
+        # hasil berubah (mis. parser diperbaiki): barang diganti, bukan ditambah
+        hasil = {**self.pib, "barang": self.pib["barang"][:1]}
+        records.simpan_set("TPS01", self.JOBS, [hasil, self.sppb])
+        self.assertEqual(BarangPIB.objects.filter(pib=pib).count(), 1)
+        self.assertEqual(DokumenSPPB.objects.get().pib_id, pib.id)
+
+    def test_teks_dipotong_sesuai_kolom(self):
+        barang = {**self.pib["barang"][0], "kode_satuan": "X" * 40, "negara": "N" * 100}
+        hasil = {**self.pib, "barang": [barang]}
+        records.simpan_set("TPS01", self.JOBS[:1], [hasil])
+        row = BarangPIB.objects.get()
+        self.assertEqual(row.kode_satuan, "X" * 16)
+        self.assertEqual(row.negara, "N" * 64)
+        # nilai lengkap tetap di data
+        self.assertEqual(row.pib.data["barang"][0]["negara"], "N" * 100)
+
+    def test_lookup(self):
+        pib = records.simpan_set("TPS01", self.JOBS, [self.pib, self.sppb])
+        nomor = self.pib["nomor_pengajuan"]
+
+        data = self.client.get(reverse("pib-list"), {"nomor_pengajuan": nomor}).json()
+        self.assertEqual([p["id"] for p in data["pib"]], [pib.id])
+        data = self.client.get(reverse("pib-list"), {"hs_code": self.pib["barang"][0]["hs_code"]}).json()
+        self.assertEqual(data["jumlah"], 1)
+        self.assertEqual(self.client.get(reverse("pib-list"), {"kode_tps": "TPS02"}).json()["jumlah"], 0)
+
+        data = self.client.get(reverse("pib-detail", args=[pib.id])).json()
+        self.assertEqual(data["pib"]["nomor_pengajuan"], nomor)
+        self.assertEqual(len(data["sppb"]), 1)
+        self.assertEqual(self.client.get(reverse("pib-detail", args=[pib.id + 1])).status_code, 404)
+
+        sppb = DokumenSPPB.objects.get()
+        data = self.client.get(reverse("sppb-list"), {"nomor": sppb.nomor_sppb}).json()
+        self.assertEqual([s["id"] for s in data["sppb"]], [sppb.id])
+        data = self.client.get(reverse("sppb-detail", args=[sppb.id])).json()
+        self.assertEqual(data["pib_id"], pib.id)
+
+
+class SppbBertahapTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.halaman = baca_halaman(SPPB)
+
+    def test_lengkap_di_halaman_pertama(self):
+        self.assertTrue(utils._sppb_lengkap()(self.halaman[:1]))
+
+    def test_field_dicari_di_halaman_baru_saja(self):
+        # AWB baru muncul di halaman kedua
+        pertama = utils.RE_AWB.sub("", self.halaman[0])
+        awb = utils.RE_AWB.search(self.halaman[0]).group(0)
+        lengkap = utils._sppb_lengkap()
+        self.assertFalse(lengkap([pertama]))
+        self.assertFalse(lengkap([pertama, ""]))
+        # field yang sudah ketemu di halaman 1 tidak perlu ada lagi di teks yang dicari
+        self.assertTrue(lengkap([pertama, "", awb]))
+
+    @mock.patch.object(utils, "parse_sppb", wraps=utils.parse_sppb)
+    def test_parse_sekali(self, parse_sppb):
+        data = utils.extract_sppb(os.path.join(DOKUMEN, "CHAN", "sppb2.pdf"))
+        self.assertEqual(data["varian"], "sppb")
+        parse_sppb.assert_called_once()
+
+
+@override_settings(EXTRACT_JOB_RECOVER_ON_START=False)
+class MetricsTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "metrics.sqlite3")
+
+    def _nilai(self, text):
+        # {"nama{labels}": nilai} dari teks Prometheus
+        return dict(line.rsplit(" ", 1) for line in text.splitlines() if not line.startswith("#"))
+
+    def test_dua_proses_dijumlahkan(self):
+        a, b = metrics.MetricsStore(self.path), metrics.MetricsStore(self.path)
+        labels = {"endpoint": "extract"}
+        a.catat([("extract_requests_total", {**labels, "outcome": "ok"}, 1)],
+                [("extract_request_duration_seconds", labels, 0.02)])
+        b.catat([("extract_requests_total", {**labels, "outcome": "ok"}, 2)],
+                [("extract_request_duration_seconds", labels, 0.3),
+                 ("extract_request_duration_seconds", labels, 60)])
+
+        # gauge per pid: pid lain yang masih hidup ikut dijumlahkan, pid mati dibuang
+        a.gauge_tambah("extract_requests_in_flight", labels, 2)
+        with mock.patch.object(metrics.os, "getpid", return_value=os.getppid()):
+            b.gauge_tambah("extract_requests_in_flight", labels, 1)
+        with mock.patch.object(metrics.os, "getpid", return_value=2**22 + 1):
+            b.gauge_tambah("extract_requests_in_flight", labels, 5)
+        hidup = {os.getpid(), os.getppid()}
+        with mock.patch.object(metrics, "_pid_hidup", side_effect=lambda pid: pid in hidup):
+            nilai = self._nilai(a.render())
+
+        self.assertEqual(nilai['extract_requests_total{endpoint="extract",outcome="ok"}'], "3")
+        bucket = 'extract_request_duration_seconds_bucket{endpoint="extract",le="%s"}'
+        self.assertEqual(nilai[bucket % "0.025"], "1")
+        self.assertEqual(nilai[bucket % "0.5"], "2")
+        self.assertEqual(nilai[bucket % "30.0"], "2")
+        self.assertEqual(nilai[bucket % "+Inf"], "3")
+        self.assertEqual(nilai['extract_request_duration_seconds_count{endpoint="extract"}'], "3")
+        self.assertAlmostEqual(float(nilai['extract_request_duration_seconds_sum{endpoint="extract"}']), 60.32)
+        self.assertEqual(nilai['extract_requests_in_flight{endpoint="extract"}'], "3")
+
+    def test_endpoint_metrics(self):
+        with override_settings(EXTRACT_METRICS_PATH=self.path), mock.patch.object(metrics, "_store", None):
+            metrics.catat_ditolak("extract", ANTRIAN_PENUH)
+            response = self.client.get(reverse("metrics"))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        text = response.content.decode()
+        self.assertIn("# TYPE extract_admission_rejected_total counter\n", text)
+        self.assertIn('extract_admission_rejected_total{alasan="antrian_penuh",endpoint="extract"} 1\n', text)
+
+    @override_settings(EXTRACT_METRICS_ENABLED=False)
+    def test_metrics_mati(self):
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 404)
+
+
+def _pdfium_kosong(source, potong=None):
+    # backend cepat yang tidak menghasilkan teks (mis. font tanpa ToUnicode)
+    for _ in backends.iter_pdfium(source, potong):
+        yield ""
+
+
+@mock.patch.dict(backends.BACKENDS, {backends.BACKEND_PDFIUM: _pdfium_kosong})
+class FallbackBackendTests(SimpleTestCase):
+    def test_pib_tanpa_barang_diulang_pdfplumber(self):
+        with self.assertLogs("extractor.utils", "INFO") as log:
+            data = utils.extract_pib(PIB_BARANG_LAMA, backend=backends.BACKEND_PDFIUM)
+        self.assertIn("Fallback PIB ke pdfplumber", log.output[-1])
+        self.assertEqual(len(data["barang"]), 2)
+        self.assertEqual(data, utils.extract_pib(PIB_BARANG_LAMA, backend=backends.BACKEND_PDFPLUMBER))
+
+    def test_pib_header_only_tanpa_fallback(self):
+        # header_only tidak membaca barang, jadi tidak ada dasar untuk fallback
+        data = utils.extract_pib(PIB_BARANG_LAMA, backend=backends.BACKEND_PDFIUM, header_only=True)
+        self.assertIn("nomor_pengajuan", [item["field"] for item in data["field_kosong"]])
+
+    def test_sppb_tanpa_nomor_diulang_pdfplumber(self):
+        with self.assertLogs("extractor.utils", "INFO") as log:
+            data = utils.extract_sppb(SPPB, backend=backends.BACKEND_PDFIUM)
+        self.assertIn("Fallback SPPB ke pdfplumber", log.output[-1])
+        self.assertIn("sppb", data)
+        self.assertEqual(data, utils.extract_sppb(SPPB, backend=backends.BACKEND_PDFPLUMBER))
+
+
+def _baris_ndjson(response):
+    return [json.loads(line) for line in b"".join(response.streaming_content).decode().splitlines()]
+
+
+def _upload_rusak(name="rusak.pdf"):
+    return SimpleUploadedFile(name, b"bukan pdf", content_type="application/pdf")
+
+
+@tanpa_latar
+class StreamDokumenTests(MediaSementara, TestCase):
+    def _events(self, response):
+        return [(line.pop("event"), line) for line in _baris_ndjson(response)]
+
+    def test_ndjson(self):
+        response = self.client.post(reverse("extract-documents") + "?stream=ndjson", _form_set())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        events = self._events(response)
+        self.assertEqual(sorted(event for event, _ in events[:-1]), ["pib", "sppb"])
+        self.assertEqual(events[-1], ("selesai", {"status": True, "message": "Ekstraksi berhasil sebagian"}))
+        self.assertEqual(dict(events)["sppb"]["index"], 1)
+
+    def test_sse(self):
+        response = self.client.post(reverse("extract-documents"), _form_set(), HTTP_ACCEPT="text/event-stream")
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        self.assertEqual(response["Cache-Control"], "no-cache")
+        blok = b"".join(response.streaming_content).decode().split("\n\n")
+        self.assertEqual(blok[-1], "")
+        events = [b.split("\n") for b in blok[:-1]]
+        self.assertEqual([e[0] for e in events][-1], "event: selesai")
+        self.assertEqual(sorted(e[0] for e in events[:-1]), ["event: pib", "event: sppb"])
+        self.assertTrue(all(e[1].startswith("data: {") for e in events))
+
+    def test_file_gagal_per_baris(self):
+        form = {**_form_set(), "file_sppb_1": _upload_rusak()}
+        events = self._events(self.client.post(reverse("extract-documents") + "?stream=ndjson", form))
+        error = dict(events)["error"]
+        self.assertEqual((error["jenis"], error["index"]), ("sppb", 1))
+        self.assertTrue(error["message"].startswith("Terjadi kesalahan: "))
+        self.assertEqual(events[-1], ("selesai", {"status": False, "message": "1 dokumen gagal diekstrak"}))
+        # PIB yang berhasil tetap disimpan
+        self.assertEqual(DokumenPIB.objects.count(), 1)
+
+    @override_settings(EXTRACT_ADMISSION_MAX_ACTIVE=1)
+    @mock.patch("extractor.admission._admission", None)
+    def test_ditutup_sebelum_diiterasi_slot_dilepas(self):
+        response = self.client.post(reverse("extract-documents") + "?stream=ndjson", _form_set())
+        self.assertEqual(get_admission().aktif, 1)
+        response.close()
+        self.assertEqual(get_admission().aktif, 0)
+        # close kedua tidak melepas slot dua kali
+        response.close()
+        self.assertEqual(get_admission().aktif, 0)
+
+
+@tanpa_latar
+class BatchTests(MediaSementara, TestCase):
+    def test_satu_baris_per_set(self):
+        form = {"jumlah_set": 3, **_form_set("TPS01", "set_1_"), **_form_set("TPS03", "set_3_"),
+                "set_2_kode_tps": "TPS02", "set_3_file_sppb_1": _upload_rusak()}
+        response = self.client.post(reverse("extract-batch"), form)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        baris = {line["set"]: line for line in _baris_ndjson(response)}
+        self.assertEqual(sorted(baris), [1, 2, 3])
+
+        self.assertTrue(baris[1]["status"])
+        self.assertEqual(baris[1]["kode_tps"], "TPS01")
+        self.assertEqual(baris[1]["pib"]["varian"], "pib_bc20_udara")
+        self.assertEqual(len(baris[1]["sppb"]), 1)
+
+        self.assertEqual(baris[2], {"set": 2, "kode_tps": "TPS02", "status": False,
+                                    "message": "kode_tps, file_pib, dan file_sppb wajib dikirim",
+                                    "pib": None, "sppb": None})
+
+        # file rusak menggagalkan set-nya saja
+        self.assertFalse(baris[3]["status"])
+        self.assertTrue(baris[3]["message"].startswith("Terjadi kesalahan: "))
+        self.assertEqual(list(DokumenPIB.objects.values_list("kode_tps", flat=True)), ["TPS01"])
+
+    def test_jumlah_set_wajib(self):
+        response = self.client.post(reverse("extract-batch"), {})
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(EXTRACT_POOL_WORKERS=0, EXTRACT_CACHE_ENABLED=False, EXTRACT_MAX_PARALLEL_PER_REQUEST=2)
+class PoolTests(SimpleTestCase):
+    def setUp(self):
+        # extractor palsu: isi file dikembalikan apa adanya, b"rusak" gagal
+        self.dipanggil = []
+        self.lanjut = threading.Event()
+        self.addCleanup(self.lanjut.set)
+
+        def extractor(source):
+            self.dipanggil.append((source, os.getpid()))
+            if source == b"rusak":
+                raise ValueError("rusak")
+            if source == b"lambat":
+                self.lanjut.wait(5)
+            return {"isi": source}
+
+        patcher = mock.patch.dict(pool.EXTRACTORS, {"pib": extractor, "sppb": extractor})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_tanpa_process_pool(self):
+        self.assertIsNone(pool.get_executor())
+        pool.extract_many([("pib", None, b"a")])
+        self.assertEqual(self.dipanggil, [(b"a", os.getpid())])
+
+    def test_urutan_hasil(self):
+        jobs = [("pib", None, b"a"), ("sppb", None, b"b"), ("sppb", None, b"c")]
+        self.assertEqual(pool.extract_many(jobs), [{"isi": b"a"}, {"isi": b"b"}, {"isi": b"c"}])
+
+    def test_file_gagal_hanya_setnya(self):
+        groups = [
+            [("pib", None, b"a"), ("sppb", None, b"rusak"), ("sppb", None, b"tidak_dikerjakan")],
+            [("pib", None, b"d")],
+        ]
+        hasil = list(pool.extract_stream(groups))
+        self.assertEqual(len(hasil), 2)
+        g, results, error = hasil[0]
+        self.assertEqual((g, results, str(error)), (0, None, "rusak"))
+        self.assertEqual(hasil[1], (1, [{"isi": b"d"}], None))
+        # sisa file set yang sudah gagal tidak dikerjakan
+        self.assertNotIn(b"tidak_dikerjakan", [source for source, _ in self.dipanggil])
+
+        with self.assertRaisesMessage(ValueError, "rusak"):
+            pool.extract_many(groups[0])
+
+    def test_async_urutan_hasil(self):
+        jobs = [("pib", None, b"a"), ("sppb", None, b"b"), ("sppb", None, b"c")]
+        self.assertEqual(asyncio.run(pool.extract_many_async(jobs)),
+                         [{"isi": b"a"}, {"isi": b"b"}, {"isi": b"c"}])
+
+    def test_async_gagal_membatalkan_file_lain(self):
+        # paralel 2: "lambat" dan "rusak" jalan, "tidak_dikerjakan" menunggu slot
+        jobs = [("pib", None, b"lambat"), ("sppb", None, b"rusak"), ("sppb", None, b"tidak_dikerjakan")]
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        with self.assertRaisesMessage(ValueError, "rusak"):
+            loop.run_until_complete(pool.extract_many_async(jobs))
+        self.assertNotIn(b"tidak_dikerjakan", [source for source, _ in self.dipanggil])
+
+
+@tanpa_latar
+@override_settings(EXTRACT_TIMING=True, EXTRACT_PERSIST_RESULTS=False, EXTRACT_PERSIST_UPLOADS=False)
+class ServerTimingTests(SimpleTestCase):
+    def test_header_dan_log(self):
+        with self.assertLogs("extractor.timing", "INFO") as log:
+            response = self.client.post(reverse("extract-documents"), _form_set())
+        self.assertEqual(response.status_code, 200)
+
+        timing = {}
+        for part in response["Server-Timing"].split(", "):
+            name, *params = part.split(";")
+            timing[name] = dict(p.split("=", 1) for p in params)
+        for name in ("antrian", "form", "upload", "arsip", "ekstraksi", "cache", "simpan", "total"):
+            self.assertIn(name, timing)
+            self.assertNotIn("desc", timing[name])
+        # tahap per file dari timer worker digabung: 1 PIB + 1 SPPB
+        for name in ("dokumen", "buka", "teks", "parse"):
+            self.assertEqual(timing[name]["desc"], '"2 file"')
+
+        record = json.loads(log.records[-1].getMessage().split(" ", 1)[1])
+        self.assertEqual(record["endpoint"], "extract")
+        self.assertEqual(record["kode_tps"], "TPS01")
+        self.assertEqual(sorted((f["kind"], f["varian"]) for f in record["files"]),
+                         [("pib", "pib_bc20_udara"), ("sppb", "sppb")])
+
+
+def _halaman_pertama(path):
+    return baca_halaman(path)[0]
+
+
+class VarianTests(SimpleTestCase):
+    def test_pib_laut(self):
+        text = _halaman_pertama(os.path.join(DOKUMEN, "CHAN", "pib1.pdf"))
+        self.assertEqual(varian.varian_pib(text), "pib_bc20_laut")
+
+    def test_pib_udara(self):
+        self.assertEqual(varian.varian_pib(_halaman_pertama(PIB_BARANG_LAMA)), "pib_bc20_udara")
+
+    def test_pib_cara_pengangkutan_lain(self):
+        text = _halaman_pertama(os.path.join(DOKUMEN, "CHAN", "pib1.pdf"))
+        text = text.replace("Cara Pengangkutan:LAUT", "Cara Pengangkutan:KERETA")
+        self.assertEqual(varian.varian_pib(text), "pib_bc20")
+        self.assertEqual(varian.varian_pib(text, template="pib_bc20"), "pib_bc20")
+
+    def test_template_cukup_sebagai_penanda(self):
+        self.assertEqual(varian.varian_pib("", template="pib_bc20"), "pib_bc20")
+        self.assertEqual(varian.varian_pib("Cara Pengangkutan: UDARA", template="pib_bc20"),
+                         "pib_bc20_udara")
+
+    def test_sppb(self):
+        text = _halaman_pertama(SPPB)
+        self.assertEqual(varian.varian_sppb(text), "sppb")
+        self.assertEqual(varian.varian_pib(text), varian.TIDAK_DIKENAL)
+        self.assertEqual(varian.varian_sppb(_halaman_pertama(PIB_BARANG_LAMA)), varian.TIDAK_DIKENAL)
+
+    def test_tidak_dikenal(self):
+        text = _halaman_pertama(os.path.join(DOKUMEN, "CHANDRA01", "php9F72.tmp"))
+        self.assertEqual(varian.varian_pib(text), varian.TIDAK_DIKENAL)
+        self.assertEqual(varian.varian_sppb(text), varian.TIDAK_DIKENAL)
+        self.assertEqual(varian.varian_pib(""), varian.TIDAK_DIKENAL)
+
+    def test_dilaporkan_di_hasil(self):
+        self.assertEqual(utils.extract_pib(PIB_BARANG_LAMA)["varian"], "pib_bc20_udara")
+        self.assertEqual(utils.extract_sppb(SPPB)["varian"], "sppb")
+
+
+PIB_CHANDRA = os.path.join(DOKUMEN, "CHANDRA01", "pib.pdf")
+
+
+class TemplateTests(SimpleTestCase):
+    SARANA_CHANDRA = {
+        "kode_bendera": "KR",
+        "negara": "KOREA, REPUBLIC OF",
+        "nama": "PORT KLANG VOYAGER",
+        "voyage_flight": "2507S",
+        "bendera": "KOREA, REPUBLIC OF",
+    }
+
+    def test_kotak_diskalakan(self):
+        _, field = templates.kotak_template("pib_bc20", 1190, 1684)
+        self.assertEqual(field["sarana_pengangkutan.nama"], (672.0, 280.0, 1160.0, 298.0))
+
+    def test_region_sama_di_kedua_backend(self):
+        for backend in backends.BACKENDS:
+            with self.subTest(backend=backend):
+                potong = templates.Potongan("pib")
+                list(iter_halaman(PIB_CHANDRA, backend, potong))
+                self.assertEqual(potong.template, "pib_bc20")
+                nilai = potong.nilai()
+                self.assertEqual(nilai["pendaftaran.nomor"], "495445")
+                self.assertEqual(nilai["sarana_pengangkutan.voyage_flight"], "2507S")
+
+    def test_formulir_lain_tanpa_template(self):
+        potong = templates.Potongan("pib")
+        list(iter_halaman(SPPB, None, potong))
+        self.assertIsNone(potong.template)
+        self.assertEqual(potong.nilai(), {})
+
+    @override_settings(EXTRACT_TEMPLATES=True)
+    def test_sarana_chandra_dari_template(self):
+        # teks halaman yang diratakan mencampur kolom negara pengirim ke
+        # blok sarana, jadi regex tidak menemukan apa pun; region template bisa
+        result = utils.extract_pib(PIB_CHANDRA)
+        self.assertEqual(result["varian"], "pib_bc20_laut")
+        self.assertEqual(result["sarana_pengangkutan"], self.SARANA_CHANDRA)
+
+    @override_settings(EXTRACT_TEMPLATES=False)
+    def test_sarana_chandra_tanpa_template(self):
+        result = utils.extract_pib(PIB_CHANDRA)
+        self.assertEqual(result["varian"], "pib_bc20_laut")
+        self.assertEqual(result["sarana_pengangkutan"], dict.fromkeys(self.SARANA_CHANDRA))
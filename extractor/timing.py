@@ -0,0 +1,142 @@
+"""
+Timer per tahap ekstraksi (upload, arsip, buka PDF, teks, regex, barang,
+sarana, ...). Hanya aktif kalau EXTRACT_TIMING atau EXTRACT_METRICS_ENABLED
+menyala; kalau mati, stage() cuma mengembalikan nullcontext sehingga
+overhead-nya bisa diabaikan.
+"""
+import contextvars
+import json
+import logging
+import time
+from contextlib import contextmanager, nullcontext
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# timer milik ekstraksi satu file yang sedang jalan (di proses worker)
+_timer = contextvars.ContextVar("extract_timer", default=None)
+
+
+class Timer:
+    def __init__(self):
+        self.stages = {}
+        # jumlah (halaman, byte upload, cache hit, ...)
+        self.counts = {}
+        # label per file (varian formulir, ...)
+        self.labels = {}
+        # (kind, index, Timer) per file, diisi dari hasil worker
+        self.files = []
+
+    def add(self, name, seconds):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def hitung(self, name, n=1):
+        self.counts[name] = self.counts.get(name, 0) + n
+
+    def tandai(self, name, value):
+        self.labels[name] = value
+
+    @contextmanager
+    def stage(self, name):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - t0)
+
+    def add_file(self, kind, index, file_timer):
+        if file_timer is not None:
+            self.files.append((kind, index, file_timer))
+
+    def server_timing(self):
+        """
+        Nilai header Server-Timing: tahap request + jumlah tiap tahap dari
+        semua file (file jalan paralel, jadi jumlahnya bisa melebihi total).
+        """
+        per_file = {}
+        for _, _, file_timer in self.files:
+            for name, seconds in file_timer.stages.items():
+                per_file[name] = per_file.get(name, 0.0) + seconds
+        parts = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.stages.items()]
+        parts += [
+            f'{name};desc="{len(self.files)} file";dur={seconds * 1000:.1f}'
+            for name, seconds in per_file.items()
+        ]
+        return ", ".join(parts)
+
+    def log(self, endpoint, **fields):
+        record = {
+            "endpoint": endpoint,
+            **fields,
+            "stages_ms": _ms(self.stages),
+            "counts": self.counts,
+            "files": [
+                {"kind": kind, "index": index, "stages_ms": _ms(t.stages), "counts": t.counts, **t.labels}
+                for kind, index, t in self.files
+            ],
+        }
+        logger.info("extract_timing %s", json.dumps(record, default=str))
+
+
+def _ms(stages):
+    return {name: round(seconds * 1000, 2) for name, seconds in stages.items()}
+
+
+def timing_aktif():
+    return getattr(settings, "EXTRACT_TIMING", False)
+
+
+def timer_request():
+    """
+    Timer baru untuk satu request, atau None kalau timing dan metrics
+    sama-sama dimatikan.
+    """
+    if timing_aktif() or getattr(settings, "EXTRACT_METRICS_ENABLED", True):
+        return Timer()
+    return None
+
+
+def stage(name, timer=None):
+    """
+    with stage("teks"): ... — dicatat ke timer yang diberikan, atau ke timer
+    file yang sedang jalan (lihat jalankan_dengan_timer). Tanpa timer: no-op.
+    """
+    if timer is None:
+        timer = _timer.get()
+        if timer is None:
+            return nullcontext()
+    return timer.stage(name)
+
+
+def hitung(name, n=1):
+    """
+    Tambah hitungan di timer file yang sedang jalan; tanpa timer: no-op.
+    """
+    timer = _timer.get()
+    if timer is not None:
+        timer.hitung(name, n)
+
+
+def tandai(name, value):
+    """
+    Beri label timer file yang sedang jalan (mis. varian formulir); tanpa timer: no-op.
+    """
+    timer = _timer.get()
+    if timer is not None:
+        timer.tandai(name, value)
+
+
+def jalankan_dengan_timer(fn, *args):
+    """
+    Jalankan fn(*args) dengan timer file aktif; hasil (result, Timer).
+    Tahap "dokumen" = durasi ekstraksi file itu seluruhnya.
+    """
+    timer = Timer()
+    token = _timer.set(timer)
+    try:
+        with timer.stage("dokumen"):
+            result = fn(*args)
+        return result, timer
+    finally:
+        _timer.reset(token)
@@ -1,6 +1,28 @@
 from django.urls import path
-from .views import ExtractDocumentsView
+from .views import (
+    ExtractBatchView,
+    ExtractDocumentsView,
+    ExtractJobCreateView,
+    ExtractJobDetailView,
+    ExtractJobResultView,
+    PIBDetailView,
+    PIBListView,
+    RekonsiliasiView,
+    SPPBDetailView,
+    SPPBListView,
+    extract_async,
+)
 
 urlpatterns = [
     path("extract/", ExtractDocumentsView.as_view(), name="extract-documents"),
+    path("extract/async/", extract_async, name="extract-documents-async"),
+    path("extract/batch/", ExtractBatchView.as_view(), name="extract-batch"),
+    path("extract/jobs/", ExtractJobCreateView.as_view(), name="extract-job-create"),
+    path("extract/jobs/<uuid:job_id>/", ExtractJobDetailView.as_view(), name="extract-job-detail"),
+    path("extract/jobs/<uuid:job_id>/result/", ExtractJobResultView.as_view(), name="extract-job-result"),
+    path("pib/", PIBListView.as_view(), name="pib-list"),
+    path("pib/<int:pib_id>/", PIBDetailView.as_view(), name="pib-detail"),
+    path("sppb/", SPPBListView.as_view(), name="sppb-list"),
+    path("sppb/<int:sppb_id>/", SPPBDetailView.as_view(), name="sppb-detail"),
+    path("rekonsiliasi/", RekonsiliasiView.as_view(), name="rekonsiliasi"),
 ]
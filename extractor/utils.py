@@ -1,176 +1,156 @@
-import pdfplumber
-import re
-import sys
-
-def extract_bl_awb(all_text):
+import logging
+from .patterns import (
+    RE_ALAMAT,
+    RE_ANGKA_NEGARA,
+    RE_ANGKA_SAJA,
+    RE_AWB,
+    RE_BARANG_BARU,
+    RE_BARANG_LAMA,
+    RE_BC11,
+    RE_BENDERA,
+    RE_BERAT,
+    RE_BERAT_BERSIH,
+    RE_BERAT_DESIMAL,
+    RE_BLOK_IMPORTIR,
+    RE_DIGIT,
+    RE_FLIGHT_AIRLINE,
+    RE_FLIGHT_ALNUM,
+    RE_FLIGHT_BENDERA,
+    RE_FLIGHT_NUMERIK,
+    RE_HALAMAN_PIB,
+    RE_HOUSE_BL_AWB,
+    RE_IDENTITAS,
+    RE_INVOICE,
+    RE_JUMLAH_KEMASAN,
+    RE_JUMLAH_PETI_KEMAS,
+    RE_KANTOR_PABEAN,
+    RE_KODE_NEGARA,
+    RE_KODE_NEGARA_TAIL,
+    RE_KODE_SATUAN,
+    RE_LABEL_KEMASAN,
+    RE_LOKASI_BARANG,
+    RE_MASTER_BL_AWB,
+    RE_MERK_KEMASAN,
+    RE_METRIC_TON,
+    RE_NAMA,
+    RE_NAMA_ALAMAT,
+    RE_NEGARA,
+    RE_NIB,
+    RE_NITKU,
+    RE_NOMOR_AJU,
+    RE_NOMOR_PENGAJUAN,
+    RE_NOMOR_PETI_KEMAS,
+    RE_NOMOR_POS,
+    RE_NPWP,
+    RE_NPWP_ANGKA,
+    RE_NP_PPJK,
+    RE_PELABUHAN_MUAT,
+    RE_PELABUHAN_TRANSIT,
+    RE_PELABUHAN_TUJUAN,
+    RE_PENDAFTARAN,
+    RE_PENDAFTARAN_ALT,
+    RE_PENDAFTARAN_PIB,
+    RE_PERKIRAAN_TIBA,
+    RE_POIN_BERIKUTNYA,
+    RE_POTONG_BERAT,
+    RE_SARANA_INLINE,
+    RE_SARANA_INLINE_SUBS,
+    RE_SARANA_LABEL,
+    RE_SARANA_PENGANGKUT,
+    RE_SPASI,
+    RE_SPPB_NOMOR,
+    RE_VOY_FLIGHT,
+    WAJIB_BARANG_BARU,
+    WAJIB_BARANG_LAMA,
+)
+from .backends import BACKEND_PDFPLUMBER, backend_aktif, iter_halaman
+from .templates import Potongan, template_aktif
+from .timing import stage, tandai
+from .varian import TIDAK_DIKENAL, varian_pib, varian_sppb
+from .index import ANCHORS_PIB, ANCHORS_SPPB, DocumentIndex
+
+logger = logging.getLogger(__name__)
+
+def extract_bl_awb(all_text, index=None):
     """
     Cari House-BL/AWB dan Master-BL/AWB di text dokumen.
     """
+    if index is None:
+        index = DocumentIndex(all_text)
+
     result = {
         "house_bl_awb": None,
         "master_bl_awb": None,
     }
 
     # Pola langsung (angka/huruf campuran panjang, bisa ada slash)
-    m = re.search(r"House[-\s]?BL/AWB\s*:?\s*([A-Z0-9/.-]+)", all_text, flags=re.I)
+    m = index.search(RE_HOUSE_BL_AWB, "House")
     if m:
         house_bl_awb = m.group(1).strip()
         result["house_bl_awb"] = house_bl_awb[3:]
 
-    m = re.search(r"Master[-\s]?BL/AWB\s*:?\s*([A-Z0-9/.-]+)", all_text, flags=re.I)
+    m = index.search(RE_MASTER_BL_AWB, "Master")
     if m:
         master_bl_awb = m.group(1).strip()
         result["master_bl_awb"] = master_bl_awb[3:]
 
     return result
 
-def extract_sarana_pengangkutan_main(all_text):
-    # 1) Kumpulkan baris antara "10. Nama Sarana Pengangkutan..." s/d poin berikutnya (mis. "11.")
-    
-    lines = all_text.splitlines()
-    start_idx = None
-    for i, line in enumerate(lines):
-        if line.strip().startswith("10. Nama Sarana Pengangkutan"):
-            start_idx = i
-            break
-
-    result = {
-        "kode_bendera": None,   # e.g. US, ID, PA
-        "negara": None,         # e.g. GERMANY, JAPAN, TAIWAN
-        "nama": None,           # e.g. FEDERAL EXPRESS CORPORATION, MY INDO AIRLINES, EVER BOOMY
-        "voyage_flight": None,  # e.g. FX5194, 2Y6011, 1147-082A
-        "bendera": None,        # e.g. UNITED STATES, INDONESIA, PANAMA
-    }
-
+def _blok_sarana(index):
+    """
+    Baris blok "10. Nama Sarana Pengangkutan..." s/d poin berikutnya (mis.
+    "11."): (tail label, baris bersih), atau None kalau label tidak ada.
+    """
+    lines = index.lines
+    start_idx = index.line_starting_with("10. Nama Sarana Pengangkutan")
     if start_idx is None:
-        return result
+        return None
 
     # Ambil tail di baris label (mungkin berisi kode bendera, mis. "… Bendera PA")
-    label_line = lines[start_idx]
-    tail = re.sub(r"^10\.\s*Nama Sarana Pengangkutan\s*&\s*No\.\s*Voy/Flight\s*dan\s*Bendera\s*:?", "", label_line, flags=re.I).strip()
+    tail = RE_SARANA_LABEL.sub("", lines[start_idx]).strip()
 
-    block = []
-    if tail:
-        block.append(tail)
+    block = [tail]
 
     # Himpun baris berikutnya sampai ketemu next point (mis. "11.", "12.", dst)
     for j in range(start_idx + 1, len(lines)):
         s = lines[j].strip()
-        if re.match(r"^\d{1,2}\.\s", s):  # berhenti saat heading poin berikutnya
+        if RE_POIN_BERIKUTNYA.match(s):  # berhenti saat heading poin berikutnya
             break
         block.append(s)
 
     # Bersihkan: buang kosong & noise (contoh "PENJUAL SG/TW/DE")
-    cleaned = []
-    for s in block:
-        s2 = s.strip()
-        if not s2:
-            continue
-        if s2.upper().startswith("PENJUAL"):
-            continue
-        cleaned.append(s2)
+    return tail, [s for s in block if s and not s.upper().startswith("PENJUAL")]
 
-    if not cleaned:
-        return result
+# kata kedua yang menandakan baris bukan flight (mis. '1 PACKAGE', '1 BULK')
+BUKAN_FLIGHT = ("PACKAGE", "BULK", "FCL", "KG", "PKG")
 
-    # ---- Heuristik 0: kode_bendera dari tail/first token yang hanya 2-3 huruf kapital ----
-    # contoh: "PA", "US", "ID" di tail atau baris pertama
-    def take_country_code_from(text):
-        m = re.match(r"^([A-Z]{2,3})$", text.strip())
-        return m.group(1) if m else None
-
-    # Jika tail berupa "PA/US/ID", tandai sebagai kode_bendera & drop dari list
-    if result["kode_bendera"] is None and cleaned:
-        code = take_country_code_from(cleaned[0])
-        if code:
-            result["kode_bendera"] = code
-            cleaned = cleaned[1:]  # buang baris tersebut
-
-    # Cadangan: jika tail di label memuat kode bendera nyelip (mis. “… Bendera US”)
-    if result["kode_bendera"] is None and tail:
-        m = re.search(r"\b([A-Z]{2,3})\b$", tail)
-        if m:
-            result["kode_bendera"] = m.group(1)
-
-    # ---- Heuristik 1: deteksi line flight + bendera (format paling stabil) ----
-    # Cocok: "FX5194 UNITED STATES", "2Y6011 INDONESIA", "1147-082A PANAMA"
-    flight_idx = None
-    for idx, s in enumerate(cleaned):
-        m = re.match(r"^([A-Z0-9]{1,4}\d{2,6}(?:-[A-Z0-9]+)?)\s+([A-Z][A-Z\s,]+)$", s)
-        if m:
-            result["voyage_flight"] = m.group(1)
-            result["bendera"] = m.group(2).strip()
-            flight_idx = idx
-            break
-
-    # ---- Heuristik 2: mapping negara & nama ----
-    # Pola umum multi-line:
-    #   [NEGARA]
-    #   [NAMA]
-    #   [FLIGHT + BENDERA]
-    #
-    # Jadi jika kita temukan flight line pada index k, maka nama ≈ cleaned[k-1], negara ≈ cleaned[k-2] (jika ada).
-    if flight_idx is not None:
-        if flight_idx - 1 >= 0 and not result["nama"]:
-            result["nama"] = cleaned[flight_idx - 1]
-        if flight_idx - 2 >= 0 and not result["negara"]:
-            # Ambil yang uppercase dan tanpa digit agar cenderung negara
-            cand = cleaned[flight_idx - 2]
-            if re.match(r"^[A-Z][A-Z\s,\.()-]+$", cand) and not re.search(r"\d", cand):
-                result["negara"] = cand
-
-    # ---- Heuristik 3: jika flight belum ketemu, coba INLINE flatten (Format 1) ----
-    if result["voyage_flight"] is None:
-        flat = " ".join(cleaned)
-        # Contoh inline: "US GERMANY FEDERAL EXPRESS CORPORATION FX5194 UNITED STATES"
-        m = re.search(
-            r"\b([A-Z]{2,3})\s+([A-Z][A-Z\s,]+?)\s+([A-Z0-9\s\.\-&]+?)\s+([A-Z0-9]{1,4}\d{2,6}(?:-[A-Z0-9]+)?)\s+([A-Z][A-Z\s,]+)\b",
-            flat
-        )
-        if m:
-            # Jangan menimpa kode_bendera kalau sudah ada dari tail, kecuali kosong
-            if result["kode_bendera"] is None:
-                result["kode_bendera"] = m.group(1).strip()
-            if result["negara"] is None:
-                result["negara"] = m.group(2).strip()
-            if result["nama"] is None:
-                result["nama"] = m.group(3).strip()
-            result["voyage_flight"] = m.group(4).strip()
-            result["bendera"] = m.group(5).strip()
-
-    # ---- Heuristik 4: jika negara/nama masih kosong, isi konservatif dari urutan awal ----
-    # Setelah buang flight line, urutan paling sering: [NEGARA][NAMA]
-    if result["negara"] is None or result["nama"] is None:
-        # Buang baris flight dari list kerja
-        work = cleaned[:]
-        if flight_idx is not None:
-            work.pop(flight_idx)
-        # Ambil negara kandidat pertama yang uppercase-only (tanpa digit)
-        if result["negara"] is None:
-            for s in work:
-                if re.match(r"^[A-Z][A-Z\s,\.()-]+$", s) and not re.search(r"\d", s):
-                    result["negara"] = s
-                    break
-        # Nama: baris uppercase yang bukan negara dan bukan kode 2-3 huruf
-        if result["nama"] is None:
-            for s in work:
-                if not re.search(r"\d", s) and not re.match(r"^[A-Z]{2,3}$", s):
-                    # Hindari memilih negara jika sudah terisi dan s == negara
-                    if result["negara"] and s == result["negara"]:
-                        continue
-                    result["nama"] = s
-                    break
-
-    return result
+def _flight_standar(s):
+    # pola 1: airline code + angka (FX5194, 2Y6011); pola 2: numeric +
+    # dash/alfanumerik (1147-082A); pola 3: kombinasi huruf+angka lain
+    m = RE_FLIGHT_AIRLINE.match(s) or RE_FLIGHT_NUMERIK.match(s) or RE_FLIGHT_ALNUM.match(s)
+    if m:
+        second_token = m.group(2).split()[0] if m.group(2) else ""
+        if second_token.upper() in BUKAN_FLIGHT:
+            return None
+    return m
 
-def extract_sarana_pengangkutan_subs(all_text):
-    # 1) Kumpulkan baris antara "10. Nama Sarana Pengangkutan..." s/d poin berikutnya (mis. "11.")
-    lines = all_text.splitlines()
-    start_idx = None
-    for i, line in enumerate(lines):
-        if line.strip().startswith("10. Nama Sarana Pengangkutan"):
-            start_idx = i
-            break
+def extract_sarana_pengangkutan(all_text, index=None, fallback=True):
+    """
+    Sarana pengangkutan PIB (kode_bendera, negara, nama, voyage_flight,
+    bendera) dari blok "10. Nama Sarana Pengangkutan".
+
+    Blok dikumpulkan sekali dan tiap baris dicocokkan dengan semua pola
+    voyage/flight dalam satu lintasan. Prioritasnya:
+      1. baris "flight + bendera" (FX5194 UNITED STATES, 1147-082A PANAMA)
+      2. blok diratakan jadi satu baris (kode, negara, nama, flight, bendera)
+    dan kalau fallback=True (voyage kapal):
+      3. "angka + negara" (3 PANAMA) atau angka saja (3) + baris bendera
+      4. airline + angka / angka-dash / alfanumerik + bendera
+      5. seperti 2 dengan nomor voyage minimal 1 digit
+    Field yang masih kosong diisi dari urutan baris: [NEGARA][NAMA][FLIGHT].
+    """
+    if index is None:
+        index = DocumentIndex(all_text)
 
     result = {
         "kode_bendera": None,   # e.g. US, ID, PA
@@ -180,152 +160,103 @@ def extract_sarana_pengangkutan_subs(all_text):
         "bendera": None,        # e.g. UNITED STATES, INDONESIA, PANAMA
     }
 
-    if start_idx is None:
+    blok = _blok_sarana(index)
+    if blok is None or not blok[1]:
         return result
+    tail, cleaned = blok
 
-    # Ambil tail di baris label (mungkin berisi kode bendera, mis. "… Bendera PA")
-    label_line = lines[start_idx]
-    tail = re.sub(r"^10\.\s*Nama Sarana Pengangkutan\s*&\s*No\.\s*Voy/Flight\s*dan\s*Bendera\s*:?", "", label_line, flags=re.I).strip()
-
-    block = []
-    if tail:
-        block.append(tail)
+    # kode_bendera: baris pertama yang cuma kode 2-3 huruf (lalu dibuang),
+    # atau kode yang nyelip di ujung label (mis. "… Bendera US")
+    m = RE_KODE_NEGARA.match(cleaned[0])
+    if m:
+        result["kode_bendera"] = m.group(1)
+        cleaned = cleaned[1:]
+    elif tail:
+        m = RE_KODE_NEGARA_TAIL.search(tail)
+        if m:
+            result["kode_bendera"] = m.group(1)
 
-    # Himpun baris berikutnya sampai ketemu next point (mis. "11.", "12.", dst)
-    for j in range(start_idx + 1, len(lines)):
-        s = lines[j].strip()
-        if re.match(r"^\d{1,2}\.\s", s):  # berhenti saat heading poin berikutnya
+    # satu lintasan: posisi pertama tiap pola (3 dan 4 hanya dipakai kalau
+    # 1 tidak ketemu di baris mana pun, jadi lintasan berhenti di pola 1)
+    flight = angka = standar = None
+    for i, s in enumerate(cleaned):
+        m = RE_FLIGHT_BENDERA.match(s)
+        if m:
+            flight = (i, m)
             break
-        block.append(s)
-
-    # Bersihkan: buang kosong & noise (contoh "PENJUAL SG/TW/DE")
-    cleaned = []
-    for s in block:
-        s2 = s.strip()
-        if not s2:
-            continue
-        if s2.upper().startswith("PENJUAL"):
+        if not fallback:
             continue
-        cleaned.append(s2)
-
-    if not cleaned:
-        return result
-
-    def take_country_code_from(text):
-        m = re.match(r"^([A-Z]{2,3})$", text.strip())
-        return m.group(1) if m else None
-
-    # Jika baris pertama cuma kode 2-3 huruf, ambil sebagai kode_bendera
-    if result["kode_bendera"] is None and cleaned:
-        code = take_country_code_from(cleaned[0])
-        if code:
-            result["kode_bendera"] = code
-            cleaned = cleaned[1:]
-
-    # Cadangan: jika tail di label memuat kode bendera nyelip (mis. “… Bendera US”)
-    if result["kode_bendera"] is None and tail:
-        m_tail = re.search(r"\b([A-Z]{2,3})\b$", tail)
-        if m_tail:
-            result["kode_bendera"] = m_tail.group(1)
+        if angka is None:
+            m = RE_ANGKA_NEGARA.match(s) or RE_ANGKA_SAJA.match(s)
+            if m:
+                angka = (i, m)
+        if standar is None:
+            m = _flight_standar(s)
+            if m:
+                standar = (i, m)
 
-    # ---- Heuristik tambahan: cek pola 'angka saja' atau 'angka + negara' ----
     flight_idx = None
-    for idx, s in enumerate(cleaned):
-        # pola: "3 PANAMA" atau "12 INDONESIA"
-        m_num_country = re.match(r"^(\d{1,4})\s+([A-Z][A-Z\s,]+)$", s)
-        if m_num_country:
-            result["voyage_flight"] = m_num_country.group(1).strip()
-            result["bendera"] = m_num_country.group(2).strip()
-            flight_idx = idx
-            break
-
-        # pola: baris hanya angka (contoh "3") — kemungkinan next line adalah negara/bendera
-        m_only_num = re.match(r"^(\d{1,4})\s*$", s)
-        if m_only_num:
-            result["voyage_flight"] = m_only_num.group(1).strip()
-            # jika ada baris berikutnya, ambil sebagai bendera bila cocok
-            if idx + 1 < len(cleaned):
-                cand = cleaned[idx + 1]
-                if re.match(r"^[A-Z][A-Z\s,]+$", cand):
-                    result["bendera"] = cand.strip()
-                    flight_idx = idx
-                    break
-            # jika tidak ada bendera di next line, kita tetap terima voyage
-            flight_idx = idx
-            break
-
-    # ---- Heuristik standar: flight + bendera (airline+angka, angka-dash, dll) ----
-    if result["voyage_flight"] is None:
-        for idx, s in enumerate(cleaned):
-            # pola 1: Airline code + angka (FX5194, 2Y6011)
-            m = re.match(r"^([A-Z]{1,3}\d{2,6})\s+([A-Z][A-Z\s,]+)$", s)
-            if not m:
-                # pola 2: numeric + dash/alfanumerik (1147-082A)
-                m = re.match(r"^(\d{1,6}(?:-[A-Z0-9]+)?)\s+([A-Z][A-Z\s,]+)$", s)
-            if not m:
-                # pola 3: kombinasi lain (ambil jika ada huruf+angka)
-                m = re.match(r"^([A-Z0-9]{2,8})\s+([A-Z][A-Z\s,]+)$", s)
-
-            if m:
-                # cegah menangkap baris yang jelas bukan flight (mis: '1 PACKAGE' atau '1 BULK' -> cek kata kedua bukan 'PACKAGE'/'BULK'/'FCL')
-                second_token = m.group(2).split()[0] if m.group(2) else ""
-                if second_token.upper() in ("PACKAGE", "BULK", "FCL", "KG", "PKG"):
-                    continue
+    if flight is not None:
+        flight_idx, m = flight
+        result["voyage_flight"] = m.group(1)
+        result["bendera"] = m.group(2).strip()
+        # Pola umum multi-line: [NEGARA] [NAMA] [FLIGHT + BENDERA]
+        if flight_idx - 1 >= 0:
+            result["nama"] = cleaned[flight_idx - 1]
+    else:
+        m = RE_SARANA_INLINE.search(" ".join(cleaned))
+        if m is None and fallback:
+            if angka is not None:
+                flight_idx, m = angka
+                result["voyage_flight"] = m.group(1).strip()
+                if m.re is RE_ANGKA_NEGARA:
+                    result["bendera"] = m.group(2).strip()
+                # angka saja: bendera dari baris berikutnya kalau cocok
+                elif flight_idx + 1 < len(cleaned) and RE_BENDERA.match(cleaned[flight_idx + 1]):
+                    result["bendera"] = cleaned[flight_idx + 1].strip()
+            elif standar is not None:
+                flight_idx, m = standar
                 result["voyage_flight"] = m.group(1).strip()
                 result["bendera"] = m.group(2).strip()
-                flight_idx = idx
-                break
-
-    # ---- Heuristik mapping negara & nama (berdasarkan posisi flight_idx) ----
-    if flight_idx is not None:
-        # nama biasanya baris sebelum flight
-        if flight_idx - 1 >= 0 and not result["nama"]:
-            candidate_name = cleaned[flight_idx - 1]
-            # Hindari memilih sesuatu yang terlihat seperti kode (2-3 huruf) atau angka
-            if not re.match(r"^[A-Z]{2,3}$", candidate_name) and not re.search(r"\d", candidate_name):
-                result["nama"] = candidate_name
-        # negara biasanya baris sebelum nama
-        if flight_idx - 2 >= 0 and not result["negara"]:
-            cand = cleaned[flight_idx - 2]
-            if re.match(r"^[A-Z][A-Z\s,\.()-]+$", cand) and not re.search(r"\d", cand):
-                result["negara"] = cand
-
-    # ---- Heuristik inline (satu baris flatten) jika masih kosong ----
-    if result["voyage_flight"] is None:
-        flat = " ".join(cleaned)
-        m = re.search(
-            r"\b([A-Z]{2,3})\s+([A-Z][A-Z\s,]+?)\s+([A-Z0-9\s\.\-&]+?)\s+([A-Z0-9]{1,4}\d{1,6}(?:-[A-Z0-9]+)?)\s+([A-Z][A-Z\s,]+)\b",
-            flat
-        )
-        if m:
+            else:
+                m = RE_SARANA_INLINE_SUBS.search(" ".join(cleaned))
+            if flight_idx is not None:
+                m = None
+                # nama: baris sebelum flight, asal bukan kode 2-3 huruf atau angka
+                if flight_idx - 1 >= 0:
+                    cand = cleaned[flight_idx - 1]
+                    if not RE_KODE_NEGARA.match(cand) and not RE_DIGIT.search(cand):
+                        result["nama"] = cand
+        if m is not None:
+            # Contoh inline: "US GERMANY FEDERAL EXPRESS CORPORATION FX5194 UNITED STATES"
             if result["kode_bendera"] is None:
                 result["kode_bendera"] = m.group(1).strip()
-            if result["negara"] is None:
-                result["negara"] = m.group(2).strip()
-            if result["nama"] is None:
-                result["nama"] = m.group(3).strip()
+            result["negara"] = m.group(2).strip()
+            result["nama"] = m.group(3).strip()
             result["voyage_flight"] = m.group(4).strip()
             result["bendera"] = m.group(5).strip()
 
-    # ---- Fallback: jika negara/nama masih kosong, isi konservatif dari urutan awal ----
+    # negara biasanya baris sebelum nama; ambil yang uppercase tanpa digit
+    if flight_idx is not None and flight_idx - 2 >= 0:
+        cand = cleaned[flight_idx - 2]
+        if RE_NEGARA.match(cand) and not RE_DIGIT.search(cand):
+            result["negara"] = cand
+
+    # negara/nama yang masih kosong: isi konservatif dari urutan awal,
+    # tanpa baris flight
     if result["negara"] is None or result["nama"] is None:
         work = cleaned[:]
-        if flight_idx is not None and 0 <= flight_idx < len(work):
-            # jika flight line terdeteksi, hapus untuk deduksi nama/negara
-            try:
-                work.pop(flight_idx)
-            except Exception:
-                pass
-        # negara kandidat pertama yang uppercase-only (tanpa digit)
+        if flight_idx is not None:
+            work.pop(flight_idx)
         if result["negara"] is None:
             for s in work:
-                if re.match(r"^[A-Z][A-Z\s,\.()-]+$", s) and not re.search(r"\d", s):
+                if RE_NEGARA.match(s) and not RE_DIGIT.search(s):
                     result["negara"] = s
                     break
-        # nama: baris uppercase yang bukan negara dan bukan kode 2-3 huruf
+        # nama: baris yang bukan negara dan bukan kode 2-3 huruf
         if result["nama"] is None:
             for s in work:
-                if not re.search(r"\d", s) and not re.match(r"^[A-Z]{2,3}$", s):
+                if not RE_DIGIT.search(s) and not RE_KODE_NEGARA.match(s):
                     if result["negara"] and s == result["negara"]:
                         continue
                     result["nama"] = s
@@ -333,6 +264,10 @@ def extract_sarana_pengangkutan_subs(all_text):
 
     return result
 
+# varian formulir yang tidak memakai pola voyage kapal (fallback di
+# extract_sarana_pengangkutan): PIB udara selalu bernomor flight
+SARANA_TANPA_FALLBACK = frozenset({"pib_bc20_udara"})
+
 def ambil_pelabuhan(match):
     if not match:
         return None
@@ -340,30 +275,236 @@ def ambil_pelabuhan(match):
     parts = teks.split()
     return parts[-1] if parts else ""
 
-def extract_pib(pdf_path):
-    all_text = ""
-    with pdfplumber.open(pdf_path) as pdf:
-        for page in pdf.pages:
-            text = page.extract_text()
-            if text:
-                all_text += "\n" + text
+def _teks_pib(pages):
+    return "".join("\n" + text for text in pages if text)
 
-    data_extracted = {}
+def _baca_sampai(source, backend, cukup, potong=None):
+    """
+    Ekstrak halaman satu per satu dan berhenti begitu cukup(pages) True,
+    jadi halaman sisanya tidak pernah diubah jadi teks.
+    """
+    pages = []
+    halaman = iter_halaman(source, backend, potong)
+    try:
+        for text in halaman:
+            pages.append(text)
+            if cukup(pages):
+                break
+    finally:
+        halaman.close()
+    return pages
+
+def _pib_lengkap(header_only=False):
+    """
+    Pemeriksa kelengkapan PIB untuk _baca_sampai: fungsi (pages, region) -> bool.
+    Tiap halaman baru dicari sekali bersama halaman sebelumnya saja (pola bisa
+    terpotong di batas halaman), bukan seluruh teks yang digabung ulang setiap
+    halaman, jadi waktunya linear terhadap jumlah halaman.
+    """
+    dibaca = 0
+    sebelumnya = ""
+    pendaftaran = False
+    total = None
+
+    def lengkap(pages, region=None):
+        nonlocal dibaca, sebelumnya, pendaftaran, total
+        # nomor pendaftaran dari template halaman pertama: header tidak perlu
+        # menunggu lembar lampiran
+        if header_only and region and "pendaftaran.nomor" in region and "pendaftaran.tanggal" in region:
+            return True
+        for text in pages[dibaca:]:
+            if not text:
+                continue
+            teks = _teks_pib((sebelumnya, text))
+            # Nomor pendaftaran biasanya baru muncul di lembar lampiran dokumen
+            # (halaman terakhir); fallback RE_PENDAFTARAN_ALT hanya dipakai kalau
+            # seluruh dokumen sudah dibaca.
+            pendaftaran = pendaftaran or bool(RE_PENDAFTARAN.search(teks))
+            if total is None:
+                m = RE_HALAMAN_PIB.search(teks)
+                total = int(m.group(1)) if m else None
+            sebelumnya = text
+        dibaca = len(pages)
+        if not pendaftaran:
+            return False
+        if header_only:
+            return True
+        # barang bisa berlanjut sampai halaman terakhir formulir
+        return total is not None and len(pages) >= total
+
+    return lengkap
+
+# Field PIB yang dilaporkan di "field_kosong" kalau tidak terisi, beserta
+# label tempat field itu dicari (untuk menentukan alasannya)
+FIELD_PIB = (
+    ("nomor_pengajuan", ("Nomor Pengajuan",)),
+    ("kantor_pabean", ("Kantor Pabean",)),
+    ("importir.identitas", ("2. Identitas",)),
+    ("importir.nama", ("3. Nama, Alamat",)),
+    ("importir.nib", ("5. NIB",)),
+    ("invoice_no", ("15. Invoice",)),
+    ("perkiraan_tiba", ("11. Perkiraan Tanggal Tiba",)),
+    ("pelabuhan.muat", ("12. Pelabuhan Muat",)),
+    ("pelabuhan.tujuan", ("14. Pelabuhan Tujuan",)),
+    ("sarana_pengangkutan.voyage_flight", ("10. Nama Sarana Pengangkutan",)),
+    ("pendaftaran", ("Nomor dan Tanggal Pendaftaran",)),
+    ("barang", ("Kode Brg", "Pos Tarif")),
+)
+
+# kode alasan di "field_kosong"
+ALASAN_LABEL_TIDAK_ADA = "label_tidak_ada"  # label field tidak ada di teks dokumen
+ALASAN_FORMAT_TIDAK_DIKENALI = "format_tidak_dikenali"  # label ada, isinya tidak cocok pola
+
+def _ambil_field(data, path):
+    for key in path.split("."):
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+    return data
+
+def _field_kosong(data, idx, header_only=False):
+    """
+    [{"field": ..., "alasan": ...}] untuk field FIELD_PIB yang tidak terisi.
+    """
+    kosong = []
+    for field, labels in FIELD_PIB:
+        if header_only and field == "barang":
+            continue
+        if _ambil_field(data, field) not in (None, "", [], {}):
+            continue
+        ada_label = any(idx.start(label) is not None for label in labels)
+        kosong.append({
+            "field": field,
+            "alasan": ALASAN_FORMAT_TIDAK_DIKENALI if ada_label else ALASAN_LABEL_TIDAK_ADA,
+        })
+    return kosong
+
+def pesan_hasil(pib_result):
+    """
+    Pesan respon: "sebagian" kalau ada field PIB yang tidak ketemu
+    (daftarnya ada di pib["field_kosong"]).
+    """
+    if pib_result and pib_result.get("field_kosong"):
+        return "Ekstraksi berhasil sebagian"
+    return "Ekstraksi berhasil"
+
+def _extract_pib(source, backend, header_only):
+    # region template (kalau formulirnya dikenal) diambil dari halaman yang sama
+    potong = Potongan("pib") if template_aktif() else None
+    region = {}
+    varian = []
+    lengkap = _pib_lengkap(header_only)
+
+    def cukup(pages):
+        if not varian:
+            # halaman pertama menentukan varian formulir
+            varian.append(varian_pib(pages[0], potong.template if potong else None))
+        if potong is not None and not region:
+            region.update(potong.nilai())
+        return lengkap(pages, region)
+
+    pages = _baca_sampai(source, backend, cukup, potong)
+    varian = varian[0] if varian else TIDAK_DIKENAL
+    tandai("varian", varian)
+    # "parse" = seluruh tahap regex, termasuk "sarana" dan "barang"
+    with stage("parse"):
+        return parse_pib(_teks_pib(pages), header_only=header_only, region=region, varian=varian)
+
+def extract_pib(source, backend=None, header_only=False):
+    """
+    header_only=True: hanya data umum PIB, tanpa barang.
+    Dokumen yang tidak lengkap tetap menghasilkan data; field yang tidak
+    ketemu dicantumkan di "field_kosong" beserta alasannya.
+    """
+    backend = backend or backend_aktif()
+    data = _extract_pib(source, backend, header_only)
+    if header_only or data["barang"] or backend == BACKEND_PDFPLUMBER:
+        return data
+
+    # barang tidak ketemu di teks backend cepat: ulangi dengan pdfplumber
+    logger.info("Fallback PIB ke pdfplumber (backend %s tanpa barang)", backend)
+    with stage("fallback"):
+        return _extract_pib(source, BACKEND_PDFPLUMBER, header_only)
+
+def _item_barang(match, all_text, berat_bersih):
+    """
+    Satu item barang dari match RE_BARANG_LAMA / RE_BARANG_BARU (grup sama).
+    """
+    hs_code = match.group(1).strip()
+    jumlah_satuan = match.group(2).strip().replace(",", "").replace(".", ",").replace("-", "")
+    nilai_pabean = match.group(3).replace(",", "").replace("-", "")
+    uraian = RE_SPASI.sub(" ", match.group(4).strip())
+    kondisi = match.group(5).strip()
+    negara = match.group(6).strip()
+
+    # Ambil qty (dari Berat Bersih jika ada)
+    if berat_bersih:
+        qty = berat_bersih.group(1).replace(",", "")
+    else:
+        qty = jumlah_satuan  # fallback
+
+    # Cari kode satuan
+    start, end = match.span()
+    context = all_text[end:end+200]
+
+    # 1️⃣ Prioritas: cek METRIC TON
+    if RE_METRIC_TON.search(uraian) or RE_METRIC_TON.search(context):
+        kode_satuan = "TNE"
+    else:
+        # 2️⃣ Kalau tidak ada, cek (XXX)
+        satuan_match = RE_KODE_SATUAN.search(uraian)
+        if not satuan_match:
+            satuan_match = RE_KODE_SATUAN.search(context)
+        kode_satuan = satuan_match.group(1).strip() if satuan_match else None
+
+    return {
+        "uraian": uraian,
+        "kondisi": kondisi,
+        "negara": negara,
+        "hs_code": hs_code,
+        "jumlah_satuan": jumlah_satuan,
+        "qty": qty,
+        "kode_satuan": kode_satuan,
+        "nilai_pabean": nilai_pabean
+    }
+
+def _sarana_region(region):
+    # sarana dari template dipakai kalau voyage/flight-nya terbaca
+    if "sarana_pengangkutan.voyage_flight" not in region:
+        return None
+    return {
+        key: region.get(f"sarana_pengangkutan.{key}")
+        for key in ("kode_bendera", "negara", "nama", "voyage_flight", "bendera")
+    }
+
+def parse_pib(all_text, header_only=False, region=None, varian=None):
+    """
+    Tahap regex PIB: ambil semua field dari teks dokumen yang sudah digabung.
+    region: {field: teks} dari template formulir (templates.py); field yang
+    ada di sana tidak dicari lagi dengan regex.
+    varian: hasil varian.varian_pib halaman pertama (None = klasifikasi dari all_text).
+    """
+    region = region or {}
+    if varian is None:
+        varian = varian_pib(all_text)
+    # index label dibangun sekali; tiap field mulai mencari dari label-nya
+    idx = DocumentIndex(all_text, ANCHORS_PIB)
+    data_extracted = {"varian": varian}
 
     # === Data Umum ===
-    m = re.search(r"Nomor Pengajuan\s*:([0-9]+)\s*Tanggal Pengajuan\s*:([0-9-]+)", all_text)
+    m = idx.search(RE_NOMOR_PENGAJUAN, "Nomor Pengajuan")
     if m:
         data_extracted["nomor_pengajuan"] = m.group(1).strip()
         data_extracted["tanggal_pengajuan"] = m.group(2).strip()
 
-    m = re.search(r"Kantor Pabean\s*:([A-Z0-9\s\-\.\(\)]+)", all_text)
+    m = idx.search(RE_KANTOR_PABEAN, "Kantor Pabean")
     if m:
         data_extracted["kantor_pabean"] = m.group(1).strip()
 
     # Importir
-    identitas = re.search(r"2\. Identitas\s*:\s*([0-9 /]+)", all_text)
-    nama_alamat = re.search(r"3\. Nama, Alamat\s*:(.*?)\n", all_text, re.S)
-    nib = re.search(r"5\. NIB\s*:\s*([0-9]+)", all_text)
+    identitas = idx.search(RE_IDENTITAS, "2. Identitas")
+    nama_alamat = idx.search(RE_NAMA_ALAMAT, "3. Nama, Alamat")
+    nib = idx.search(RE_NIB, "5. NIB")
 
     data_extracted["importir"] = {
         "identitas": identitas.group(1).strip() if identitas else None,
@@ -380,20 +521,20 @@ def extract_pib(pdf_path):
             data_extracted["importir"]["nama"] = parts[0].strip()
 
     # Invoice
-    m = re.search(r"15\. Invoice\s*: No\. ([0-9]+)\s*Tgl\.([0-9-]+)", all_text)
+    m = idx.search(RE_INVOICE, "15. Invoice")
     if m:
         data_extracted["invoice_no"] = m.group(1).strip()
         data_extracted["invoice_date"] = m.group(2).strip()
 
     # Perkiraan Tanggal Tiba
-    m = re.search(r"11\. Perkiraan Tanggal Tiba\s*:([0-9-]+)", all_text)
+    m = idx.search(RE_PERKIRAAN_TIBA, "11. Perkiraan Tanggal Tiba")
     if m:
         data_extracted["perkiraan_tiba"] = m.group(1).strip()
 
     # Pelabuhan muat / transit / tujuan
-    muat = re.search(r"12\. Pelabuhan Muat\s*:(.*?)\n", all_text)
-    transit = re.search(r"13\. Pelabuhan Transit\s*:(.*?)\n", all_text)
-    tujuan = re.search(r"14\. Pelabuhan Tujuan\s*:(.*?)\n", all_text)
+    muat = idx.search(RE_PELABUHAN_MUAT, "12. Pelabuhan Muat")
+    transit = idx.search(RE_PELABUHAN_TRANSIT, "13. Pelabuhan Transit")
+    tujuan = idx.search(RE_PELABUHAN_TUJUAN, "14. Pelabuhan Tujuan")
 
     data_extracted["pelabuhan"] = {
         "muat": ambil_pelabuhan(muat),
@@ -401,127 +542,70 @@ def extract_pib(pdf_path):
         "tujuan": ambil_pelabuhan(tujuan),
     }
 
-    sarana_main = extract_sarana_pengangkutan_main(all_text)
-
-    if sarana_main.get("voyage_flight") is None:
-        sarana_main = extract_sarana_pengangkutan_subs(all_text)
+    sarana_main = _sarana_region(region)
+    if sarana_main is None:
+        with stage("sarana"):
+            sarana_main = extract_sarana_pengangkutan(
+                all_text, idx, fallback=varian not in SARANA_TANPA_FALLBACK
+            )
 
     data_extracted["sarana_pengangkutan"] = sarana_main
 
-    m = re.search(r"Nomor\s*:\s*([0-9]+)\s*Tanggal\s*:\s*([0-9-]+)", all_text)
-    if m:
+    m = RE_PENDAFTARAN.search(all_text)
+    if "pendaftaran.nomor" in region and "pendaftaran.tanggal" in region:
+        # kotak G halaman pertama, isinya sama dengan lembar lampiran
+        data_extracted["pendaftaran"] = {
+            "nomor": region["pendaftaran.nomor"],
+            "tanggal": region["pendaftaran.tanggal"]
+        }
+    elif m:
         data_extracted["pendaftaran"] = {
             "nomor": m.group(1).strip(),
             "tanggal": m.group(2).strip()
         }
     else:
         # fallback kalau format tanpa "Nomor :" 
-        m = re.search(r"Nomor dan Tanggal Pendaftaran\s*([0-9]+)\s*([0-9-]+)", all_text)
+        m = idx.search(RE_PENDAFTARAN_ALT, "Nomor dan Tanggal Pendaftaran")
         if m:
             data_extracted["pendaftaran"] = {
                 "nomor": m.group(1).strip(),
                 "tanggal": m.group(2).strip()
             }
 
-    data_extracted["bl_awb"] = extract_bl_awb(all_text)
+    data_extracted["bl_awb"] = extract_bl_awb(all_text, idx)
     
-    # === Data Barang ===
-    barang_list = []
-
-    # --- Format Lama ---
-    pattern_lama = r"(\d{4,8})\s+Kode Brg.*?BYR\s+([\d\.,-]+)\s*-\s*([\d\.,-]+).*?Uraian\s*:(.*?)Kondisi Brg\s*:\s*([A-Z]+).*?Negara\s*:\s*([A-Z\s\(\)]+)"
-    matches = re.finditer(pattern_lama, all_text, re.S)
-
-    for match in matches:
-        hs_code = match.group(1).strip()
-        jumlah_satuan = match.group(2).strip().replace(",", "").replace(".", ",").replace("-", "")
-        nilai_pabean = match.group(3).replace(",", "").replace("-", "")
-        uraian = re.sub(r"\s+", " ", match.group(4).strip())
-        kondisi = match.group(5).strip()
-        negara = match.group(6).strip()
-
-        # Ambil qty (dari Berat Bersih jika ada)
-        qty_match = re.search(r"Berat Bersih\s*\(Kg\)\s*([\d\.,]+)", all_text)
-        if qty_match:
-            qty = qty_match.group(1).replace(",", "")
-        else:
-            qty = jumlah_satuan  # fallback
-
-        # Cari kode satuan
-        start, end = match.span()
-        context = all_text[end:end+200]
-
-        if re.search(r"\bMETRIC\s+TON\b", uraian, re.I) or re.search(r"\bMETRIC\s+TON\b", context, re.I):
-            kode_satuan = "TNE"
-        else:
-            satuan_match = re.search(r"\(([A-Z0-9\-]+)\)", uraian)
-            if not satuan_match:
-                satuan_match = re.search(r"\(([A-Z0-9\-]+)\)", context)
-            kode_satuan = satuan_match.group(1).strip() if satuan_match else None
-
-        barang_list.append({
-            "uraian": uraian,
-            "kondisi": kondisi,
-            "negara": negara,
-            "hs_code": hs_code,
-            "jumlah_satuan": jumlah_satuan, 
-            "qty": qty,                     
-            "kode_satuan": kode_satuan,
-            "nilai_pabean": nilai_pabean
-        })
-
-    # --- Fallback Format Baru ---
-    if not barang_list:
-        pattern_baru = r"Pos Tarif\s*:\s*(\d{4,8}).*?BYR\s+([\d\.,-]+)\s*-\s*([\d\.,-]+)(.*?)Kondisi Brg\s*:\s*([A-Z]+).*?Negara\s*:\s*([A-Z\s\(\)]+)"
-        matches = re.finditer(pattern_baru, all_text, re.S)
-        for match in matches:
-            hs_code = match.group(1).strip()
-            jumlah_satuan = match.group(2).strip().replace(",", "").replace(".", ",").replace("-", "")
-            nilai_pabean = match.group(3).replace(",", "").replace("-", "")
-            uraian = re.sub(r"\s+", " ", match.group(4).strip())
-            kondisi = match.group(5).strip()
-            negara = match.group(6).strip()
-
-            # Ambil qty (dari Berat Bersih jika ada)
-            qty_match = re.search(r"Berat Bersih\s*\(Kg\)\s*([\d\.,]+)", all_text)
-            if qty_match:
-                qty = qty_match.group(1).replace(",", "")
-            else:
-                qty = jumlah_satuan  # fallback
-
-            # Cari kode satuan
-            start, end = match.span()
-            context = all_text[end:end+200]
+    if header_only:
+        data_extracted["field_kosong"] = _field_kosong(data_extracted, idx, header_only=True)
+        return data_extracted
 
-            # 1️⃣ Prioritas: cek METRIC TON
-            if re.search(r"\bMETRIC\s+TON\b", uraian, re.I) or re.search(r"\bMETRIC\s+TON\b", context, re.I):
-                kode_satuan = "TNE"
-            else:
-                # 2️⃣ Kalau tidak ada, cek (XXX)
-                satuan_match = re.search(r"\(([A-Z0-9\-]+)\)", uraian)
-                if not satuan_match:
-                    satuan_match = re.search(r"\(([A-Z0-9\-]+)\)", context)
-                kode_satuan = satuan_match.group(1).strip() if satuan_match else None
-
-
-            barang_list.append({
-                "uraian": uraian,
-                "kondisi": kondisi,
-                "negara": negara,
-                "hs_code": hs_code,
-                "jumlah_satuan": jumlah_satuan, 
-                "qty": qty,
-                "kode_satuan": kode_satuan,
-                "nilai_pabean": nilai_pabean
-            })
+    # === Data Barang ===
+    with stage("barang"):
+        # Berat Bersih sama untuk semua item, cukup dicari sekali
+        berat_bersih = idx.search(RE_BERAT_BERSIH, "Berat Bersih")
+
+        # Teks dipecah jadi blok per item (label "Kode Brg" / "Pos Tarif") dalam
+        # satu lintasan, lalu tiap item di-parse di bloknya sendiri.
+        # --- Format Lama ---
+        barang_list = [
+            _item_barang(match, all_text, berat_bersih)
+            for match in idx.finditer_blok(RE_BARANG_LAMA, "Kode Brg", WAJIB_BARANG_LAMA)
+        ]
+
+        # --- Fallback Format Baru ---
+        if not barang_list:
+            barang_list = [
+                _item_barang(match, all_text, berat_bersih)
+                for match in idx.finditer_blok(RE_BARANG_BARU, "Pos Tarif", WAJIB_BARANG_BARU)
+            ]
 
     data_extracted["barang"] = barang_list
     
-    # Kalau barang tetap kosong → stop program
+    # Barang kosong tidak lagi menghentikan proses: data lain tetap
+    # dikembalikan dan "barang" masuk field_kosong
     if not barang_list:
-        print("Ada kesalahan, Cek kembali isi dokumen.")
-        sys.exit(1)
+        logger.warning("Barang tidak ditemukan di dokumen PIB")
 
+    data_extracted["field_kosong"] = _field_kosong(data_extracted, idx)
     return data_extracted
 
 def _clean(val):
@@ -532,53 +616,116 @@ def _clean(val):
         return None
     return v
 
-def extract_sppb(pdf_path):
+def _teks_sppb(pages):
     # Gabungkan teks semua halaman
-    all_text = ""
-    lines = []
-    with pdfplumber.open(pdf_path) as pdf:
-        for p in pdf.pages:
-            t = p.extract_text() or ""
-            all_text += "\n" + t
-            lines += [ln.rstrip() for ln in t.splitlines()]
-
-    data = {}
+    all_text = "".join("\n" + t for t in pages)
+    lines = [ln.rstrip() for t in pages for ln in t.splitlines()]
+    return all_text, lines
+
+# Field SPPB yang selalu ada di halaman 1 (nomor aju ada di bagian bawahnya),
+# beserta pola yang mengisinya di parse_sppb. Halaman berikutnya (lampiran
+# peti kemas) hanya dibaca kalau ada yang belum ketemu.
+SPPB_WAJIB = {
+    "sppb": RE_SPPB_NOMOR,
+    "pendaftaran_pib": RE_PENDAFTARAN_PIB,
+    "lokasi_barang": RE_LOKASI_BARANG,
+    "awb": RE_AWB,
+    "bc11": RE_BC11,
+    "nomor_aju": RE_NOMOR_AJU,
+}
+
+def _sppb_lengkap():
+    """
+    Pemeriksa kelengkapan SPPB untuk _baca_sampai, seperti _pib_lengkap:
+    tiap halaman baru dicari sekali (bersama halaman sebelumnya) hanya untuk
+    field SPPB_WAJIB yang belum ketemu, jadi parse_sppb cukup sekali di akhir.
+    """
+    belum = dict(SPPB_WAJIB)
+    dibaca = 0
+    sebelumnya = ""
+
+    def lengkap(pages):
+        nonlocal dibaca, sebelumnya
+        for text in pages[dibaca:]:
+            teks = f"\n{sebelumnya}\n{text}"
+            for key, pola in list(belum.items()):
+                if pola.search(teks):
+                    del belum[key]
+            sebelumnya = text
+        dibaca = len(pages)
+        return not belum
+
+    return lengkap
+
+def _extract_sppb(source, backend):
+    lengkap = _sppb_lengkap()
+
+    def cukup(pages):
+        with stage("parse"):
+            return lengkap(pages)
+
+    pages = _baca_sampai(source, backend, cukup)
+    varian = TIDAK_DIKENAL
+    if pages:
+        varian = varian_sppb(pages[0])
+        tandai("varian", varian)
+    with stage("parse"):
+        return parse_sppb(*_teks_sppb(pages), varian=varian)
+
+def extract_sppb(source, backend=None):
+    backend = backend or backend_aktif()
+    data = _extract_sppb(source, backend)
+    if "sppb" in data or backend == BACKEND_PDFPLUMBER:
+        return data
+
+    # Nomor SPPB tidak ketemu di teks backend cepat: ulangi dengan pdfplumber
+    logger.info("Fallback SPPB ke pdfplumber (backend %s tanpa nomor SPPB)", backend)
+    with stage("fallback"):
+        return _extract_sppb(source, BACKEND_PDFPLUMBER)
+
+def parse_sppb(all_text, lines, varian=None):
+    """
+    Tahap regex SPPB: all_text = teks semua halaman, lines = baris per halaman.
+    varian: hasil varian.varian_sppb halaman pertama (None = dari all_text).
+    """
+    idx = DocumentIndex(all_text, ANCHORS_SPPB)
+    data = {"varian": varian if varian is not None else varian_sppb(all_text)}
 
     # --- SPPB header: Nomor & Tanggal ---
-    m = re.search(r"SURAT PERSETUJUAN PENGELUARAN BARANG.*?\n\s*Nomor\s*:\s*([^\n]+?)\s*Tanggal\s*:\s*([0-9\-]+)", all_text, re.S)
+    m = idx.search(RE_SPPB_NOMOR, "SURAT PERSETUJUAN PENGELUARAN BARANG")
     if m:
         data["sppb"] = {"nomor": _clean(m.group(1)), "tanggal": _clean(m.group(2))}
 
     # --- Pendaftaran PIB: Nomor & Tanggal ---
-    m = re.search(r"Nomor Pendaftaran PIB\s*:\s*([0-9]+)\s*Tanggal\s*:\s*([0-9\-]+)", all_text)
+    m = idx.search(RE_PENDAFTARAN_PIB, "Nomor Pendaftaran PIB")
     if m:
         data["pendaftaran_pib"] = {"nomor": _clean(m.group(1)), "tanggal": _clean(m.group(2))}
 
     # --- Nomor Aju ---
-    m = re.search(r"Nomor aju\s*:\s*([0-9]+)", all_text, re.I)
+    m = idx.search(RE_NOMOR_AJU, "Nomor aju")
     if m:
         data["nomor_aju"] = _clean(m.group(1))
 
     # ========= Importir block =========
     # Ambil blok dari kata 'Importir' sampai sebelum 'Lokasi Barang' (atau habis dokumen)
     imp_block = None
-    bm = re.search(r"Kepada\s*:\s*.*?Importir(.*?)(?=\n\s*Lokasi Barang\s*:|\Z)", all_text, re.S | re.I)
+    bm = idx.search(RE_BLOK_IMPORTIR, "Kepada")
     if bm:
         imp_block = bm.group(1)
 
     imp_npwp = imp_nitku = imp_nama = imp_alamat = None
     if imp_block:
         # Ambil NPWP pertama di blok ini = NPWP importir
-        m = re.search(r"\bNPWP\s*:\s*([0-9\-]+)", imp_block)
+        m = RE_NPWP_ANGKA.search(imp_block)
         if m: imp_npwp = _clean(m.group(1))
 
-        m = re.search(r"\bNITKU\s*:\s*([0-9]+)", imp_block)
+        m = RE_NITKU.search(imp_block)
         if m: imp_nitku = _clean(m.group(1))
 
-        m = re.search(r"\bNama\s*:\s*(.*)", imp_block)
+        m = RE_NAMA.search(imp_block)
         if m: imp_nama = _clean(m.group(1))
 
-        m = re.search(r"\bAlamat\s*:\s*(.*)", imp_block)
+        m = RE_ALAMAT.search(imp_block)
         if m: imp_alamat = _clean(m.group(1))
 
     data["importir"] = {
@@ -591,19 +738,18 @@ def extract_sppb(pdf_path):
     # ========= PPJK block =========
     # Strategi: cari kemunculan kedua "NPWP :" setelah blok Importir.
     ppjk_npwp = ppjk_nama = ppjk_alamat = ppjk_np_ppjk = None
-    npwp_iter = list(re.finditer(r"\bNPWP\s*:\s*(.*)", all_text))
+    npwp_iter = list(idx.finditer(RE_NPWP, "NPWP"))
     if len(npwp_iter) >= 2:
         start = npwp_iter[1].end()
-        tail = all_text[start:]
         ppjk_npwp = _clean(npwp_iter[1].group(1))
 
-        m = re.search(r"\bNama\s*:\s*(.*)", tail)
+        m = RE_NAMA.search(all_text, start)
         if m: ppjk_nama = _clean(m.group(1))
 
-        m = re.search(r"\bAlamat\s*:\s*(.*)", tail)
+        m = RE_ALAMAT.search(all_text, start)
         if m: ppjk_alamat = _clean(m.group(1))
 
-        m = re.search(r"\bNP\s*PPJK\s*:\s*(.*)", tail)
+        m = RE_NP_PPJK.search(all_text, start)
         if m: ppjk_np_ppjk = _clean(m.group(1))
 
     data["ppjk"] = {
@@ -614,33 +760,33 @@ def extract_sppb(pdf_path):
     }
 
     # --- Lokasi Barang ---
-    m = re.search(r"Lokasi Barang\s*:\s*(.*)", all_text)
+    m = idx.search(RE_LOKASI_BARANG, "Lokasi Barang")
     if m:
         data["lokasi_barang"] = _clean(m.group(1))
 
     # --- AWB / BL + tanggal ---
-    m = re.search(r"No\.?\s*B/?L atau AWB\s*\(Host\)\s*:\s*([^\s]+)\s*Tanggal\s*:\s*([0-9\-]+)", all_text, re.I)
+    m = RE_AWB.search(all_text)
     if m:
         data["awb"] = {"nomor": _clean(m.group(1)), "tanggal": _clean(m.group(2))}
 
     # --- Sarana Pengangkut + Flight ---
-    m = re.search(r"Nama Sarana Pengangkut\s*:\s*(.*)", all_text)
+    m = idx.search(RE_SARANA_PENGANGKUT, "Nama Sarana Pengangkut")
     sarana = _clean(m.group(1)) if m else None
 
-    m = re.search(r"No\.?\s*Voy\.?/Flight\s*:\s*([A-Z0-9]+)", all_text, re.I)
+    m = RE_VOY_FLIGHT.search(all_text)
     flight = _clean(m.group(1)) if m else None
 
     data["sarana_pengangkut"] = {"nama": sarana, "voy_flight": flight}
 
     # --- BC 1.1 + Tgl + Pos ---
-    m = re.search(r"No\.?\s*BC\s*1\.1\s*:\s*([0-9]+)\s*Tanggal\s*:\s*([0-9\-]+)", all_text, re.I)
+    m = RE_BC11.search(all_text)
     if m:
         nomor_bc11 = m.group(1).strip()
         tanggal_bc11 = m.group(2).strip()
         # cari nomor pos (12 digit) di sekitar baris ini
         before = all_text[max(0, m.start()-100):m.start()]
         after = all_text[m.end():m.end()+100]
-        pos_match = re.search(r"\b\d{10,15}\b", before + "\n" + after)
+        pos_match = RE_NOMOR_POS.search(before + "\n" + after)
         pos_val = pos_match.group(0) if pos_match else None
 
         data["bc11"] = {
@@ -651,41 +797,41 @@ def extract_sppb(pdf_path):
 
     # --- Kemasan, Berat, Peti Kemas ---
     # Jumlah/Jenis Kemasan bisa berada di satu baris yang sama dengan label "Berat :"
-    m = re.search(r"Jumlah/jenis kemasan\s*:\s*([^\n]+)", all_text, re.I)
+    m = idx.search(RE_JUMLAH_KEMASAN, "Jumlah/jenis kemasan")
     jumlah_jenis_kemasan = None
     if m:
         raw = m.group(1)
         # potong jika ada "Berat :" di ujung baris
-        raw = re.split(r"\s+Berat\s*:\s*", raw)[0]
+        raw = RE_POTONG_BERAT.split(raw)[0]
         jumlah_jenis_kemasan = _clean(raw)
 
-    m = re.search(r"Merk kemasan\s*:\s*(.*)", all_text, re.I)
+    m = idx.search(RE_MERK_KEMASAN, "Merk kemasan")
     merk_kemasan = _clean(m.group(1)) if m else None
 
-    m = re.search(r"Jumlah peti kemas\s*:\s*([0-9]+)", all_text, re.I)
+    m = idx.search(RE_JUMLAH_PETI_KEMAS, "Jumlah peti kemas")
     jumlah_pk = _clean(m.group(1)) if m else None
 
-    m = re.search(r"Nomor Peti Kemas/Ukuran\s*:\s*(.*)", all_text, re.I)
+    m = idx.search(RE_NOMOR_PETI_KEMAS, "Nomor Peti Kemas/Ukuran")
     nomor_pk = _clean(m.group(1)) if m else None
 
     # Berat: jika "Berat :" tidak diikuti angka, cari angka 4 desimal di sekitar baris kemasan
     berat = None
-    m = re.search(r"\bBerat\s*:\s*([0-9][0-9\.,]*)", all_text, re.I)
+    m = idx.search(RE_BERAT, "Berat")
     if m:
         berat = _clean(m.group(1))
     else:
         # cari index baris 'Jumlah/jenis kemasan'
-        idx = None
+        baris_kemasan = None
         for i, ln in enumerate(lines):
-            if re.search(r"Jumlah/jenis kemasan", ln, re.I):
-                idx = i
+            if RE_LABEL_KEMASAN.search(ln):
+                baris_kemasan = i
                 break
         # cari angka d.dddd di 2 baris sebelum hingga 3 baris sesudah
-        if idx is not None:
-            rng_lo = max(0, idx - 2)
-            rng_hi = min(len(lines), idx + 4)
+        if baris_kemasan is not None:
+            rng_lo = max(0, baris_kemasan - 2)
+            rng_hi = min(len(lines), baris_kemasan + 4)
             for j in range(rng_lo, rng_hi):
-                mm = re.search(r"\b\d+\.\d{4}\b", lines[j])
+                mm = RE_BERAT_DESIMAL.search(lines[j])
                 if mm:
                     berat = mm.group(0)
                     break
@@ -1,10 +1,62 @@
+import io
 import pdfplumber
-import re
-import sys
-
-def extract_pib(pdf_path):
+from .patterns import (
+    RE_ALAMAT,
+    RE_AWB,
+    RE_BARANG_BARU,
+    RE_BARANG_LAMA,
+    RE_BC11_POS,
+    RE_BERAT,
+    RE_BERAT_DESIMAL,
+    RE_BLOK_IMPORTIR,
+    RE_IDENTITAS,
+    RE_INVOICE,
+    RE_JUMLAH_KEMASAN,
+    RE_JUMLAH_PETI_KEMAS,
+    RE_KANTOR_PABEAN,
+    RE_LABEL_KEMASAN,
+    RE_LOKASI_BARANG,
+    RE_MERK_KEMASAN,
+    RE_NAMA,
+    RE_NAMA_ALAMAT,
+    RE_NAMA_KODE_SATUAN,
+    RE_NIB,
+    RE_NITKU,
+    RE_NOMOR_AJU,
+    RE_NOMOR_PENGAJUAN,
+    RE_NOMOR_PETI_KEMAS,
+    RE_NPWP,
+    RE_NPWP_ANGKA,
+    RE_NP_PPJK,
+    RE_PELABUHAN_MUAT,
+    RE_PELABUHAN_TRANSIT,
+    RE_PELABUHAN_TUJUAN,
+    RE_PENDAFTARAN_PIB,
+    RE_PERKIRAAN_TIBA,
+    RE_POTONG_BERAT,
+    RE_SARANA_PENGANGKUT,
+    RE_SPASI,
+    RE_SPPB_NOMOR,
+    RE_VOY_FLIGHT,
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+def _buka_pdf(source):
+    """
+    Buka PDF dari path, bytes/bytearray/memoryview, atau file-like object
+    (mis. file upload Django) tanpa harus menulis ke disk dulu.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return pdfplumber.open(io.BytesIO(source))
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return pdfplumber.open(source)
+
+def extract_pib(source):
     all_text = ""
-    with pdfplumber.open(pdf_path) as pdf:
+    with _buka_pdf(source) as pdf:
         for page in pdf.pages:
             text = page.extract_text()
             if text:
@@ -13,19 +65,19 @@ def extract_pib(pdf_path):
     data_extracted = {}
 
     # === Data Umum ===
-    m = re.search(r"Nomor Pengajuan\s*:([0-9]+)\s*Tanggal Pengajuan\s*:([0-9-]+)", all_text)
+    m = RE_NOMOR_PENGAJUAN.search(all_text)
     if m:
         data_extracted["nomor_pengajuan"] = m.group(1).strip()
         data_extracted["tanggal_pengajuan"] = m.group(2).strip()
 
-    m = re.search(r"Kantor Pabean\s*:([A-Z0-9\s\-\.\(\)]+)", all_text)
+    m = RE_KANTOR_PABEAN.search(all_text)
     if m:
         data_extracted["kantor_pabean"] = m.group(1).strip()
 
     # Importir
-    identitas = re.search(r"2\. Identitas\s*:\s*([0-9 /]+)", all_text)
-    nama_alamat = re.search(r"3\. Nama, Alamat\s*:(.*?)\n", all_text, re.S)
-    nib = re.search(r"5\. NIB\s*:\s*([0-9]+)", all_text)
+    identitas = RE_IDENTITAS.search(all_text)
+    nama_alamat = RE_NAMA_ALAMAT.search(all_text)
+    nib = RE_NIB.search(all_text)
 
     data_extracted["importir"] = {
         "identitas": identitas.group(1).strip() if identitas else None,
@@ -42,20 +94,20 @@ def extract_pib(pdf_path):
             data_extracted["importir"]["nama"] = parts[0].strip()
 
     # Invoice
-    m = re.search(r"15\. Invoice\s*: No\. ([0-9]+)\s*Tgl\.([0-9-]+)", all_text)
+    m = RE_INVOICE.search(all_text)
     if m:
         data_extracted["invoice_no"] = m.group(1).strip()
         data_extracted["invoice_date"] = m.group(2).strip()
 
     # Perkiraan Tanggal Tiba
-    m = re.search(r"11\. Perkiraan Tanggal Tiba\s*:([0-9-]+)", all_text)
+    m = RE_PERKIRAAN_TIBA.search(all_text)
     if m:
         data_extracted["perkiraan_tiba"] = m.group(1).strip()
 
     # Pelabuhan muat / transit / tujuan
-    muat = re.search(r"12\. Pelabuhan Muat\s*:(.*?)\n", all_text)
-    transit = re.search(r"13\. Pelabuhan Transit\s*:(.*?)\n", all_text)
-    tujuan = re.search(r"14\. Pelabuhan Tujuan\s*:(.*?)\n", all_text)
+    muat = RE_PELABUHAN_MUAT.search(all_text)
+    transit = RE_PELABUHAN_TRANSIT.search(all_text)
+    tujuan = RE_PELABUHAN_TUJUAN.search(all_text)
 
     data_extracted["pelabuhan"] = {
         "muat": muat.group(1).strip() if muat else None,
@@ -73,7 +125,7 @@ def extract_pib(pdf_path):
     #     hs_code = match.group(1).strip()
     #     qty = match.group(2).replace(",", "").strip()
     #     nilai_pabean = match.group(3).replace(",", "").strip()
-    #     uraian = re.sub(r"\s+", " ", match.group(4).strip())
+    #     uraian = RE_SPASI.sub(" ", match.group(4).strip())
     #     kondisi = match.group(5).strip()
     #     negara = match.group(6).strip()
     #     barang_list.append({
@@ -94,7 +146,7 @@ def extract_pib(pdf_path):
     #         hs_code = match.group(1).strip()
     #         qty = match.group(2).replace(",", "").strip()
     #         nilai_pabean = match.group(3).replace(",", "").strip()
-    #         uraian = re.sub(r"\s+", " ", match.group(4).strip())
+    #         uraian = RE_SPASI.sub(" ", match.group(4).strip())
     #         kondisi = match.group(5).strip()
     #         negara = match.group(6).strip()
     #         barang_list.append({
@@ -112,21 +164,20 @@ def extract_pib(pdf_path):
     barang_list = []
 
     # --- Format Lama ---
-    pattern_lama = r"(\d{4,8})\s+Kode Brg.*?BYR\s+([\d\.,-]+)\s*-\s*([\d\.,-]+).*?Uraian\s*:(.*?)Kondisi Brg\s*:\s*([A-Z]+).*?Negara\s*:\s*([A-Z\s\(\)]+)"
-    matches = re.finditer(pattern_lama, all_text, re.S)
+    matches = RE_BARANG_LAMA.finditer(all_text)
 
     for match in matches:
         hs_code = match.group(1).strip()
         qty = float(match.group(2).replace(",", "").replace("-", ""))
         nilai_pabean = float(match.group(3).replace(",", "").replace("-", ""))
-        uraian = re.sub(r"\s+", " ", match.group(4).strip())
+        uraian = RE_SPASI.sub(" ", match.group(4).strip())
         kondisi = match.group(5).strip()
         negara = match.group(6).strip()
 
         # Cari kode satuan
         start, end = match.span()
         context = all_text[end:end+200]
-        satuan_match = re.search(r"([A-Z ]+)\s*\(([A-Z0-9\- ]+)\)", uraian + " " + context)
+        satuan_match = RE_NAMA_KODE_SATUAN.search(uraian + " " + context)
         kode_satuan = satuan_match.group(1).strip() if satuan_match else None
 
         barang_list.append({
@@ -141,20 +192,19 @@ def extract_pib(pdf_path):
 
     # --- Fallback Format Baru ---
     if not barang_list:
-        pattern_baru = r"Pos Tarif\s*:\s*(\d{4,8}).*?BYR\s+([\d\.,-]+)\s*-\s*([\d\.,-]+)(.*?)Kondisi Brg\s*:\s*([A-Z]+).*?Negara\s*:\s*([A-Z\s\(\)]+)"
-        matches = re.finditer(pattern_baru, all_text, re.S)
+        matches = RE_BARANG_BARU.finditer(all_text)
         for match in matches:
             hs_code = match.group(1).strip()
             qty = float(match.group(2).replace(",", "").replace("-", ""))
             nilai_pabean = float(match.group(3).replace(",", "").replace("-", ""))
-            uraian = re.sub(r"\s+", " ", match.group(4).strip())
+            uraian = RE_SPASI.sub(" ", match.group(4).strip())
             kondisi = match.group(5).strip()
             negara = match.group(6).strip()
 
             # Cari kode satuan
             start, end = match.span()
             context = all_text[end:end+200]
-            satuan_match = re.search(r"([A-Z ]+)\s*\(([A-Z0-9\- ]+)\)", uraian + " " + context)
+            satuan_match = RE_NAMA_KODE_SATUAN.search(uraian + " " + context)
             kode_satuan = satuan_match.group(1).strip() if satuan_match else None
 
             barang_list.append({
@@ -169,10 +219,9 @@ def extract_pib(pdf_path):
 
     data_extracted["barang"] = barang_list
     
-    # Kalau barang tetap kosong → stop program
+    # Barang kosong: data umum tetap dikembalikan (sama dengan utils.parse_pib)
     if not barang_list:
-        print("Ada kesalahan, Cek kembali isi dokumen.")
-        sys.exit(1)
+        logger.warning("Barang PIB tidak ditemukan, cek kembali isi dokumen")
 
     return data_extracted
 
@@ -184,11 +233,11 @@ def _clean(val):
         return None
     return v
 
-def extract_sppb(pdf_path):
+def extract_sppb(source):
     # Gabungkan teks semua halaman
     all_text = ""
     lines = []
-    with pdfplumber.open(pdf_path) as pdf:
+    with _buka_pdf(source) as pdf:
         for p in pdf.pages:
             t = p.extract_text() or ""
             all_text += "\n" + t
@@ -197,40 +246,40 @@ def extract_sppb(pdf_path):
     data = {}
 
     # --- SPPB header: Nomor & Tanggal ---
-    m = re.search(r"SURAT PERSETUJUAN PENGELUARAN BARANG.*?\n\s*Nomor\s*:\s*([^\n]+?)\s*Tanggal\s*:\s*([0-9\-]+)", all_text, re.S)
+    m = RE_SPPB_NOMOR.search(all_text)
     if m:
         data["sppb"] = {"nomor": _clean(m.group(1)), "tanggal": _clean(m.group(2))}
 
     # --- Pendaftaran PIB: Nomor & Tanggal ---
-    m = re.search(r"Nomor Pendaftaran PIB\s*:\s*([0-9]+)\s*Tanggal\s*:\s*([0-9\-]+)", all_text)
+    m = RE_PENDAFTARAN_PIB.search(all_text)
     if m:
         data["pendaftaran_pib"] = {"nomor": _clean(m.group(1)), "tanggal": _clean(m.group(2))}
 
     # --- Nomor Aju ---
-    m = re.search(r"Nomor aju\s*:\s*([0-9]+)", all_text, re.I)
+    m = RE_NOMOR_AJU.search(all_text)
     if m:
         data["nomor_aju"] = _clean(m.group(1))
 
     # ========= Importir block =========
     # Ambil blok dari kata 'Importir' sampai sebelum 'Lokasi Barang' (atau habis dokumen)
     imp_block = None
-    bm = re.search(r"Kepada\s*:\s*.*?Importir(.*?)(?=\n\s*Lokasi Barang\s*:|\Z)", all_text, re.S | re.I)
+    bm = RE_BLOK_IMPORTIR.search(all_text)
     if bm:
         imp_block = bm.group(1)
 
     imp_npwp = imp_nitku = imp_nama = imp_alamat = None
     if imp_block:
         # Ambil NPWP pertama di blok ini = NPWP importir
-        m = re.search(r"\bNPWP\s*:\s*([0-9\-]+)", imp_block)
+        m = RE_NPWP_ANGKA.search(imp_block)
         if m: imp_npwp = _clean(m.group(1))
 
-        m = re.search(r"\bNITKU\s*:\s*([0-9]+)", imp_block)
+        m = RE_NITKU.search(imp_block)
         if m: imp_nitku = _clean(m.group(1))
 
-        m = re.search(r"\bNama\s*:\s*(.*)", imp_block)
+        m = RE_NAMA.search(imp_block)
         if m: imp_nama = _clean(m.group(1))
 
-        m = re.search(r"\bAlamat\s*:\s*(.*)", imp_block)
+        m = RE_ALAMAT.search(imp_block)
         if m: imp_alamat = _clean(m.group(1))
 
     data["importir"] = {
@@ -243,19 +292,19 @@ def extract_sppb(pdf_path):
     # ========= PPJK block =========
     # Strategi: cari kemunculan kedua "NPWP :" setelah blok Importir.
     ppjk_npwp = ppjk_nama = ppjk_alamat = ppjk_np_ppjk = None
-    npwp_iter = list(re.finditer(r"\bNPWP\s*:\s*(.*)", all_text))
+    npwp_iter = list(RE_NPWP.finditer(all_text))
     if len(npwp_iter) >= 2:
         start = npwp_iter[1].end()
         tail = all_text[start:]
         ppjk_npwp = _clean(npwp_iter[1].group(1))
 
-        m = re.search(r"\bNama\s*:\s*(.*)", tail)
+        m = RE_NAMA.search(tail)
         if m: ppjk_nama = _clean(m.group(1))
 
-        m = re.search(r"\bAlamat\s*:\s*(.*)", tail)
+        m = RE_ALAMAT.search(tail)
         if m: ppjk_alamat = _clean(m.group(1))
 
-        m = re.search(r"\bNP\s*PPJK\s*:\s*(.*)", tail)
+        m = RE_NP_PPJK.search(tail)
         if m: ppjk_np_ppjk = _clean(m.group(1))
 
     data["ppjk"] = {
@@ -266,26 +315,26 @@ def extract_sppb(pdf_path):
     }
 
     # --- Lokasi Barang ---
-    m = re.search(r"Lokasi Barang\s*:\s*(.*)", all_text)
+    m = RE_LOKASI_BARANG.search(all_text)
     if m:
         data["lokasi_barang"] = _clean(m.group(1))
 
     # --- AWB / BL + tanggal ---
-    m = re.search(r"No\.?\s*B/?L atau AWB\s*\(Host\)\s*:\s*([^\s]+)\s*Tanggal\s*:\s*([0-9\-]+)", all_text, re.I)
+    m = RE_AWB.search(all_text)
     if m:
         data["awb"] = {"nomor": _clean(m.group(1)), "tanggal": _clean(m.group(2))}
 
     # --- Sarana Pengangkut + Flight ---
-    m = re.search(r"Nama Sarana Pengangkut\s*:\s*(.*)", all_text)
+    m = RE_SARANA_PENGANGKUT.search(all_text)
     sarana = _clean(m.group(1)) if m else None
 
-    m = re.search(r"No\.?\s*Voy\.?/Flight\s*:\s*([A-Z0-9]+)", all_text, re.I)
+    m = RE_VOY_FLIGHT.search(all_text)
     flight = _clean(m.group(1)) if m else None
 
     data["sarana_pengangkut"] = {"nama": sarana, "voy_flight": flight}
 
     # --- BC 1.1 + Tgl + Pos ---
-    m = re.search(r"No\.?\s*BC\s*1\.1\s*:\s*([0-9]+)\s*Tanggal\s*:\s*([0-9\-]+)\s*Pos\s*:\s*([^\n]*)", all_text, re.I)
+    m = RE_BC11_POS.search(all_text)
     if m:
         data["bc11"] = {
             "nomor": _clean(m.group(1)),
@@ -295,33 +344,33 @@ def extract_sppb(pdf_path):
 
     # --- Kemasan, Berat, Peti Kemas ---
     # Jumlah/Jenis Kemasan bisa berada di satu baris yang sama dengan label "Berat :"
-    m = re.search(r"Jumlah/jenis kemasan\s*:\s*([^\n]+)", all_text, re.I)
+    m = RE_JUMLAH_KEMASAN.search(all_text)
     jumlah_jenis_kemasan = None
     if m:
         raw = m.group(1)
         # potong jika ada "Berat :" di ujung baris
-        raw = re.split(r"\s+Berat\s*:\s*", raw)[0]
+        raw = RE_POTONG_BERAT.split(raw)[0]
         jumlah_jenis_kemasan = _clean(raw)
 
-    m = re.search(r"Merk kemasan\s*:\s*(.*)", all_text, re.I)
+    m = RE_MERK_KEMASAN.search(all_text)
     merk_kemasan = _clean(m.group(1)) if m else None
 
-    m = re.search(r"Jumlah peti kemas\s*:\s*([0-9]+)", all_text, re.I)
+    m = RE_JUMLAH_PETI_KEMAS.search(all_text)
     jumlah_pk = _clean(m.group(1)) if m else None
 
-    m = re.search(r"Nomor Peti Kemas/Ukuran\s*:\s*(.*)", all_text, re.I)
+    m = RE_NOMOR_PETI_KEMAS.search(all_text)
     nomor_pk = _clean(m.group(1)) if m else None
 
     # Berat: jika "Berat :" tidak diikuti angka, cari angka 4 desimal di sekitar baris kemasan
     berat = None
-    m = re.search(r"\bBerat\s*:\s*([0-9][0-9\.,]*)", all_text, re.I)
+    m = RE_BERAT.search(all_text)
     if m:
         berat = _clean(m.group(1))
     else:
         # cari index baris 'Jumlah/jenis kemasan'
         idx = None
         for i, ln in enumerate(lines):
-            if re.search(r"Jumlah/jenis kemasan", ln, re.I):
+            if RE_LABEL_KEMASAN.search(ln):
                 idx = i
                 break
         # cari angka d.dddd di 2 baris sebelum hingga 3 baris sesudah
@@ -329,7 +378,7 @@ def extract_sppb(pdf_path):
             rng_lo = max(0, idx - 2)
             rng_hi = min(len(lines), idx + 4)
             for j in range(rng_lo, rng_hi):
-                mm = re.search(r"\b\d+\.\d{4}\b", lines[j])
+                mm = RE_BERAT_DESIMAL.search(lines[j])
                 if mm:
                     berat = mm.group(0)
                     break
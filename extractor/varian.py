@@ -0,0 +1,49 @@
+"""
+Klasifikasi varian formulir dari teks halaman pertama, sebelum parsing:
+cukup cek judul dan label kunci (substring) plus satu regex pendek, jadi
+biayanya kecil dibanding regex field. Varian menentukan parser yang dipakai
+(lihat utils.SARANA_TANPA_FALLBACK) dan ikut dilaporkan di response ("varian")
+serta metrics (extract_documents_total).
+"""
+from .patterns import RE_CARA_PENGANGKUTAN
+
+TIDAK_DIKENAL = "tidak_dikenal"
+
+# judul dan label yang wajib ada di halaman pertama tiap formulir
+PENANDA_PIB_BC20 = (
+    "PEMBERITAHUAN IMPOR BARANG",
+    "BC 2.0",
+    "Nomor Pengajuan",
+    "10. Nama Sarana Pengangkutan",
+    "Nomor dan Tanggal Pendaftaran",
+)
+PENANDA_SPPB = (
+    "SURAT PERSETUJUAN PENGELUARAN BARANG",
+    "Nomor Pendaftaran PIB",
+    "Nama Sarana Pengangkut",
+)
+
+MODA = {"LAUT": "laut", "UDARA": "udara"}
+
+
+def _ada_semua(text, penanda):
+    return all(label in text for label in penanda)
+
+
+def varian_pib(text, template=None):
+    """
+    Varian PIB dari teks halaman pertama: "pib_bc20_laut", "pib_bc20_udara",
+    "pib_bc20" (cara pengangkutan lain/tidak terbaca) atau TIDAK_DIKENAL.
+    template: nama template yang cocok di halaman itu (templates.Potongan),
+    dianggap cukup sebagai bukti formulirnya dikenal.
+    """
+    if template is None and not _ada_semua(text, PENANDA_PIB_BC20):
+        return TIDAK_DIKENAL
+    nama = "pib_bc20" if template is None else template
+    m = RE_CARA_PENGANGKUTAN.search(text)
+    moda = MODA.get(m.group(1)) if m else None
+    return f"{nama}_{moda}" if moda else nama
+
+
+def varian_sppb(text):
+    return "sppb" if _ada_semua(text, PENANDA_SPPB) else TIDAK_DIKENAL
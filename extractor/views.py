@@ -1,70 +1,819 @@
 # extractor/views.py
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-import os
+from asgiref.sync import sync_to_async
 from django.conf import settings
-from .utils import extract_pib, extract_sppb
+from django.db import close_old_connections
+from django.http import HttpResponse, HttpResponseNotAllowed, JsonResponse, StreamingHttpResponse
+from django.utils.dateparse import parse_date
+from django.views.decorators.csrf import csrf_exempt
+import asyncio
+import hashlib
+import time
+from .admission import lepas_slot, minta_slot, minta_slot_async, retry_after
+from .backends import BatasMemoriTerlampaui
+from .jobs import JOB_PENUH, antrian_penuh, buat_job
+from .models import BarangPIB, DokumenPIB, DokumenSPPB, ExtractionJob
+from .pool import extract_many, extract_many_async, extract_stream
+from .reconcile import hitung, rekonsiliasi, ringkasan_baru
+from .records import simpan_hasil
+from .renderers import EventStreamRenderer, NDJSONRenderer, ndjson_line, sse_event
+from .storage import arsipkan_upload
+from .metrics import catat_ditolak, catat_request, get_metrics, in_flight
+from .timing import stage, timer_request, timing_aktif
+from .utils import pesan_hasil
 
-class ExtractDocumentsView(APIView):
-    def post(self, request):
+
+def _baca_upload(upload):
+    # baca isi upload ke memori sekaligus hitung sha256-nya (untuk key cache)
+    data = b"".join(upload.chunks())
+    return data, hashlib.sha256(data).hexdigest()
+
+
+def _form(request):
+    # field form: request DRF (request.data) atau HttpRequest biasa (view async)
+    return request.data if hasattr(request, "data") else request.POST
+
+
+def _ambil_upload(request, prefix=""):
+    # prefix: "set_<n>_" untuk satu set dokumen di endpoint batch
+    # ambil data text
+    tps_code = _form(request).get(f"{prefix}kode_tps")
+    jumlah_sppb = int(_form(request).get(f"{prefix}jumlah_sppb", 0))
+
+    # ambil file PIB
+    pib_file = request.FILES.get(f"{prefix}file_pib")
+
+    # ambil semua file sppb sesuai jumlah_sppb
+    sppb_files = []
+    for i in range(1, jumlah_sppb + 1):
+        f = request.FILES.get(f"{prefix}file_sppb_{i}")
+        if f:
+            sppb_files.append(f)
+
+    return tps_code, pib_file, sppb_files
+
+
+def _header_only(request):
+    # header_only=1 (form atau query param): PIB tanpa barang
+    value = _form(request).get("header_only", request.GET.get("header_only", ""))
+    return str(value).lower() in ("1", "true", "ya")
+
+
+def _siapkan_jobs(tps_code, pib_file, sppb_files, header_only=False, timer=None):
+    # ekstraksi langsung dari isi upload di memori; file asli diarsipkan
+    # terpisah (bisa di background) supaya tidak menahan response
+    pib_kind = "pib_header" if header_only else "pib"
+    jobs = []
+    for kind, upload in [(pib_kind, pib_file)] + [("sppb", f) for f in sppb_files]:
+        with stage("upload", timer):
+            data, digest = _baca_upload(upload)
+        with stage("arsip", timer):
+            arsipkan_upload(tps_code, upload.name, data, digest)
+        if timer is not None:
+            timer.hitung("bytes_upload", len(data))
+        jobs.append((kind, digest, data))
+    return jobs
+
+
+def _respon_wajib_lengkap():
+    return Response({
+        "status": False,
+        "message": "kode_tps, file_pib, dan file_sppb wajib dikirim",
+        "pib": None,
+        "sppb": None
+    }, status=status.HTTP_400_BAD_REQUEST)
+
+
+def _job_data(job):
+    return {
+        "id": str(job.id),
+        "kode_tps": job.kode_tps,
+        "status": job.status,
+        "message": job.message,
+        "created_at": job.created_at,
+        "updated_at": job.updated_at,
+    }
+
+
+# status untuk metrics/log kalau klien putus sebelum respon dikirim
+# (konvensi nginx "client closed request")
+STATUS_KLIEN_PUTUS = 499
+
+
+def _outcome(status_code):
+    if status_code < 400:
+        return "ok"
+    if status_code == STATUS_KLIEN_PUTUS:
+        return "cancelled"
+    if status_code == status.HTTP_429_TOO_MANY_REQUESTS:
+        return "rejected"
+    return "client_error" if status_code < 500 else "error"
+
+
+def _penuh(alasan):
+    # (data, headers) respon 429 admission control
+    detik = retry_after()
+    return {
+        "status": False,
+        "message": f"Server sedang penuh ({alasan}), coba lagi dalam {detik} detik",
+        "pib": None,
+        "sppb": None
+    }, {"Retry-After": str(detik)}
+
+
+def _respon_penuh(alasan):
+    data, headers = _penuh(alasan)
+    return Response(data, status=status.HTTP_429_TOO_MANY_REQUESTS, headers=headers)
+
+
+def _akhiri(endpoint, request, response, timer, t0, slot=None):
+    """
+    Request selesai (untuk streaming: body terakhir sudah dikirim): lepas
+    slot admission, catat metrics, lalu Server-Timing + log kalau
+    EXTRACT_TIMING menyala.
+    """
+    duration = time.perf_counter() - t0
+    lepas_slot(slot)
+    in_flight(endpoint, -1)
+    catat_request(endpoint, _outcome(response.status_code), duration, timer)
+    if timer is not None and timing_aktif():
+        timer.add("total", duration)
+        if not response.streaming:
+            # header streaming sudah terkirim, timing-nya hanya masuk log
+            response["Server-Timing"] = timer.server_timing()
+        # request yang ditolak tidak pernah membaca body upload
+        kode_tps = None if response.status_code == status.HTTP_429_TOO_MANY_REQUESTS else _form(request).get("kode_tps")
+        timer.log(endpoint, kode_tps=kode_tps, status=response.status_code, stream=response.streaming)
+
+
+class _StreamDiukur:
+    """
+    Body streaming yang memanggil selesai() tepat sekali: setelah body
+    terakhir dikirim, atau saat response ditutup (klien putus) walaupun body
+    belum sempat diiterasi; generator biasa tidak menjalankan finally-nya
+    kalau ditutup sebelum mulai, padahal slot admission wajib dilepas.
+    """
+
+    def __init__(self, content, selesai):
+        self.content = content
+        self.selesai = selesai
+
+    def __iter__(self):
         try:
-            # ambil data text
-            tps_code = request.data.get("kode_tps")
-            jumlah_sppb = int(request.data.get("jumlah_sppb", 0))
+            yield from self.content
+        finally:
+            self.close()
+
+    def close(self):
+        # dipanggil Django saat response ditutup
+        selesai, self.selesai = self.selesai, None
+        if selesai is not None:
+            selesai()
+
+
+def _diukur(endpoint, request, handler, admission=False):
+    """
+    Jalankan handler(request, timer) dengan timer request, gauge in-flight,
+    dan metrics (lihat timing.timer_request dan metrics.catat_request).
+    admission=True: handler baru jalan setelah dapat slot ekstraksi
+    (admission.py); kalau ditolak langsung 429 tanpa membaca upload.
+    """
+    timer = timer_request()
+    t0 = time.perf_counter()
+    in_flight(endpoint, 1)
+    slot = None
+    if admission:
+        with stage("antrian", timer):
+            slot, alasan = minta_slot(endpoint)
+        if alasan is not None:
+            response = _respon_penuh(alasan)
+            _akhiri(endpoint, request, response, timer, t0)
+            return response
+    try:
+        response = handler(request, timer)
+    except BaseException:
+        lepas_slot(slot)
+        in_flight(endpoint, -1)
+        raise
+    if response.streaming:
+        response.streaming_content = _StreamDiukur(
+            response.streaming_content, lambda: _akhiri(endpoint, request, response, timer, t0, slot)
+        )
+    else:
+        _akhiri(endpoint, request, response, timer, t0, slot)
+    return response
+
+
+def _mode_stream(request):
+    """
+    "sse" / "ndjson" kalau klien minta streaming (query ?stream=sse|ndjson
+    atau Accept: text/event-stream / application/x-ndjson), selain itu None.
+    """
+    mode = request.query_params.get("stream", "").lower()
+    if mode in ("1", "true", "ya"):
+        mode = NDJSONRenderer.format
+    if mode in (NDJSONRenderer.format, EventStreamRenderer.format):
+        return mode
+    accepted = getattr(request, "accepted_renderer", None)
+    if isinstance(accepted, (NDJSONRenderer, EventStreamRenderer)):
+        return accepted.format
+    return None
+
+
+def _pesan_error(error):
+    # error per file di respon stream (status HTTP sudah terkirim)
+    if isinstance(error, BatasMemoriTerlampaui):
+        return str(error)
+    return f"Terjadi kesalahan: {str(error)}"
 
-            # ambil file PIB
-            pib_file = request.FILES.get("file_pib")
 
-            # ambil semua file sppb sesuai jumlah_sppb
-            sppb_files = []
-            for i in range(1, jumlah_sppb + 1):
-                f = request.FILES.get(f"file_sppb_{i}")
-                if f:
-                    sppb_files.append(f)
+def _events_dokumen(tps_code, jobs, timer=None):
+    """
+    (event, data) per file begitu selesai: "pib", lalu "sppb" (index sama
+    dengan file_sppb_<index>), "error" untuk file yang gagal, dan terakhir
+    "selesai" dengan status keseluruhan. File yang berhasil tetap disimpan
+    walaupun file lain di set itu gagal.
+    """
+    gagal = 0
+    pib_result = None
+    hasil = [None] * len(jobs)
+    t0 = time.perf_counter()
+    try:
+        # tiap file jadi group sendiri supaya hasilnya keluar satu per satu
+        for i, results, error in extract_stream([[job] for job in jobs], timer=timer):
+            jenis = "pib" if i == 0 else "sppb"
+            if error is not None:
+                gagal += 1
+                yield "error", {"jenis": jenis, "index": i or None,
+                                "message": _pesan_error(error)}
+            elif i == 0:
+                pib_result = hasil[0] = results[0]
+                yield "pib", {"pib": pib_result}
+            else:
+                hasil[i] = results[0]
+                yield "sppb", {"index": i, "sppb": results[0]}
+    except Exception as e:
+        yield "selesai", {"status": False, "message": f"Terjadi kesalahan: {str(e)}"}
+        return
+    finally:
+        if timer is not None:
+            timer.add("ekstraksi", time.perf_counter() - t0)
+        if any(result is not None for result in hasil):
+            simpan_hasil(tps_code, jobs, hasil)
+    if gagal:
+        yield "selesai", {"status": False, "message": f"{gagal} dokumen gagal diekstrak"}
+    else:
+        yield "selesai", {"status": True, "message": pesan_hasil(pib_result)}
+
+
+def _respon_stream(mode, events):
+    if mode == EventStreamRenderer.format:
+        body = (sse_event(event, data) for event, data in events)
+        content_type = EventStreamRenderer.media_type
+    else:
+        body = (ndjson_line({"event": event, **data}) for event, data in events)
+        content_type = NDJSONRenderer.media_type
+    response = StreamingHttpResponse(body, content_type=content_type)
+    response["Cache-Control"] = "no-cache"
+    # jangan di-buffer reverse proxy (nginx), tiap event langsung dikirim
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+class ExtractDocumentsView(APIView):
+    """
+    Default: satu respon JSON setelah semua file selesai. Dengan
+    ?stream=sse|ndjson (atau Accept yang sesuai) tiap hasil PIB/SPPB
+    dikirim begitu file-nya selesai. Saat semua slot ekstraksi terpakai dan
+    antrian penuh: 429 + Retry-After (admission.py).
+    """
+    renderer_classes = list(api_settings.DEFAULT_RENDERER_CLASSES) + [NDJSONRenderer, EventStreamRenderer]
+
+    def post(self, request):
+        return _diukur("extract", request, self._post, admission=True)
+
+    def _post(self, request, timer):
+        try:
+            with stage("form", timer):
+                tps_code, pib_file, sppb_files = _ambil_upload(request)
 
             # validasi sederhana
             if not (tps_code and pib_file and sppb_files):
+                return _respon_wajib_lengkap()
+
+            jobs = _siapkan_jobs(tps_code, pib_file, sppb_files, _header_only(request), timer)
+
+            mode = _mode_stream(request)
+            if mode:
+                return _respon_stream(mode, _events_dokumen(tps_code, jobs, timer))
+
+            # ekstraksi paralel di process pool (hasil cache dipakai kalau ada),
+            # urutan hasil sama dengan urutan file_sppb_i
+            with stage("ekstraksi", timer):
+                pib_result, *sppb_results = extract_many(jobs, timer)
+            with stage("simpan", timer):
+                simpan_hasil(tps_code, jobs, [pib_result, *sppb_results])
+
+            return Response({
+                "status": True,
+                "message": pesan_hasil(pib_result),
+                "pib": pib_result,
+                "sppb": sppb_results
+            }, status=status.HTTP_200_OK)
+
+        except BatasMemoriTerlampaui as e:
+            return Response({
+                "status": False,
+                "message": str(e)
+            }, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        except Exception as e:
+            return Response({
+                "status": False,
+                "message": f"Terjadi kesalahan: {str(e)}"
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+def _json(data, status_code, headers=None):
+    return JsonResponse(data, status=status_code, headers=headers, json_dumps_params={"ensure_ascii": False})
+
+
+def _siapkan_upload(request, timer):
+    # bagian sinkron view async: parse form, baca & arsipkan upload (ORM)
+    with stage("form", timer):
+        tps_code, pib_file, sppb_files = _ambil_upload(request)
+    if not (tps_code and pib_file and sppb_files):
+        return tps_code, None
+    return tps_code, _siapkan_jobs(tps_code, pib_file, sppb_files, _header_only(request), timer)
+
+
+def _di_thread(fn, *args):
+    # dipanggil lewat sync_to_async(thread_sensitive=False): request paralel
+    # tidak antri di satu thread sinkron; koneksi DB thread itu ditutup lagi
+    try:
+        return fn(*args)
+    finally:
+        close_old_connections()
+
+
+async def _extract_async(request, timer):
+    try:
+        tps_code, jobs = await sync_to_async(_di_thread, thread_sensitive=False)(_siapkan_upload, request, timer)
+        if jobs is None:
+            return _json({
+                "status": False,
+                "message": "kode_tps, file_pib, dan file_sppb wajib dikirim",
+                "pib": None,
+                "sppb": None
+            }, status.HTTP_400_BAD_REQUEST)
+
+        with stage("ekstraksi", timer):
+            pib_result, *sppb_results = await extract_many_async(jobs, timer)
+        with stage("simpan", timer):
+            await sync_to_async(_di_thread, thread_sensitive=False)(
+                simpan_hasil, tps_code, jobs, [pib_result, *sppb_results]
+            )
+
+        return _json({
+            "status": True,
+            "message": pesan_hasil(pib_result),
+            "pib": pib_result,
+            "sppb": sppb_results
+        }, status.HTTP_200_OK)
+
+    except BatasMemoriTerlampaui as e:
+        return _json({
+            "status": False,
+            "message": str(e)
+        }, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+    except Exception as e:
+        return _json({
+            "status": False,
+            "message": f"Terjadi kesalahan: {str(e)}"
+        }, status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@csrf_exempt
+async def extract_async(request):
+    """
+    /api/extract/async/: sama dengan ExtractDocumentsView (respon JSON, tanpa
+    streaming) tapi view async untuk server ASGI. Di ASGI semua view sinkron
+    berbagi satu thread; di sini body upload diterima handler ASGI tanpa
+    menahan apa pun, parsing PDF jalan di process pool, dan event loop tetap
+    bebas menerima upload lain. Klien putus -> Django membatalkan view ini:
+    slot admission dilepas dan file yang belum diekstrak tidak dikerjakan.
+    """
+    if request.method != "POST":
+        return HttpResponseNotAllowed(["POST"])
+
+    endpoint = "extract_async"
+    timer = timer_request()
+    t0 = time.perf_counter()
+    await sync_to_async(in_flight, thread_sensitive=False)(endpoint, 1)
+    slot = None
+    response = HttpResponse(status=STATUS_KLIEN_PUTUS)
+    try:
+        with stage("antrian", timer):
+            slot, alasan = await minta_slot_async(endpoint)
+        if alasan is not None:
+            data, headers = _penuh(alasan)
+            response = _json(data, status.HTTP_429_TOO_MANY_REQUESTS, headers)
+        else:
+            response = await _extract_async(request, timer)
+        return response
+    finally:
+        # tetap dicatat walaupun view dibatalkan
+        await asyncio.shield(
+            sync_to_async(_akhiri, thread_sensitive=False)(endpoint, request, response, timer, t0, slot)
+        )
+
+
+def _batch_limit():
+    return getattr(settings, "EXTRACT_MAX_PARALLEL_PER_BATCH", 8)
+
+
+def _stream_batch(sets, groups, errors, timer=None):
+    """
+    Satu baris JSON per set, dikirim begitu set itu selesai (urutan selesai).
+    sets: list of (nomor_set, kode_tps), groups: jobs per set (None kalau
+    set tidak lengkap), errors: pesan untuk set yang tidak lengkap.
+    """
+    for n, (nomor, tps_code) in enumerate(sets):
+        if groups[n] is None:
+            yield ndjson_line({"set": nomor, "kode_tps": tps_code, "status": False,
+                               "message": errors[n], "pib": None, "sppb": None})
+
+    valid = [n for n, jobs in enumerate(groups) if jobs is not None]
+    sisa = set(valid)
+    try:
+        for g, results, error in extract_stream([groups[n] for n in valid], _batch_limit(), timer):
+            n = valid[g]
+            sisa.discard(n)
+            nomor, tps_code = sets[n]
+            if error is not None:
+                yield ndjson_line({"set": nomor, "kode_tps": tps_code, "status": False,
+                                   "message": _pesan_error(error), "pib": None, "sppb": None})
+                continue
+            simpan_hasil(tps_code, groups[n], results)
+            pib_result, *sppb_results = results
+            yield ndjson_line({"set": nomor, "kode_tps": tps_code, "status": True,
+                               "message": pesan_hasil(pib_result), "pib": pib_result, "sppb": sppb_results})
+    except Exception as e:
+        # status HTTP sudah terkirim: set yang belum selesai dilaporkan per baris
+        for n in sorted(sisa):
+            nomor, tps_code = sets[n]
+            yield ndjson_line({"set": nomor, "kode_tps": tps_code, "status": False,
+                               "message": f"Terjadi kesalahan: {str(e)}", "pib": None, "sppb": None})
+
+
+class ExtractBatchView(APIView):
+    """
+    Banyak set dokumen dalam satu request: jumlah_set, lalu per set n field
+    yang sama dengan /api/extract/ diberi awalan "set_<n>_" (set_1_kode_tps,
+    set_1_file_pib, set_1_jumlah_sppb, set_1_file_sppb_1, ...).
+    Hasil di-stream sebagai NDJSON, satu baris per set begitu set itu selesai.
+    """
+    def post(self, request):
+        return _diukur("batch", request, self._post, admission=True)
+
+    def _post(self, request, timer):
+        try:
+            jumlah_set = int(request.data.get("jumlah_set", 0))
+            if jumlah_set <= 0:
                 return Response({
                     "status": False,
-                    "message": "kode_tps, file_pib, dan file_sppb wajib dikirim",
-                    "pib": None,
-                    "sppb": None
+                    "message": "jumlah_set wajib dikirim",
                 }, status=status.HTTP_400_BAD_REQUEST)
 
-            # folder simpan
-            base_dir = os.path.join(settings.MEDIA_ROOT, "documents", tps_code)
-            os.makedirs(base_dir, exist_ok=True)
+            header_only = _header_only(request)
+            sets, groups, errors = [], [], []
+            for nomor in range(1, jumlah_set + 1):
+                tps_code, pib_file, sppb_files = _ambil_upload(request, f"set_{nomor}_")
+                sets.append((nomor, tps_code))
+                if tps_code and pib_file and sppb_files:
+                    groups.append(_siapkan_jobs(tps_code, pib_file, sppb_files, header_only, timer))
+                    errors.append(None)
+                else:
+                    groups.append(None)
+                    errors.append("kode_tps, file_pib, dan file_sppb wajib dikirim")
+
+            response = StreamingHttpResponse(
+                _stream_batch(sets, groups, errors, timer), content_type=NDJSONRenderer.media_type
+            )
+            # jangan di-buffer reverse proxy (nginx), tiap baris langsung dikirim
+            response["X-Accel-Buffering"] = "no"
+            return response
 
-            # simpan PIB
-            pib_path = os.path.join(base_dir, pib_file.name)
-            with open(pib_path, "wb+") as f:
-                for chunk in pib_file.chunks():
-                    f.write(chunk)
+        except Exception as e:
+            return Response({
+                "status": False,
+                "message": f"Terjadi kesalahan: {str(e)}"
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-            # ekstraksi PIB
-            pib_result = extract_pib(pib_path)
 
-            # simpan & ekstrak semua SPPB
-            sppb_results = []
-            for sppb_file in sppb_files:
-                sppb_path = os.path.join(base_dir, sppb_file.name)
-                with open(sppb_path, "wb+") as f:
-                    for chunk in sppb_file.chunks():
-                        f.write(chunk)
+class ExtractJobCreateView(APIView):
+    """
+    Versi asinkron: baca file, daftarkan job, langsung balas job id.
+    Hasil diambil lewat ExtractJobDetailView / ExtractJobResultView.
+    Job yang belum selesai sudah EXTRACT_JOB_MAX_PENDING: 429 + Retry-After
+    sebelum upload dibaca. Job pending milik worker yang mati dijalankan
+    ulang worker berikutnya (jobs.pulihkan_saat_mulai) atau lewat
+    manage.py pulihkan_job.
+    """
+    def post(self, request):
+        return _diukur("jobs", request, self._post)
 
-                # ekstraksi tiap file
-                sppb_results.append(extract_sppb(sppb_path))
+    def _post(self, request, timer):
+        if antrian_penuh():
+            catat_ditolak("jobs", JOB_PENUH)
+            return _respon_penuh(JOB_PENUH)
+        try:
+            tps_code, pib_file, sppb_files = _ambil_upload(request)
+
+            if not (tps_code and pib_file and sppb_files):
+                return _respon_wajib_lengkap()
+
+            jobs = _siapkan_jobs(tps_code, pib_file, sppb_files, _header_only(request), timer)
+            job = buat_job(tps_code, jobs)
 
             return Response({
                 "status": True,
-                "message": "Ekstraksi berhasil",
-                "pib": pib_result,
-                "sppb": sppb_results
-            }, status=status.HTTP_200_OK)
+                "message": "Job ekstraksi diterima",
+                "job": _job_data(job)
+            }, status=status.HTTP_202_ACCEPTED)
 
         except Exception as e:
             return Response({
                 "status": False,
                 "message": f"Terjadi kesalahan: {str(e)}"
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class ExtractJobDetailView(APIView):
+    def get(self, request, job_id):
+        job = ExtractionJob.objects.filter(pk=job_id).first()
+        if job is None:
+            return Response({
+                "status": False,
+                "message": "Job tidak ditemukan"
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        return Response({
+            "status": True,
+            "job": _job_data(job)
+        }, status=status.HTTP_200_OK)
+
+
+class ExtractJobResultView(APIView):
+    """
+    200 + hasil kalau job done, 202 kalau belum selesai, 422 + pesan kalau
+    job failed.
+    """
+    def get(self, request, job_id):
+        job = ExtractionJob.objects.filter(pk=job_id).first()
+        if job is None:
+            return Response({
+                "status": False,
+                "message": "Job tidak ditemukan"
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        if job.status == ExtractionJob.STATUS_DONE:
+            return Response({
+                "status": True,
+                "message": job.message,
+                "pib": job.result["pib"],
+                "sppb": job.result["sppb"]
+            }, status=status.HTTP_200_OK)
+
+        if job.status == ExtractionJob.STATUS_FAILED:
+            return Response({
+                "status": False,
+                "message": job.message,
+                "pib": None,
+                "sppb": None
+            }, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+        # belum selesai
+        return Response({
+            "status": False,
+            "message": "Job belum selesai",
+            "job": _job_data(job)
+        }, status=status.HTTP_202_ACCEPTED)
+
+
+def _batas_lookup(request):
+    try:
+        limit = int(request.query_params.get("limit", 50))
+    except ValueError:
+        limit = 50
+    return min(max(limit, 1), getattr(settings, "EXTRACT_LOOKUP_MAX_LIMIT", 500))
+
+
+def _filter_lookup(request, queryset, filters):
+    # filters: query param -> lookup ORM (semua kolomnya ber-index)
+    for param, lookup in filters.items():
+        value = request.query_params.get(param, "").strip()
+        if value:
+            queryset = queryset.filter(**{lookup: value})
+    return queryset
+
+
+def _pib_data(pib, sppb=None):
+    data = {
+        "id": pib.id,
+        "kode_tps": pib.kode_tps,
+        "header_only": pib.header_only,
+        "created_at": pib.created_at,
+        "updated_at": pib.updated_at,
+        "pib": pib.data,
+    }
+    if sppb is not None:
+        data["sppb"] = [_sppb_data(s) for s in sppb]
+    return data
+
+
+def _sppb_data(sppb):
+    return {
+        "id": sppb.id,
+        "kode_tps": sppb.kode_tps,
+        "pib_id": sppb.pib_id,
+        "created_at": sppb.created_at,
+        "updated_at": sppb.updated_at,
+        "sppb": sppb.data,
+    }
+
+
+def _tidak_ditemukan(jenis):
+    return Response({
+        "status": False,
+        "message": f"{jenis} tidak ditemukan"
+    }, status=status.HTTP_404_NOT_FOUND)
+
+
+class PIBListView(APIView):
+    """
+    Cari PIB tersimpan: ?nomor_pengajuan=, ?nomor_pendaftaran=, ?awb= (house
+    atau master BL/AWB), ?kode_tps=, ?importir=<npwp>, ?hs_code=; ?limit=
+    (default 50). Terbaru lebih dulu.
+    """
+    FILTERS = {
+        "kode_tps": "kode_tps",
+        "nomor_pengajuan": "nomor_pengajuan",
+        "nomor_pendaftaran": "nomor_pendaftaran",
+        "importir": "importir__npwp",
+    }
+
+    def get(self, request):
+        queryset = _filter_lookup(request, DokumenPIB.objects.all(), self.FILTERS)
+        awb = request.query_params.get("awb", "").strip()
+        if awb:
+            queryset = queryset.filter(house_bl_awb=awb) | queryset.filter(master_bl_awb=awb)
+        hs_code = request.query_params.get("hs_code", "").strip()
+        if hs_code:
+            queryset = queryset.filter(pk__in=BarangPIB.objects.filter(hs_code=hs_code).values("pib_id"))
+        pib = list(queryset[:_batas_lookup(request)])
+        return Response({
+            "status": True,
+            "jumlah": len(pib),
+            "pib": [_pib_data(p) for p in pib]
+        }, status=status.HTTP_200_OK)
+
+
+class PIBDetailView(APIView):
+    def get(self, request, pib_id):
+        pib = DokumenPIB.objects.filter(pk=pib_id).first()
+        if pib is None:
+            return _tidak_ditemukan("PIB")
+        # SPPB yang di-upload bersama PIB ini atau yang nomor_aju-nya sama
+        sppb = DokumenSPPB.objects.filter(pib=pib)
+        if pib.nomor_pengajuan:
+            sppb = sppb | DokumenSPPB.objects.filter(nomor_aju=pib.nomor_pengajuan)
+        return Response({
+            "status": True,
+            **_pib_data(pib, sppb)
+        }, status=status.HTTP_200_OK)
+
+
+class SPPBListView(APIView):
+    """
+    Cari SPPB tersimpan: ?nomor= (nomor SPPB), ?nomor_aju=, ?nomor_pendaftaran=,
+    ?awb=, ?kode_tps=, ?importir=<npwp>, ?ppjk=<npwp>; ?limit= (default 50).
+    """
+    FILTERS = {
+        "kode_tps": "kode_tps",
+        "nomor": "nomor_sppb",
+        "nomor_aju": "nomor_aju",
+        "nomor_pendaftaran": "nomor_pendaftaran",
+        "awb": "nomor_awb",
+        "importir": "importir__npwp",
+        "ppjk": "ppjk__npwp",
+    }
+
+    def get(self, request):
+        queryset = _filter_lookup(request, DokumenSPPB.objects.all(), self.FILTERS)
+        sppb = list(queryset[:_batas_lookup(request)])
+        return Response({
+            "status": True,
+            "jumlah": len(sppb),
+            "sppb": [_sppb_data(s) for s in sppb]
+        }, status=status.HTTP_200_OK)
+
+
+class SPPBDetailView(APIView):
+    def get(self, request, sppb_id):
+        sppb = DokumenSPPB.objects.filter(pk=sppb_id).first()
+        if sppb is None:
+            return _tidak_ditemukan("SPPB")
+        return Response({
+            "status": True,
+            **_sppb_data(sppb)
+        }, status=status.HTTP_200_OK)
+
+
+def _tanggal_param(request, name):
+    # YYYY-MM-DD; ValueError kalau formatnya salah
+    value = request.query_params.get(name, "").strip()
+    if not value:
+        return None
+    try:
+        parsed = parse_date(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValueError(f"{name} harus berformat YYYY-MM-DD")
+    return parsed
+
+
+def _stream_rekonsiliasi(records, filter_status, mode):
+    # ndjson: satu baris per hasil lalu {"ringkasan": ...};
+    # sse: event "hasil" per hasil lalu event "ringkasan"
+    sse = mode == EventStreamRenderer.format
+    counts = ringkasan_baru()
+    for record in records:
+        hitung(counts, record)
+        if not filter_status or record["status"] == filter_status:
+            yield sse_event("hasil", record) if sse else ndjson_line(record)
+    yield sse_event("ringkasan", counts) if sse else ndjson_line({"ringkasan": counts})
+
+
+class RekonsiliasiView(APIView):
+    """
+    Rekonsiliasi PIB-SPPB tersimpan: ?kode_tps=, ?dari= & ?sampai= (tanggal
+    pendaftaran PIB, YYYY-MM-DD), ?status=cocok|tidak_cocok|tanpa_pasangan.
+    JSON: ringkasan semua dokumen + maksimal ?limit= baris hasil. Dengan
+    ?stream=ndjson semua baris dikirim, diakhiri baris {"ringkasan": ...};
+    ?stream=sse sama dalam bentuk event "hasil" lalu "ringkasan".
+    """
+    renderer_classes = list(api_settings.DEFAULT_RENDERER_CLASSES) + [NDJSONRenderer, EventStreamRenderer]
+
+    def get(self, request):
+        try:
+            dari = _tanggal_param(request, "dari")
+            sampai = _tanggal_param(request, "sampai")
+        except ValueError as e:
+            return Response({
+                "status": False,
+                "message": str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        kode_tps = request.query_params.get("kode_tps", "").strip() or None
+        filter_status = request.query_params.get("status", "").strip()
+        records = rekonsiliasi(kode_tps, dari, sampai)
+
+        mode = _mode_stream(request)
+        if mode:
+            content_type = (
+                EventStreamRenderer.media_type if mode == EventStreamRenderer.format else NDJSONRenderer.media_type
+            )
+            response = StreamingHttpResponse(_stream_rekonsiliasi(records, filter_status, mode),
+                                             content_type=content_type)
+            response["Cache-Control"] = "no-cache"
+            response["X-Accel-Buffering"] = "no"
+            return response
+
+        limit = _batas_lookup(request)
+        counts = ringkasan_baru()
+        hasil = []
+        for record in records:
+            hitung(counts, record)
+            if len(hasil) < limit and (not filter_status or record["status"] == filter_status):
+                hasil.append(record)
+        return Response({
+            "status": True,
+            "ringkasan": counts,
+            "hasil": hasil
+        }, status=status.HTTP_200_OK)
+
+
+class MetricsView(APIView):
+    """
+    Metrics format teks Prometheus, teragregasi dari semua proses worker.
+    """
+    def get(self, request):
+        store = get_metrics()
+        if store is None:
+            return HttpResponse("metrics tidak aktif (EXTRACT_METRICS_ENABLED = False)\n",
+                                status=404, content_type="text/plain")
+        return HttpResponse(store.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
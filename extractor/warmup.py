@@ -0,0 +1,91 @@
+"""
+Warmup proses web sebelum melayani request: import library PDF, muat CMap,
+dan (opsional) ekstrak satu dokumen contoh supaya cache lazy pdfminer/pdfium
+sudah terisi. Dipanggil dari wsgi.py/asgi.py; dengan server yang memuat
+aplikasi di master sebelum fork (gunicorn --preload) hasilnya dibagi ke semua
+worker secara copy-on-write, termasuk process pool ekstraksi (fork).
+Jangan membuat thread/process pool di sini: thread tidak ikut ter-fork.
+"""
+import importlib
+import logging
+import os
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# modul yang dipakai jalur ekstraksi (lihat backends.py)
+MODUL_PDF = (
+    "pdfplumber",
+    "pdfminer.fontmetrics",
+    "pdfminer.cmapdb",
+    "pypdfium2",
+    "pypdfium2.raw",
+)
+
+
+def _muat_cmap(names):
+    from pdfminer.cmapdb import CMapDB
+
+    for name in names:
+        try:
+            CMapDB.get_cmap(name)
+        except CMapDB.CMapNotFound:
+            logger.warning("CMap %s tidak ditemukan", name)
+
+
+def _ekstrak_contoh(path):
+    from .backends import BACKENDS, baca_halaman
+    from .utils import _teks_pib, _teks_sppb, parse_pib, parse_sppb
+
+    for backend in BACKENDS:
+        pages = baca_halaman(str(path), backend)
+        parse_pib(_teks_pib(pages))
+        parse_sppb(*_teks_sppb(pages))
+
+
+def warmup():
+    """
+    Jalankan semua langkah warmup; mengembalikan durasi per langkah (detik).
+    """
+    durasi = {}
+
+    t0 = time.perf_counter()
+    for name in MODUL_PDF:
+        importlib.import_module(name)
+    # registry regex & parser ikut dimuat
+    importlib.import_module("extractor.pool")
+    durasi["import"] = time.perf_counter() - t0
+
+    cmaps = getattr(settings, "EXTRACT_WARMUP_CMAPS", ())
+    if cmaps:
+        t0 = time.perf_counter()
+        _muat_cmap(cmaps)
+        durasi["cmap"] = time.perf_counter() - t0
+
+    path = getattr(settings, "EXTRACT_WARMUP_FILE", None)
+    if path and not os.path.exists(path):
+        logger.warning("EXTRACT_WARMUP_FILE %s tidak ada, ekstraksi contoh dilewati", path)
+    elif path:
+        t0 = time.perf_counter()
+        try:
+            _ekstrak_contoh(path)
+        except Exception:
+            logger.exception("Warmup ekstraksi %s gagal", path)
+        durasi["ekstrak"] = time.perf_counter() - t0
+
+    return durasi
+
+
+def warmup_saat_start():
+    """
+    Hook untuk wsgi.py/asgi.py: warmup kalau EXTRACT_WARMUP menyala.
+    """
+    if not getattr(settings, "EXTRACT_WARMUP", True):
+        return
+    durasi = warmup()
+    logger.info(
+        "Warmup extractor: %s",
+        ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in durasi.items()),
+    )
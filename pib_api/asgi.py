@@ -14,3 +14,9 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'pib_api.settings')
 
 application = get_asgi_application()
+
+# preload library PDF & cache pdfminer/pdfium sebelum worker di-fork
+# (gunicorn --preload) atau sebelum request pertama; lihat extractor/warmup.py
+from extractor.warmup import warmup_saat_start  # noqa: E402
+
+warmup_saat_start()
@@ -122,3 +122,98 @@ STATIC_URL = "static/"
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+
+# Cache hasil ekstraksi (key = sha256 isi file + versi extractor)
+EXTRACT_CACHE_ENABLED = True
+EXTRACT_CACHE_MAX_ENTRIES = 256
+EXTRACT_CACHE_PATH = BASE_DIR / "extract_cache.sqlite3"
+
+# Process pool ekstraksi per worker (None = jumlah CPU, 0 = tanpa pool)
+EXTRACT_POOL_WORKERS = None
+# Maksimal file yang diekstrak paralel dalam satu request
+EXTRACT_MAX_PARALLEL_PER_REQUEST = 4
+# Sama, untuk endpoint batch (/api/extract/batch/) yang memuat banyak set dokumen
+EXTRACT_MAX_PARALLEL_PER_BATCH = 8
+
+# Admission control /api/extract/ dan /api/extract/batch/ per proses worker:
+# paling banyak MAX_ACTIVE request diekstrak bersamaan (None = jumlah proses
+# pool), MAX_QUEUE request menunggu paling lama QUEUE_TIMEOUT detik, sisanya
+# langsung 429 dengan header Retry-After (detik)
+EXTRACT_ADMISSION_ENABLED = True
+EXTRACT_ADMISSION_MAX_ACTIVE = None
+EXTRACT_ADMISSION_MAX_QUEUE = 16
+EXTRACT_ADMISSION_QUEUE_TIMEOUT = 30
+EXTRACT_ADMISSION_RETRY_AFTER = 5
+
+# Jumlah thread yang memproses job ekstraksi asinkron (/api/extract/jobs/)
+EXTRACT_JOB_WORKERS = 2
+# Job belum selesai (pending + running) paling banyak sekian, job baru
+# ditolak 429 + Retry-After (None = tanpa batas)
+EXTRACT_JOB_MAX_PENDING = 64
+# Request pertama tiap proses worker: job running yang macet > 30 menit
+# ditandai failed dan job pending dijalankan ulang (jobs.pulihkan_saat_mulai).
+# False = hanya lewat manage.py pulihkan_job
+EXTRACT_JOB_RECOVER_ON_START = True
+
+# Arsip file upload asli (ekstraksi tidak membutuhkannya; dengan background=True
+# response tidak menunggu penulisan). Isi file disimpan sekali per sha256 di
+# EXTRACT_BLOB_ROOT (default MEDIA_ROOT/blobs), upload per TPS dicatat di tabel
+# UploadedDocument. Kompresi gzip default mati: PDF korpus hanya mengecil ~8%.
+EXTRACT_PERSIST_UPLOADS = True
+EXTRACT_PERSIST_IN_BACKGROUND = True
+# Batas isi upload (MB) yang menunggu di antrian arsip background; kalau
+# penuh upload berikutnya diarsipkan langsung di request (None = tanpa batas)
+EXTRACT_ARCHIVE_MAX_PENDING_MB = 64
+EXTRACT_BLOB_ROOT = None
+EXTRACT_BLOB_COMPRESS = False
+# Referensi upload lebih tua dari sekian hari dihapus oleh
+# "manage.py compact_uploads" (None = simpan selamanya)
+EXTRACT_UPLOAD_RETENTION_DAYS = None
+
+# Hasil ekstraksi disimpan ke database (DokumenPIB/DokumenSPPB/BarangPIB/
+# Importir/PPJK) untuk /api/pib/ dan /api/sppb/; ikut EXTRACT_PERSIST_IN_BACKGROUND
+EXTRACT_PERSIST_RESULTS = True
+# Batas ?limit= di endpoint lookup
+EXTRACT_LOOKUP_MAX_LIMIT = 500
+
+# Backend teks PDF: "pdfium" (cepat) atau "pdfplumber". Dokumen yang di pdfium
+# tidak menghasilkan barang/nomor SPPB otomatis diulang dengan pdfplumber.
+EXTRACT_TEXT_BACKEND = "pdfium"
+
+# Batas kenaikan memori (RSS proses, MB) selama satu dokumen diubah jadi teks;
+# lewat batas -> ekstraksi dokumen itu dihentikan, API membalas 413. None =
+# tanpa batas. Hanya di platform dengan /proc (Linux) dan hanya di process
+# pool (EXTRACT_POOL_WORKERS > 0): tanpa pool RSS proses juga memuat dokumen
+# lain yang sedang diparse, jadi tidak dicek
+EXTRACT_MEMORY_BUDGET_MB = 512
+
+# Template formulir (extractor/templates.py): field dengan posisi tetap dibaca
+# dari potongan kotaknya di halaman pertama; False = regex saja
+EXTRACT_TEMPLATES = True
+
+# Timer per tahap ekstraksi di /api/extract/: header Server-Timing dan satu
+# baris log JSON (logger extractor.timing) per request
+EXTRACT_TIMING = False
+
+# Metrics Prometheus di /metrics; semua proses worker menulis ke satu file SQLite
+EXTRACT_METRICS_ENABLED = True
+EXTRACT_METRICS_PATH = BASE_DIR / "extract_metrics.sqlite3"
+
+# Warmup saat wsgi/asgi dimuat: import library PDF, CMap pdfminer yang dimuat
+# di depan (korpus saat ini tidak memakai CMap eksternal, Identity-H bawaan),
+# dan satu dokumen contoh yang diekstrak dengan semua backend
+EXTRACT_WARMUP = True
+EXTRACT_WARMUP_CMAPS = ()
+EXTRACT_WARMUP_FILE = BASE_DIR / "documents" / "CHAN" / "pib1.pdf"
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "extractor": {"handlers": ["console"], "level": "INFO"},
+    },
+}
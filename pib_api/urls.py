@@ -17,7 +17,10 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from extractor.views import MetricsView
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path("api/", include("extractor.urls")),
+    path("metrics", MetricsView.as_view(), name="metrics"),
 ]